@@ -4,7 +4,7 @@ import logging
 from crewai.agent import Agent
 from crewai.crew import Crew
 from crewai.llm import LLM
-import google.generativeai as genai
+from ai_service.services.providers import gemini, GEMINI_PRO
 from ai_service.memory_manager import MemoryManager
 from ai_service.tools.emotion_tool import EmotionTool
 
@@ -20,8 +20,6 @@ print(emotion_result)
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     logging.warning("⚠️ GOOGLE_API_KEY not found. Gemini responses may fail.")
-else:
-    genai.configure(api_key=GOOGLE_API_KEY)
 
 memory = MemoryManager()
 
@@ -29,11 +27,9 @@ memory = MemoryManager()
 # 🧠 GEMINI WRAPPER
 # =========================================================
 def use_gemini(prompt: str):
-    """Lightweight helper to query Gemini 2.0 Pro."""
+    """Lightweight helper to query Gemini 2.0 Pro (cached model handle, see services/providers.py)."""
     try:
-        model = genai.GenerativeModel("models/gemini-2.0-pro")
-        response = model.generate_content(prompt)
-        return response.text
+        return gemini(prompt, GEMINI_PRO)
     except Exception as e:
         logging.error(f"Gemini call failed: {e}")
         return "[Error: Gemini model failed]"
@@ -88,21 +84,34 @@ def get_next_question(user_id=None, last_response=None, detected_emotion="neutra
     """Generate the next reflective question based on memory and emotional context."""
     user_id = user_id or "anonymous"
     previous_turns = memory.recall(user_id)
+    recent_turns = previous_turns[-3:]
 
     context_snippet = "\n".join([
         f"User: {t['user']}\nAI: {t['ai']}\nEmotion: {t['emotion']}"
-        for t in previous_turns[-3:]
+        for t in recent_turns
     ])
 
+    # MemoryWeaver: older memories close in meaning to the latest response (only
+    # those above MIMIR_MEMORY_RECALL_MIN_SCORE, so unrelated history stays out)
+    related = memory.recall_related(user_id, last_response, exclude=[t["user"] for t in recent_turns])
+    related_snippet = ""
+    if related:
+        related_snippet = "Earlier memories the user shared that relate to this:\n" + "\n".join(
+            f"- ({m.get('timestamp', '')[:10]}, felt {m.get('emotion', 'neutral')}) {m['text']}" for m in related
+        )
+
     prompt = f"""
     Conversation history:
     {context_snippet}
 
+    {related_snippet}
+
     Latest response: "{last_response}"
     Detected emotion: {detected_emotion}
 
     Based on this, generate one warm, empathetic, open-ended question
     that invites the user to share more about their thoughts or memories.
+    If an earlier memory clearly connects to the latest response, you may gently link them.
     """
 
     question = use_gemini(prompt)
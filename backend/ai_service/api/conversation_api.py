@@ -1,11 +1,22 @@
-from fastapi import APIRouter, UploadFile, File, Form
+from fastapi import APIRouter, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
-import tempfile, subprocess, os
+from functools import partial
+from pathlib import Path
+import uuid
+import json
 import base64
+import asyncio
+import logging
 
-from ai_service.services.text_to_speech_tool import tts_full, tts_stream
+from ai_service.services.text_to_speech_tool import tts_full, tts_stream_bytes
 from ai_service.services.stt import transcribe_audio
+from ai_service.services.prerender import prerendered_path, prerendered_url
+from ai_service.services.audio_ingest import ingest_upload, ingest_stream, AudioDecodeError, REPEAT_PROMPT
 from ai_service.services.brain import SessionBrain
+from ai_service.services.speech_pipeline import speak
+from ai_service.services.executors import run_io
+from ai_service.services.live_session import LiveSession, decode_frame, FRAME_ENCODINGS
+from ai_service.services.asr import get_engine
 from ai_service.db import save_history, get_history
 
 router = APIRouter(prefix="/conversation")
@@ -22,11 +33,9 @@ def sse(event, data):
 
 
 # ---------------------------------------------------
-# START CONVERSATION
+# SHARED SESSION / TURN LOGIC (SSE + WebSocket)
 # ---------------------------------------------------
-@router.get("/start")
-async def start_conversation(patient_id: str, category: str):
-
+def open_session(patient_id: str, category: str) -> str:
     # Create session if first time
     if patient_id not in sessions:
         sessions[patient_id] = SessionBrain()
@@ -37,20 +46,97 @@ async def start_conversation(patient_id: str, category: str):
     # Save internally as "last question"
     sessions[patient_id].last_question = text
     sessions[patient_id].last_category = category
+    return text
+
+
+async def respond(session, patient_id: str, category: str, transcript: str, audio_format: str = "mp3"):
+    """
+    The AI side of a turn once the transcript is known. Yields ("sentence", str),
+    ("audio", raw bytes) and ("text", full reply) — or ("error", str) instead
+    of "text" when the reply failed (nothing is saved then).
+    """
+    # Each sentence goes to TTS as soon as the LLM finishes it; audio is
+    # streamed in order while later sentences are still generating.
+    save_task = None
+    tts = partial(tts_stream_bytes, audio_format=audio_format)
+    async for kind, data in speak(session.stream_user_message(transcript, category), tts):
+        if kind == "text":
+            # SAVE TO DATABASE (off the loop; audio keeps flowing)
+            save_task = asyncio.create_task(run_io(
+                save_history,
+                user_id=patient_id,
+                category=category,
+                question=session.last_question,
+                answer_text=data
+            ))
+        yield kind, data
+
+    if save_task:
+        try:
+            await save_task
+        except Exception as e:
+            print("DB SAVE ERROR:", e)
+
+
+async def speak_text(text: str, audio_format: str = "mp3"):
+    """Audio chunks for a fixed line: the pre-rendered mp3 when there is one, else streamed TTS."""
+    path = prerendered_path(text, "conversation") if audio_format == "mp3" else None
+    if path:
+        yield await run_io(Path(path).read_bytes)
+    else:
+        async for chunk in tts_stream_bytes(text, audio_format=audio_format):
+            yield chunk
+
+
+async def run_turn(session, patient_id: str, category: str, pcm, audio_format: str = "mp3"):
+    """One conversation turn on decoded PCM: ("transcript", str), then everything respond() yields."""
+    if not len(pcm):
+        # Nothing but silence: ask again instead of paying for ASR and the LLM
+        yield "transcript", ""
+        yield "sentence", REPEAT_PROMPT
+        async for chunk in speak_text(REPEAT_PROMPT, audio_format):
+            yield "audio", chunk
+        yield "text", REPEAT_PROMPT
+        return
 
-    # TTS output
+    transcript = await transcribe_audio(pcm)
+    yield "transcript", transcript
+
+    async for kind, data in respond(session, patient_id, category, transcript, audio_format):
+        yield kind, data
+
+
+# ---------------------------------------------------
+# START CONVERSATION
+# ---------------------------------------------------
+@router.get("/start")
+async def start_conversation(patient_id: str, category: str):
+
+    text = open_session(patient_id, category)
+
+    # TTS output (served from the pre-rendered bank when this opener is in it)
     audio_b64 = await tts_full(text)
 
     return {
         "question_id": "Q1",
         "first_question_text": text,
         "first_question_audio": audio_b64,
+        "first_question_audio_url": prerendered_url(text, "conversation"),
     }
 
 
 # ---------------------------------------------------
-# STREAMING REPLY (main conversation loop)
+# STREAMING REPLY (SSE fallback for the WebSocket below)
 # ---------------------------------------------------
+SSE_EVENTS = {
+    "transcript": "user_transcript",
+    "sentence": "next_question_sentence",
+    "text": "next_question",
+    "error": "error",
+}
+REPLY_FAILED = "Could not answer that — please try again."
+
+
 @router.post("/reply/stream")
 async def reply_stream(
     patient_id: str = Form(...),
@@ -66,61 +152,26 @@ async def reply_stream(
     async def stream_logic():
 
         # ---------------------------------------------------
-        # SAVE AUDIO → TRANSCRIBE
-        # ---------------------------------------------------
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-            tmp.write(await audio.read())
-            webm = tmp.name
-
-        wav = webm.replace(".webm", ".wav")
-        subprocess.run(
-            ["ffmpeg", "-i", webm, "-ar", "16000", "-ac", "1", wav, "-y"],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-        )
-
-        transcript = await transcribe_audio(wav)
-        yield sse("user_transcript", transcript)
-
-        # ---------------------------------------------------
-        # AI RESPONSE
-        # ---------------------------------------------------
-        next_q = await session.handle_user_message(transcript, category)
-        yield sse("next_question", next_q)
-
-        # ---------------------------------------------------
-        # SAVE TO DATABASE
+        # DECODE AUDIO (in memory) → TRANSCRIBE → REPLY → TTS
         # ---------------------------------------------------
         try:
-            save_history(
-                user_id=patient_id,
-                category=category,
-                question=session.last_question,
-                answer_text=next_q
-            )
-        except Exception as e:
-            print("DB SAVE ERROR:", e)
-
-        # ---------------------------------------------------
-        # STREAM TTS AUDIO
-        # ---------------------------------------------------
-        async for audio_bytes in tts_stream(next_q):
-
-            # audio_bytes must be bytes → ensure it
-            if isinstance(audio_bytes, str):
-                try:
-                    audio_bytes = base64.b64decode(audio_bytes)
-                except:
-                    audio_bytes = audio_bytes.encode("utf-8")
-
-            b64 = base64.b64encode(audio_bytes).decode("utf-8")
-
-            yield sse("audio_chunk", b64)
+            pcm = await ingest_upload(audio, archive_name=f"{patient_id}_{question_id}_{uuid.uuid4().hex}")
+        except AudioDecodeError as e:
+            logging.exception(f"❌ Audio decode failed ({patient_id}): {e}")
+            yield sse("error", "Could not read the recording.")
+            return
+
+        async for kind, data in run_turn(session, patient_id, category, pcm):
+            if kind == "audio":
+                # SSE is text-only: base64 once, straight from the raw TTS bytes
+                yield sse("audio_chunk", base64.b64encode(data).decode("utf-8"))
+            elif kind == "error":
+                yield sse("error", REPLY_FAILED)
+            else:
+                yield sse(SSE_EVENTS[kind], data)
 
         yield sse("audio_complete", "done")
 
-        os.remove(webm)
-        os.remove(wav)
-
     return StreamingResponse(
         stream_logic(),
         media_type="text/event-stream",
@@ -132,7 +183,216 @@ async def reply_stream(
     )
 
 
+# ---------------------------------------------------
+# WEBSOCKET (binary audio frames + JSON control)
+# ---------------------------------------------------
+# Client → server
+#   {"type": "start", "patient_id", "category", "audio_format"?}   mp3 (default) | opus | aac | pcm
+#   {"type": "audio_start", "question_id"?, "category"?, "ext"?}   then binary frames of the recording
+#   {"type": "audio_end"}                                          recording complete → run the turn
+#   {"type": "ping"}
+# Server → client
+#   JSON {"type": "question" | "user_transcript" | "next_question_sentence" | "next_question"
+#               | "audio_complete" | "error" | "pong", ...}
+#   binary frames: raw TTS audio in the negotiated format, in playback order
+async def _recording_frames(websocket: WebSocket):
+    """Binary frames until {"type": "audio_end"}; fed to ffmpeg as they arrive."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("bytes"):
+            yield message["bytes"]
+        elif message.get("text"):
+            if json.loads(message["text"]).get("type") == "audio_end":
+                return
+
+
+async def _receive_control(websocket: WebSocket):
+    """The next JSON control message, or None (after telling the client) for anything else."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("text") is None:
+        await websocket.send_json({"type": "error", "detail": "Unexpected binary frame — send audio_start first"})
+        return None
+    try:
+        return json.loads(message["text"])
+    except ValueError:
+        await websocket.send_json({"type": "error", "detail": "Control messages must be JSON"})
+        return None
+
+
+async def _send_audio(websocket: WebSocket, text: str, audio_format: str):
+    async for chunk in speak_text(text, audio_format):
+        await websocket.send_bytes(chunk)
+    await websocket.send_json({"type": "audio_complete"})
+
+
+@router.websocket("/ws")
+async def conversation_ws(websocket: WebSocket):
+    await websocket.accept()
+    patient_id = category = None
+    audio_format = "mp3"
+
+    try:
+        while True:
+            message = await _receive_control(websocket)
+            if message is None:
+                continue
+            kind = message.get("type")
+
+            if kind == "ping":
+                await websocket.send_json({"type": "pong"})
+
+            elif kind == "start":
+                if not message.get("patient_id") or not message.get("category"):
+                    await websocket.send_json({"type": "error", "detail": "start needs patient_id and category"})
+                    continue
+                patient_id = message["patient_id"]
+                category = message["category"]
+                audio_format = message.get("audio_format", audio_format)
+                text = open_session(patient_id, category)
+                await websocket.send_json({
+                    "type": "question",
+                    "question_id": "Q1",
+                    "text": text,
+                    "audio_url": prerendered_url(text, "conversation"),
+                })
+                await _send_audio(websocket, text, audio_format)
+
+            elif kind == "audio_start":
+                session = sessions.get(patient_id)
+                if not session:
+                    await websocket.send_json({"type": "error", "detail": "NO SESSION — send start first"})
+                    continue
+                category = message.get("category", category)
+                question_id = message.get("question_id", "")
+                try:
+                    pcm = await ingest_stream(
+                        _recording_frames(websocket),
+                        archive_name=f"{patient_id}_{question_id}_{uuid.uuid4().hex}",
+                        ext=message.get("ext", ".webm"),
+                    )
+                except AudioDecodeError as e:
+                    logging.exception(f"❌ Audio decode failed ({patient_id}): {e}")
+                    await websocket.send_json({"type": "error", "detail": "Could not read the recording."})
+                    continue
+
+                try:
+                    async for event, data in run_turn(session, patient_id, category, pcm, audio_format):
+                        if event == "audio":
+                            await websocket.send_bytes(data)
+                        elif event == "error":
+                            await websocket.send_json({"type": "error", "detail": REPLY_FAILED})
+                        else:
+                            await websocket.send_json({"type": SSE_EVENTS[event], "text": data})
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    logging.exception(f"❌ WebSocket turn failed ({patient_id}): {e}")
+                    await websocket.send_json({"type": "error", "detail": REPLY_FAILED})
+                    continue
+                await websocket.send_json({"type": "audio_complete"})
+
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+
+    except WebSocketDisconnect:
+        pass
+
 
+# ---------------------------------------------------
+# LIVE (full duplex: audio in while the patient speaks)
+# ---------------------------------------------------
+# Client → server
+#   {"type": "start", "patient_id", "category", "audio_format"?, "encoding"?}   encoding: pcm16 (default) | f32
+#   binary frames: 16 kHz mono PCM, continuously (e.g. 20–100 ms per frame)
+#   {"type": "stop"} · {"type": "ping"}
+# Server → client (JSON) speech_start · partial_transcript · user_transcript · next_question_sentence
+#   · next_question · audio_complete · interrupted · no_speech · turn_metrics · error — plus binary TTS frames
+def _json_object(text):
+    """`text` parsed as a JSON object, or None (not text, not JSON, or not an object)."""
+    try:
+        message = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    return message if isinstance(message, dict) else None
+
+
+async def _live_start(websocket: WebSocket) -> dict:
+    """The first valid start message; anything before it gets an error and the socket stays open."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        start = _json_object(message.get("text"))
+        if start is None or start.get("type") != "start":
+            detail = "First message must be start"
+        elif not start.get("patient_id") or not start.get("category"):
+            detail = "start needs patient_id and category"
+        elif start.get("encoding", "pcm16") not in FRAME_ENCODINGS:
+            detail = f"Unknown encoding {start['encoding']!r} — use one of: {', '.join(FRAME_ENCODINGS)}"
+        else:
+            return start
+        await websocket.send_json({"type": "error", "detail": detail})
+
+
+@router.websocket("/live")
+async def conversation_live(websocket: WebSocket):
+    await websocket.accept()
+    live = None
+
+    try:
+        start = await _live_start(websocket)
+        patient_id = start["patient_id"]
+        category = start["category"]
+        audio_format = start.get("audio_format", "mp3")
+        encoding = start.get("encoding", "pcm16")
+
+        text = open_session(patient_id, category)
+        session = sessions[patient_id]
+
+        live = LiveSession(
+            websocket.send_json,
+            websocket.send_bytes,
+            partial(respond, session, patient_id, category, audio_format=audio_format),
+            get_engine("conversation"),
+        )
+        await live.send_json({"type": "question", "question_id": "Q1", "text": text,
+                              "audio_url": prerendered_url(text, "conversation")})
+        # The loop below has not started yet, so nothing else is writing to the socket
+        await _send_audio(websocket, text, audio_format)
+
+        # A bad frame or control message gets an error back; the session carries on
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                try:
+                    samples = decode_frame(message["bytes"], encoding)
+                except ValueError as e:
+                    await live.send_json({"type": "error", "detail": str(e)})
+                    continue
+                await live.feed(samples)
+            elif message.get("text"):
+                control = _json_object(message["text"])
+                kind = control.get("type") if control else None
+                if kind == "stop":
+                    break
+                if kind == "ping":
+                    await live.send_json({"type": "pong"})
+                elif control is None:
+                    await live.send_json({"type": "error", "detail": "Control messages must be JSON objects"})
+                else:
+                    await live.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if live:
+            await live.close()
 
 
 # ---------------------------------------------------
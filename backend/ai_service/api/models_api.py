@@ -0,0 +1,35 @@
+from fastapi import APIRouter
+from ai_service import model_registry
+from ai_service.services.inference_batcher import batcher_stats
+from ai_service.services.asr import asr_stats
+from ai_service.services.tts_cache import tts_cache
+from ai_service.services.audio_ingest import ingest_stats
+from ai_service.services.providers import provider_stats
+from ai_service.services.context_window import context_stats
+from ai_service.services.turn_pipeline import pipeline_stats
+from ai_service.services.emotion_cascade import cascade_stats
+from ai_service.services.speculation import speculation_stats
+from ai_service.services.memory_store import memory_stats
+from ai_service.profile_manager import profile_stats
+from ai_service.services.memory_index import index_stats
+
+router = APIRouter(prefix="/models")
+
+
+@router.get("")
+async def list_resident_models():
+    """Which local models are loaded in this worker, and how much memory they use."""
+    report = model_registry.resident_models()
+    report["batchers"] = batcher_stats()
+    report["asr"] = asr_stats()
+    report["tts_cache"] = tts_cache.stats()
+    report["ingest"] = ingest_stats()
+    report["providers"] = provider_stats()
+    report["context"] = context_stats()
+    report["pipelines"] = pipeline_stats()
+    report["emotion_cascade"] = cascade_stats()
+    report["speculation"] = speculation_stats()
+    report["memory"] = memory_stats()
+    report["profiles"] = profile_stats()
+    report["memory_index"] = index_stats()
+    return report
@@ -0,0 +1,215 @@
+# ai_service/config/settings.py
+"""
+Runtime settings for the AI service, read from the environment (.env).
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _csv(name: str, default: str = "") -> list:
+    return [v.strip() for v in os.getenv(name, default).split(",") if v.strip()]
+
+
+# =========================================================
+# 📦 MODELS
+# =========================================================
+# Registry keys to load at startup instead of on first request (see model_registry.MODEL_SPECS)
+PRELOAD_MODELS = _csv("MIMIR_PRELOAD_MODELS")
+
+# "torch" (default) or "onnx" — int8 ONNX Runtime for the emotion/sentiment classifiers
+CLASSIFIER_BACKEND = os.getenv("MIMIR_CLASSIFIER_BACKEND", "torch").lower()
+ONNX_CACHE_DIR = os.getenv(
+    "MIMIR_ONNX_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "storage", "onnx")
+)
+# optimum AutoQuantizationConfig preset (avx2, avx512, avx512_vnni, arm64); empty = pick by CPU
+ONNX_QUANT_CONFIG = os.getenv("MIMIR_ONNX_QUANT_CONFIG", "")
+
+# =========================================================
+# 💬 EMOTION TOOL
+# =========================================================
+EMOTION_CACHE_SIZE = int(os.getenv("MIMIR_EMOTION_CACHE_SIZE", "2048"))
+EMOTION_BATCH_SIZE = int(os.getenv("MIMIR_EMOTION_BATCH_SIZE", "16"))
+# Local DistilRoBERTa answer is used when its (mapped) score reaches this; below it the LLM decides
+EMOTION_LOCAL_THRESHOLD = float(os.getenv("MIMIR_EMOTION_LOCAL_THRESHOLD", "0.7"))
+
+# =========================================================
+# 📦 MICRO-BATCHING (text classifiers)
+# =========================================================
+BATCH_MAX_SIZE = int(os.getenv("MIMIR_BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("MIMIR_BATCH_MAX_WAIT_MS", "5"))
+# Requests are bucketed by character length / this width before each forward pass
+BATCH_BUCKET_WIDTH = int(os.getenv("MIMIR_BATCH_BUCKET_WIDTH", "64"))
+
+# =========================================================
+# 🧵 EXECUTORS
+# =========================================================
+# "thread" (default) or "process" pool for torch / Whisper / local LLM work.
+# Threads share this process's single copy of each model (torch releases the GIL
+# in forward passes); each process worker loads its own copy of the models it uses.
+CPU_EXECUTOR = os.getenv("MIMIR_CPU_EXECUTOR", "thread").lower()
+CPU_WORKERS = int(os.getenv("MIMIR_CPU_WORKERS", "2"))
+IO_WORKERS = int(os.getenv("MIMIR_IO_WORKERS", "16"))
+# Blocking provider SDK calls (sync ElevenLabs / OpenAI / Gemini) get their own threads:
+# a call queued on a provider's concurrency limit must not hold a thread file IO needs
+PROVIDER_WORKERS = int(os.getenv("MIMIR_PROVIDER_WORKERS", "8"))
+LOOP_LAG_INTERVAL_MS = float(os.getenv("MIMIR_LOOP_LAG_INTERVAL_MS", "100"))
+LOOP_LAG_WARN_MS = float(os.getenv("MIMIR_LOOP_LAG_WARN_MS", "20"))
+
+# =========================================================
+# 🎧 LONG-AUDIO TRANSCRIPTION
+# =========================================================
+# Recordings longer than one window are cut into overlapping windows,
+# transcribed in one batched call and stitched back together.
+ASR_SAMPLE_RATE = 16000
+ASR_WINDOW_S = float(os.getenv("MIMIR_ASR_WINDOW_S", "30"))
+ASR_OVERLAP_S = float(os.getenv("MIMIR_ASR_OVERLAP_S", "4"))
+ASR_BATCH_SIZE = int(os.getenv("MIMIR_ASR_BATCH_SIZE", "8"))
+
+# =========================================================
+# 🗣️ ASR ENGINES
+# =========================================================
+# Default engine for every flow: faster_whisper (local int8 CTranslate2),
+# hf_whisper, openai_whisper (local package) or openai_api (whisper-1).
+ASR_ENGINE = os.getenv("MIMIR_ASR_ENGINE", "faster_whisper").lower()
+# Per-flow overrides, e.g. "conversation=openai_api,about_you=hf_whisper"
+ASR_FLOW_ENGINES = dict(item.split("=", 1) for item in _csv("MIMIR_ASR_FLOW_ENGINES") if "=" in item)
+ASR_LANGUAGE = os.getenv("MIMIR_ASR_LANGUAGE", "en")
+ASR_BEAM_SIZE = int(os.getenv("MIMIR_ASR_BEAM_SIZE", "1"))
+
+# =========================================================
+# 📥 AUDIO INGEST
+# =========================================================
+# Uploads are decoded in memory through an ffmpeg pipe. Set a directory to
+# also keep the original upload bytes on disk (off by default).
+AUDIO_ARCHIVE_DIR = os.getenv("MIMIR_AUDIO_ARCHIVE_DIR", "")
+# Decoding must finish this long after the recording's last byte (however long the recording is)
+AUDIO_DECODE_TIMEOUT_S = float(os.getenv("MIMIR_AUDIO_DECODE_TIMEOUT_S", "30"))
+# A streamed recording (WebSocket frames, upload reads) is abandoned after this long without a chunk
+AUDIO_IDLE_TIMEOUT_S = float(os.getenv("MIMIR_AUDIO_IDLE_TIMEOUT_S", "15"))
+
+# =========================================================
+# 🔊 TTS CACHE
+# =========================================================
+# Synthesized audio keyed by hash(text, voice, model, format); least recently
+# used files are evicted once the directory exceeds the size cap.
+TTS_CACHE_DIR = os.getenv(
+    "MIMIR_TTS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "storage", "tts_cache")
+)
+TTS_CACHE_MAX_MB = float(os.getenv("MIMIR_TTS_CACHE_MAX_MB", "512"))
+# Offline-rendered question bank (python -m ai_service.services.prerender); never evicted
+PRERENDER_DIR = os.getenv(
+    "MIMIR_PRERENDER_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "storage", "prerendered")
+)
+
+# =========================================================
+# 🗣️ LLM → TTS PIPELINE
+# =========================================================
+# Sentences shorter than this are merged into the next one before TTS
+SENTENCE_MIN_CHARS = int(os.getenv("MIMIR_SENTENCE_MIN_CHARS", "20"))
+# How many sentences may be synthesizing ahead of the one being played
+TTS_PIPELINE_LOOKAHEAD = int(os.getenv("MIMIR_TTS_PIPELINE_LOOKAHEAD", "2"))
+
+# =========================================================
+# 🎚️ VAD + LIVE SESSIONS
+# =========================================================
+VAD_FRAME_MS = int(os.getenv("MIMIR_VAD_FRAME_MS", "30"))
+# A frame is speech when it is this many dB above the tracked noise floor...
+VAD_MARGIN_DB = float(os.getenv("MIMIR_VAD_MARGIN_DB", "10"))
+# ...and above this absolute level (dBFS)
+VAD_MIN_DB = float(os.getenv("MIMIR_VAD_MIN_DB", "-50"))
+# Uploads whose level hardly varies (steady room noise, or unbroken speech) are speech only above this
+VAD_SPEECH_DB = float(os.getenv("MIMIR_VAD_SPEECH_DB", "-35"))
+VAD_START_MS = int(os.getenv("MIMIR_VAD_START_MS", "90"))
+# Uploads: silence is trimmed before ASR, keeping this much around each stretch of speech
+VAD_TRIM_UPLOADS = os.getenv("MIMIR_VAD_TRIM_UPLOADS", "1") == "1"
+VAD_PAD_MS = int(os.getenv("MIMIR_VAD_PAD_MS", "200"))
+# Live (/conversation/live): a short pause closes an ASR segment, a long one ends the turn
+LIVE_PAUSE_MS = int(os.getenv("MIMIR_LIVE_PAUSE_MS", "300"))
+LIVE_END_MS = int(os.getenv("MIMIR_LIVE_END_MS", "700"))
+LIVE_MAX_SEGMENT_S = float(os.getenv("MIMIR_LIVE_MAX_SEGMENT_S", "8"))
+LIVE_PREROLL_MS = int(os.getenv("MIMIR_LIVE_PREROLL_MS", "200"))
+
+# =========================================================
+# 🌐 PROVIDER CLIENTS (OpenAI, ElevenLabs, Gemini)
+# =========================================================
+# One pooled HTTP/2 client per process, shared by every provider SDK
+HTTP2 = os.getenv("MIMIR_HTTP2", "1") == "1"
+HTTP_MAX_CONNECTIONS = int(os.getenv("MIMIR_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("MIMIR_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("MIMIR_HTTP_KEEPALIVE_EXPIRY_S", "120"))
+HTTP_CONNECT_TIMEOUT_S = float(os.getenv("MIMIR_HTTP_CONNECT_TIMEOUT_S", "5"))
+HTTP_TIMEOUT_S = float(os.getenv("MIMIR_HTTP_TIMEOUT_S", "60"))
+# In-flight requests per provider (queued beyond this); keeps one slow provider from
+# taking every pooled connection and stays under the account's rate limits
+OPENAI_CONCURRENCY = int(os.getenv("MIMIR_OPENAI_CONCURRENCY", "16"))
+ELEVENLABS_CONCURRENCY = int(os.getenv("MIMIR_ELEVENLABS_CONCURRENCY", "4"))
+# Open TLS connections to the providers at startup so the first turn does not pay for them
+PROVIDER_WARMUP = os.getenv("MIMIR_PROVIDER_WARMUP", "1") == "1"
+# After a reply, keep the pooled OpenAI connection open this long for the patient's next turn
+PROVIDER_KEEPALIVE_S = float(os.getenv("MIMIR_PROVIDER_KEEPALIVE_S", "600"))
+# Gemini (google-generativeai has its own gRPC transport; capped separately)
+GEMINI_CONCURRENCY = int(os.getenv("MIMIR_GEMINI_CONCURRENCY", "8"))
+GEMINI_TIMEOUT_S = float(os.getenv("MIMIR_GEMINI_TIMEOUT_S", "30"))
+
+# =========================================================
+# 🧮 CONVERSATION CONTEXT (SessionBrain)
+# =========================================================
+# User/assistant exchanges kept verbatim; older ones are folded into a running summary
+CONTEXT_KEEP_TURNS = int(os.getenv("MIMIR_CONTEXT_KEEP_TURNS", "6"))
+# Hard cap on the prompt sent to the LLM (system + summary + turns)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("MIMIR_CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("MIMIR_CONTEXT_SUMMARY_TOKENS", "200"))
+# tiktoken encoding of the chat model (gpt-4o-mini → o200k_base)
+CONTEXT_TOKENIZER = os.getenv("MIMIR_CONTEXT_TOKENIZER", "o200k_base")
+
+# =========================================================
+# 🔀 TURN PIPELINE (per-turn stage orchestrator)
+# =========================================================
+# Default per-stage timeout; classifier stages use the shorter one and fall back to neutral
+STAGE_TIMEOUT_S = float(os.getenv("MIMIR_STAGE_TIMEOUT_S", "30"))
+ANALYSIS_TIMEOUT_S = float(os.getenv("MIMIR_ANALYSIS_TIMEOUT_S", "5"))
+
+# =========================================================
+# 🔮 SPECULATIVE NEXT TURN
+# =========================================================
+# Precompute likely next questions (and their audio) while the patient listens and answers
+SPECULATE = os.getenv("MIMIR_SPECULATE", "1") == "1"
+
+# =========================================================
+# 🧠 MEMORY STORE (MemoryManager persistence)
+# =========================================================
+# "log": append-only JSONL + periodic snapshot (constant cost per write); "json": rewrite one file
+MEMORY_BACKEND = os.getenv("MIMIR_MEMORY_BACKEND", "log")
+# Log records between snapshots (compaction rewrites the state once, then truncates the log)
+MEMORY_COMPACT_EVERY = int(os.getenv("MIMIR_MEMORY_COMPACT_EVERY", "1000"))
+# fsync every write (survives power loss, not just a process crash); costs a disk flush per turn
+MEMORY_FSYNC = os.getenv("MIMIR_MEMORY_FSYNC", "0") == "1"
+# Changes are applied in memory at once and written together at most this long after the first
+MEMORY_FLUSH_INTERVAL_MS = float(os.getenv("MIMIR_MEMORY_FLUSH_INTERVAL_MS", "200"))
+# Global memories (reflections): newest entries kept, and entries per on-disk segment
+MEMORY_MAX_ENTRIES = int(os.getenv("MIMIR_MEMORY_MAX_ENTRIES", "10000"))
+MEMORY_SEGMENT_ENTRIES = int(os.getenv("MIMIR_MEMORY_SEGMENT_ENTRIES", "1000"))
+
+# =========================================================
+# 👤 USER PROFILES (profile_manager)
+# =========================================================
+# One JSON file per user (relative to the working directory, like the old user_profiles.json)
+PROFILE_DIR = os.getenv("MIMIR_PROFILE_DIR", "user_profiles")
+# Cached profiles are re-read after this long (or as soon as their file changes)
+PROFILE_CACHE_TTL_S = float(os.getenv("MIMIR_PROFILE_CACHE_TTL_S", "300"))
+
+# =========================================================
+# 🧭 SEMANTIC MEMORY (services/memory_index)
+# =========================================================
+# Embed every patient turn and reflection (all-MiniLM-L12-v2) and recall related ones by meaning
+MEMORY_INDEX = os.getenv("MIMIR_MEMORY_INDEX", "1") == "1"
+# Related memories added to the question prompt, and the cosine similarity they must reach
+MEMORY_RECALL_K = int(os.getenv("MIMIR_MEMORY_RECALL_K", "3"))
+MEMORY_RECALL_MIN_SCORE = float(os.getenv("MIMIR_MEMORY_RECALL_MIN_SCORE", "0.35"))
+# Patient indexes kept in memory (least recently used ones are dropped and reloaded from disk)
+MEMORY_INDEX_OPEN = int(os.getenv("MIMIR_MEMORY_INDEX_OPEN", "256"))
@@ -12,3 +12,17 @@ def get_emotion(text: str):
     if "error" in result:
         return {"dominant_emotion": "unknown", "error": result["error"]}
     return result
+
+def get_emotions(texts: list):
+    """Batched get_emotion(): one forward pass for all uncached texts."""
+    return [
+        {"dominant_emotion": "unknown", "error": r["error"]} if "error" in r else r
+        for r in _emotion_tool.run_many(texts)
+    ]
+
+async def get_emotion_async(text: str):
+    """Async get_emotion(); concurrent callers are micro-batched into one forward pass."""
+    result = await _emotion_tool.arun(text)
+    if "error" in result:
+        return {"dominant_emotion": "unknown", "error": result["error"]}
+    return result
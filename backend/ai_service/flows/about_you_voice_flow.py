@@ -1,11 +1,15 @@
 # ai_service/about_you_voice_flow.py
 import os, uuid, json, random, logging
+from pathlib import Path
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from transformers import pipeline
-from elevenlabs import ElevenLabs
-import google.generativeai as genai
+from ai_service import model_registry
+from ai_service.services.providers import agemini
 from ai_service.memory_manager import MemoryManager
 from ai_service.agents import get_next_question
+from ai_service.services.executors import run_cpu, run_io, run_provider
+from ai_service.services.asr import get_engine
+from ai_service.services.audio_ingest import ingest_bytes, REPEAT_PROMPT
+from ai_service.services.tts_cache import aelevenlabs_tts, publish
 
 router = APIRouter(prefix="/about_you", tags=["About You Flow"])
 memory = MemoryManager()
@@ -19,24 +23,20 @@ TTS_DIR = os.path.join(BASE_DIR, "tts")
 os.makedirs(INPUT_DIR, exist_ok=True)
 os.makedirs(TTS_DIR, exist_ok=True)
 
-ELEVEN_API_KEY = os.getenv("ELEVENLABS_API_KEY")
-GEMINI_KEY = os.getenv("GOOGLE_API_KEY")
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
-genai.configure(api_key=GEMINI_KEY)
-
-emotion_model = pipeline(
-    "text-classification",
-    model="j-hartmann/emotion-english-distilroberta-base",
-    device=-1
-)
-asr_model = pipeline(
-    "automatic-speech-recognition",
-    model="openai/whisper-tiny",
-    device=-1
-)
+emotion_model = model_registry.handle("emotion")
+asr_engine = get_engine("about_you")
 
 QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "knowledge", "about_you_questions.json")
 
+# =========================================================
+# 🧰 HELPERS
+# =========================================================
+async def _synthesize(text: str, prefix: str) -> str:
+    """ElevenLabs TTS (cached, async SDK) → mp3 in TTS_DIR; returns the served filename."""
+    cached = await aelevenlabs_tts(text, "EXAVITQu4vr4xnSDxMaL")
+    return os.path.basename(await run_io(publish, cached, TTS_DIR, prefix))
+
+
 # =========================================================
 # 🔊 START ROUTE
 # =========================================================
@@ -49,17 +49,7 @@ async def start_about_you():
         first = sorted(questions, key=lambda q: q["priority"])[0]
         q_text = random.choice(first["prompt_variants"])
 
-        stream = client.text_to_speech.convert(
-            voice_id="EXAVITQu4vr4xnSDxMaL",
-            model_id="eleven_multilingual_v2",
-            text=q_text
-        )
-        filename = f"q_{uuid.uuid4().hex}.mp3"
-        output_path = os.path.join(TTS_DIR, filename)
-        with open(output_path, "wb") as f:
-            for chunk in stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
+        filename = await _synthesize(q_text, "q_")
 
         return {
             "question_id": first["id"],
@@ -83,62 +73,57 @@ async def about_you_reply(
     try:
         # 1️⃣ Save uploaded audio
         audio_path = os.path.join(INPUT_DIR, f"user_{uuid.uuid4().hex}.wav")
-        with open(audio_path, "wb") as f:
-            f.write(await audio.read())
-
-        # 2️⃣ Transcribe and detect emotion
-        text = asr_model(audio_path)["text"].strip()
-        emotion = emotion_model(text)[0]["label"].lower()
-
-        # 3️⃣ Generate empathetic AI reply
-        model = genai.GenerativeModel("models/gemini-2.0-pro")
+        data = await audio.read()
+        await run_io(Path(audio_path).write_bytes, data)
+
+        # 2️⃣ Trim silence; nothing said → ask again, skipping ASR, emotion and Gemini
+        speech = await ingest_bytes(data, label=os.path.basename(audio_path))
+        if not len(speech):
+            repeat_audio_file = await _synthesize(REPEAT_PROMPT, "next_")
+            return {
+                "user_text": "",
+                "emotion": None,
+                "ai_reply": "",
+                "ai_audio_url": None,
+                "next_question": REPEAT_PROMPT,
+                "next_audio_url": f"http://127.0.0.1:8000/storage/about_you/tts/{repeat_audio_file}"
+            }
+
+        # 3️⃣ Transcribe and detect emotion
+        text = (await asr_engine.atranscribe(speech))["text"]
+        emotion = (await run_cpu(emotion_model, text))[0]["label"].lower()
+
+        # 4️⃣ Generate empathetic AI reply
         prompt = f"The person said '{text}' and feels {emotion}. Respond compassionately and ask one gentle follow-up."
-        response = model.generate_content(prompt)
-        ai_reply = response.text.strip()
-
-        # 4️⃣ Convert AI reply to speech
-        stream = client.text_to_speech.convert(
-            voice_id="EXAVITQu4vr4xnSDxMaL",
-            model_id="eleven_multilingual_v2",
-            text=ai_reply
-        )
-        reply_audio_file = os.path.join(TTS_DIR, f"reply_{uuid.uuid4().hex}.mp3")
-        with open(reply_audio_file, "wb") as f:
-            for chunk in stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
+        ai_reply = await agemini(prompt)
 
-        # 5️⃣ Save turn to memory
-        memory.add_turn(user_id, text, ai_reply, emotion)
+        # 5️⃣ Convert AI reply to speech
+        reply_audio_file = await _synthesize(ai_reply, "reply_")
 
-        # 6️⃣ Generate next adaptive question via CrewAI
-        crew_result = get_next_question(
+        # 6️⃣ Save turn to memory
+        await run_io(memory.add_turn, user_id, text, ai_reply, emotion)
+        await memory.aremember(user_id, text, kind="turn", emotion=emotion, question=ai_reply)
+
+        # 7️⃣ Generate next adaptive question via CrewAI
+        crew_result = await run_provider(
+            get_next_question,
             user_id=user_id,
             last_response=text,
             detected_emotion=emotion
         )
         next_question = crew_result["next_question"]
 
-        # 7️⃣ Convert next question to speech
-        next_audio_stream = client.text_to_speech.convert(
-            voice_id="EXAVITQu4vr4xnSDxMaL",
-            model_id="eleven_multilingual_v2",
-            text=next_question
-        )
-        next_audio_file = os.path.join(TTS_DIR, f"next_{uuid.uuid4().hex}.mp3")
-        with open(next_audio_file, "wb") as f:
-            for chunk in next_audio_stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
+        # 8️⃣ Convert next question to speech
+        next_audio_file = await _synthesize(next_question, "next_")
 
-        # 8️⃣ Return all outputs
+        # 9️⃣ Return all outputs
         return {
             "user_text": text,
             "emotion": emotion,
             "ai_reply": ai_reply,
-            "ai_audio_url": f"http://127.0.0.1:8000/storage/about_you/tts/{os.path.basename(reply_audio_file)}",
+            "ai_audio_url": f"http://127.0.0.1:8000/storage/about_you/tts/{reply_audio_file}",
             "next_question": next_question,
-            "next_audio_url": f"http://127.0.0.1:8000/storage/about_you/tts/{os.path.basename(next_audio_file)}"
+            "next_audio_url": f"http://127.0.0.1:8000/storage/about_you/tts/{next_audio_file}"
         }
 
     except Exception as e:
@@ -2,16 +2,25 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from keybert import KeyBERT
+from ai_service import model_registry
 
 router = APIRouter(prefix="/keywords", tags=["Keyword Extraction API"])
 
 class KeywordRequest(BaseModel):
     text: str
 
-kw_model = KeyBERT(model="all-MiniLM-L6-v2")
+sentence_encoder = model_registry.handle("minilm_l6")
+_kw_model = None
+
+
+def get_kw_model():
+    global _kw_model
+    if _kw_model is None:
+        _kw_model = KeyBERT(model=sentence_encoder.get())
+    return _kw_model
 
 @router.post("/")
 def extract_keywords(request: KeywordRequest):
-    keywords = kw_model.extract_keywords(request.text, keyphrase_ngram_range=(1, 2), stop_words="english", top_n=5)
+    keywords = get_kw_model().extract_keywords(request.text, keyphrase_ngram_range=(1, 2), stop_words="english", top_n=5)
     formatted = [{"keyword": kw, "score": round(score, 3)} for kw, score in keywords]
     return {"keywords": formatted}
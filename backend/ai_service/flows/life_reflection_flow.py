@@ -1,11 +1,13 @@
 import os
 import uuid
 import logging
+from pathlib import Path
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from ai_service.tasks.about_you_tasks import execute_about_you_voice_task
 from ai_service.memory_manager import MemoryManager
+from ai_service.services.executors import run_io, run_provider
 
 router = APIRouter(prefix="/ai/life_reflection", tags=["Life Reflection Flow"])
 memory = MemoryManager()
@@ -75,13 +77,13 @@ async def reflection_reply(
     """
     try:
         input_path = os.path.join(INPUT_DIR, f"reflection_{uuid.uuid4().hex}.wav")
-        with open(input_path, "wb") as f:
-            f.write(await audio.read())
+        await run_io(Path(input_path).write_bytes, await audio.read())
 
-        result = execute_about_you_voice_task(question_id, input_path)
+        result = await run_provider(execute_about_you_voice_task, question_id, input_path)
 
         # Add to memory
-        memory.add_turn(
+        await run_io(
+            memory.add_turn,
             user_id,
             result.get("ai_reply", ""),
             result.get("next_question_text", ""),
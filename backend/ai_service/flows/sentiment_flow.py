@@ -1,7 +1,7 @@
 # ai_service/flows/sentiment_flow.py
 from fastapi import APIRouter
 from pydantic import BaseModel
-from transformers import pipeline
+from ai_service import model_registry
 
 router = APIRouter(prefix="/sentiment", tags=["Sentiment API"])
 
@@ -9,8 +9,8 @@ router = APIRouter(prefix="/sentiment", tags=["Sentiment API"])
 class SentimentRequest(BaseModel):
     text: str
 
-# Load Hugging Face sentiment model once
-sentiment_analyzer = pipeline("sentiment-analysis")
+# Shared DistilBERT SST-2 model (the "sentiment-analysis" default)
+sentiment_analyzer = model_registry.handle("sentiment")
 
 @router.post("/predict")
 def analyze_sentiment(request: SentimentRequest):
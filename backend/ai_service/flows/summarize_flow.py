@@ -1,7 +1,7 @@
 # ai_service/flows/summarize_flow.py
 from fastapi import APIRouter
 from pydantic import BaseModel
-from transformers import pipeline
+from ai_service import model_registry
 
 router = APIRouter(prefix="/summarize", tags=["Summarization API"])
 
@@ -9,7 +9,7 @@ class SummarizeRequest(BaseModel):
     text: str
 
 # Load summarization model
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+summarizer = model_registry.handle("summarizer_cnn")
 
 @router.post("/")
 def summarize_text(request: SummarizeRequest):
@@ -1,10 +1,12 @@
 # ai_service/flows/voice_flow.py
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from transformers import pipeline
+from ai_service.services.asr import get_engine
 import tempfile
 
 router = APIRouter(prefix="/voice", tags=["Voice Processing"])
 
+transcriber = get_engine("voice")
+
 @router.post("/")
 async def transcribe_voice(file: UploadFile = File(...)):
     """Transcribe uploaded voice recording into text."""
@@ -13,9 +15,8 @@ async def transcribe_voice(file: UploadFile = File(...)):
             tmp.write(await file.read())
             tmp_path = tmp.name
 
-        transcriber = pipeline("automatic-speech-recognition", model="openai/whisper-base")
-        result = transcriber(tmp_path)
+        result = await transcriber.atranscribe(tmp_path)
 
-        return {"transcription": result["text"]}
+        return {"transcription": result["text"], "rtf": result["rtf"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,4 +1,5 @@
 import os
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -30,20 +31,54 @@ app.mount("/storage", StaticFiles(directory=AUDIO_STORAGE_PATH), name="storage")
 
 # Routers
 from ai_service.api.conversation_api import router as conversation_router
+from ai_service.api.models_api import router as models_router
 app.include_router(conversation_router)
 app.include_router(history_router)
+app.include_router(models_router)
 @app.get("/")
 def root():
     return {"message": "Mimir AI running with Anthropic Claude only."}
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    from ai_service.services.executors import loop_monitor
+    return {"status": "ok", "event_loop_lag": loop_monitor.stats()}
 
 @app.on_event("startup")
 async def startup_event():
+    from ai_service import model_registry
+    from ai_service.config.settings import PRELOAD_MODELS, CPU_EXECUTOR, PROVIDER_WARMUP
+    from ai_service.services.executors import loop_monitor, run_cpu, run_io
+    from ai_service.services.tts_cache import tts_cache
+    from ai_service.services import providers
+    from ai_service.tools.emotion_tool import EmotionTool
+    # In process mode the CPU pool workers hold the models, not this process
+    if CPU_EXECUTOR != "process":
+        model_registry.preload(PRELOAD_MODELS)
+    # Every turn classifies emotion: load the classifier and run one forward pass
+    # now (in the CPU pool, where turns run it) so the first turn does not pay for it
+    try:
+        await run_cpu(EmotionTool().warmup)
+    except Exception as e:
+        logging.warning(f"⚠️ Emotion classifier warm-up failed: {e}")
+    # TTS cache index and pre-rendered manifest: read once here, not on a request's loop turn
+    await run_io(tts_cache.load)
+    loop_monitor.start()
+    # Shared provider pool (OpenAI, ElevenLabs): open the TLS connections now
+    providers.http_client()
+    if PROVIDER_WARMUP:
+        await providers.warm()
     print("✅ Anthropic-only backend initialized")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    from ai_service.services import executors, providers, memory_store
+    await executors.loop_monitor.stop()
+    await providers.aclose()
+    # Queued MemoryManager writes (debounced) go to disk before the workers stop
+    memory_store.flush_all()
+    executors.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,15 +1,52 @@
-import json
 import os
 import logging
+import threading
 from datetime import datetime
 
+from ai_service.services.memory_store import open_store, open_collection
+from ai_service.services.memory_index import open_index, add_to_index
+from ai_service.services.executors import run_cpu
+from ai_service.config.settings import MEMORY_RECALL_K
+
+# One manager per set of files in this process (agents, tools and flows all call MemoryManager())
+_instances = {}
+_instances_lock = threading.RLock()
+
 
 class MemoryManager:
     """
     A lightweight JSON-based conversation memory manager.
     Handles both short-term (per-user session) and long-term (global summary) memories.
+
+    State lives in memory; every change is persisted as one record through a
+    pluggable store (services/memory_store.py, MIMIR_MEMORY_BACKEND), so a
+    turn costs one appended log line instead of a rewrite of every user.
+    MemoryManager() with the same files returns the same instance, and the
+    store keeps uvicorn workers sharing those files in sync.
+
+    What a patient says can also be embedded into a per-patient semantic
+    index (services/memory_index.py) under <base_dir>/vectors, so
+    recall_related() can find older memories the session window has dropped.
+    The flows add to it with aremember(); add_turn() only stores the turn.
     """
 
+    def __new__(
+        cls,
+        base_dir="/home/ubuntu/Mimir/ai_service/supermemory",
+        memory_file="session_memory.json",
+        global_file="memories.json",
+        max_turns=5,
+    ):
+        key = (os.path.abspath(os.path.join(base_dir, memory_file)), os.path.abspath(os.path.join(base_dir, global_file)))
+        with _instances_lock:
+            instance = _instances.get(key)
+            if instance is None:
+                instance = _instances[key] = super().__new__(cls)
+                instance._initialized = False
+            elif instance.max_turns != max_turns:
+                logging.warning(f"⚠️ MemoryManager for {key[0]} already open with max_turns={instance.max_turns}")
+            return instance
+
     def __init__(
         self,
         base_dir="/home/ubuntu/Mimir/ai_service/supermemory",
@@ -17,6 +54,13 @@ class MemoryManager:
         global_file="memories.json",
         max_turns=5,
     ):
+        with _instances_lock:
+            if self._initialized:
+                return
+            self._open(base_dir, memory_file, global_file, max_turns)
+            self._initialized = True
+
+    def _open(self, base_dir, memory_file, global_file, max_turns):
         # File paths
         self.base_dir = base_dir
         os.makedirs(self.base_dir, exist_ok=True)
@@ -25,31 +69,39 @@ class MemoryManager:
         self.global_file = os.path.join(self.base_dir, global_file)
         self.max_turns = max_turns
 
-        # Initialize memory data
-        self.memory = self._load_json(self.memory_file, default={})
-        self.memories = self._load_json(self.global_file, default=[])
+        # Initialize memory data (snapshot + replayed log, or the legacy JSON files)
+        self.session_store = open_store(self.memory_file, default={}, apply=self._apply_session)
+        # Global memories: indexed by timestamp/emotion, capped, read by page (index loads on first use)
+        self.global_store = open_collection(self.global_file)
+        # Semantic long-term memory: every patient text, searchable by meaning
+        self.semantic = open_index(os.path.join(self.base_dir, "vectors"))
+
+    @property
+    def memory(self) -> dict:
+        return self.session_store.current()
+
+    @property
+    def memories(self) -> list:
+        return self.global_store.all()
 
     # =========================================================
     # 📥 INTERNAL HELPERS
     # =========================================================
-    def _load_json(self, file_path, default):
-        """Load JSON data safely with fallback."""
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, "r") as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                logging.warning(f"⚠️ JSON decode error in {file_path}, resetting.")
-                return default
-        return default
-
-    def _save_json(self, file_path, data):
-        """Write JSON data safely."""
-        try:
-            with open(file_path, "w") as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            logging.error(f"❌ Failed to save JSON {file_path}: {e}")
+    def _apply_session(self, memory, record):
+        """Apply one session record; used live and when replaying the log."""
+        if record["op"] == "turn":
+            turns = memory.setdefault(record["user_id"], [])
+            turns.append(record["turn"])
+            # Keep only the latest N turns
+            del turns[:-self.max_turns]
+        elif record["op"] == "clear_user":
+            memory.pop(record["user_id"], None)
+        return memory
+
+    def flush(self):
+        """Write queued changes now (they are otherwise flushed within MIMIR_MEMORY_FLUSH_INTERVAL_MS)."""
+        self.session_store.flush()
+        self.global_store.flush()
 
     # =========================================================
     # 🧠 SESSION MEMORY (Per-User)
@@ -62,32 +114,63 @@ class MemoryManager:
         if not user_id:
             user_id = "anonymous"
 
-        if user_id not in self.memory:
-            self.memory[user_id] = []
-
-        self.memory[user_id].append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "user": user_message,
-            "ai": ai_reply,
-            "emotion": emotion,
+        self.session_store.commit({
+            "op": "turn",
+            "user_id": user_id,
+            "turn": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "user": user_message,
+                "ai": ai_reply,
+                "emotion": emotion,
+            },
         })
-
-        # Keep only the latest N turns
-        self.memory[user_id] = self.memory[user_id][-self.max_turns:]
-        self._save_json(self.memory_file, self.memory)
         logging.info(f"💾 Saved memory turn for user {user_id}")
 
     def recall(self, user_id):
         """Retrieve the recent conversation turns for a user."""
         if not user_id:
             user_id = "anonymous"
-        return self.memory.get(user_id, [])
+        return list(self.memory.get(user_id, []))
+
+    def remember(self, user_id, text, kind="reflection", emotion="neutral", **meta):
+        """Add a patient's text to their semantic index only (no session turn).
+
+        This runs the embedding model on the calling thread; from async code
+        use aremember(), which runs it in the CPU pool.
+        """
+        if not user_id:
+            user_id = "anonymous"
+        return self.semantic.add(
+            user_id, text, kind=kind, emotion=emotion, timestamp=datetime.utcnow().isoformat(), **meta
+        )
+
+    async def aremember(self, user_id, text, kind="reflection", emotion="neutral", **meta):
+        """
+        remember() with the embedding forward pass in the CPU pool:
+
+            await memory.aremember(patient_id, transcript, kind="reflection", emotion="joy")
+        """
+        if not user_id:
+            user_id = "anonymous"
+        return await run_cpu(
+            add_to_index, self.semantic.directory, user_id, text,
+            kind=kind, emotion=emotion, timestamp=datetime.utcnow().isoformat(), **meta
+        )
+
+    def recall_related(self, user_id, text, k=MEMORY_RECALL_K, exclude=()):
+        """
+        Up to k of the user's earlier memories (any age) most similar to `text`,
+        best first, each {"text", "kind", "emotion", "timestamp", ..., "score"}.
+        Texts in `exclude` (e.g. turns already in the prompt) are skipped.
+        """
+        if not user_id:
+            user_id = "anonymous"
+        return self.semantic.search(user_id, text, k=k, exclude=exclude)
 
     def clear_user_memory(self, user_id):
         """Clear memory for a specific user."""
         if user_id in self.memory:
-            del self.memory[user_id]
-            self._save_json(self.memory_file, self.memory)
+            self.session_store.commit({"op": "clear_user", "user_id": user_id})
             logging.info(f"🧹 Cleared memory for user {user_id}")
 
     # =========================================================
@@ -103,16 +186,22 @@ class MemoryManager:
             "summary": summary,
             "emotion": emotion,
         }
-        self.memories.append(entry)
-        self._save_json(self.global_file, self.memories)
+        self.global_store.commit({"op": "memory", "entry": entry})
         logging.info("🧠 Added entry to global memory.")
 
     def get_all_memories(self):
-        """Return all stored global memory entries."""
+        """Return all retained global memory entries (reads every one; prefer query_memories)."""
         return self.memories
 
+    def query_memories(self, emotion=None, since=None, until=None, cursor=None, limit=50):
+        """
+        Newest-first page of global memories, optionally by emotion and ISO
+        timestamp range. Returns {"items": [...], "next_cursor": id | None};
+        pass next_cursor back to get the next (older) page.
+        """
+        return self.global_store.query(emotion=emotion, since=since, until=until, cursor=cursor, limit=limit)
+
     def clear_global_memories(self):
         """Wipe all long-term stored memories."""
-        self.memories = []
-        self._save_json(self.global_file, self.memories)
+        self.global_store.commit({"op": "clear"})
         logging.warning("⚠️ Global memories cleared.")
@@ -1,9 +1,8 @@
-from transformers import pipeline
 from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer
 from textblob import TextBlob
 import logging
-import torch
+from ai_service import model_registry
+from ai_service.services.inference_batcher import classifier_batcher
 
 device= "cpu"
 
@@ -19,21 +18,34 @@ logging.basicConfig(
 # --------------------------------------------------------
 # 1. Sentiment Analysis
 # --------------------------------------------------------
-try:
-    sentiment_model = pipeline("text-classification",
-                           model="distilbert/distilbert-base-uncased-finetuned-sst-2-english",
-                           device=-1)
-    logging.info("✅ Sentiment model loaded successfully.")
-except Exception as e:
-    logging.error(f"❌ Error loading sentiment model: {e}")
-    sentiment_model = None
+# Shared with every other module through the model registry; loaded on first use.
+sentiment_model = model_registry.handle("sentiment")
 
 
 def analyze_text(text: str):
-    if not text or not sentiment_model:
+    model = sentiment_model.try_get()
+    if not text or not model:
         return {"label": "neutral", "score": 0.0}
 
-    result = sentiment_model(text)[0]
+    result = model(text)[0]
+    return {
+        "label": result["label"],
+        "score": round(float(result["score"]), 4)
+    }
+
+
+async def analyze_text_async(text: str):
+    """
+    analyze_text() for async callers; concurrent requests share one forward pass.
+    The model is loaded where the batch runs (in process mode: the CPU workers, not here).
+    """
+    if not text:
+        return {"label": "neutral", "score": 0.0}
+
+    try:
+        result = await classifier_batcher("sentiment").submit(text)
+    except Exception:
+        return {"label": "neutral", "score": 0.0}
     return {
         "label": result["label"],
         "score": round(float(result["score"]), 4)
@@ -43,24 +55,31 @@ def analyze_text(text: str):
 # --------------------------------------------------------
 # 2. Emotion Detection
 # --------------------------------------------------------
-try:
-    emotion_model = pipeline(
-        "text-classification",
-        model="j-hartmann/emotion-english-distilroberta-base",
-        return_all_scores=True,
-        device=-1 #force CPU
-    )
-    logging.info("✅ Emotion model loaded successfully.")
-except Exception as e:
-    logging.error(f"❌ Error loading emotion model: {e}")
-    emotion_model = None
+emotion_model = model_registry.handle("emotion")
 
 
 def analyze_emotion(text: str):
-    if not text or not emotion_model:
+    model = emotion_model.try_get()
+    if not text or not model:
         return {"emotions": []}
 
-    results = emotion_model(text)[0]
+    results = model([text], top_k=None)[0]
+    return _top_emotions(results)
+
+
+async def analyze_emotion_async(text: str):
+    """analyze_emotion() for async callers; concurrent requests share one forward pass."""
+    if not text:
+        return {"emotions": []}
+
+    try:
+        results = await classifier_batcher("emotion", top_k=None).submit(text)
+    except Exception:
+        return {"emotions": []}
+    return _top_emotions(results)
+
+
+def _top_emotions(results):
     sorted_results = sorted(results, key=lambda x: x["score"], reverse=True)
     top_emotions = [{r["label"]: round(float(r["score"]), 4)} for r in sorted_results[:3]]
     return {"emotions": top_emotions}
@@ -69,24 +88,15 @@ def analyze_emotion(text: str):
 # --------------------------------------------------------
 # 3. Summarization (Conversation-Optimized)
 # --------------------------------------------------------
-try:
-    summarizer = pipeline(
-        "summarization",
-        model="philschmid/bart-large-cnn-samsum",
-        tokenizer="philschmid/bart-large-cnn-samsum",
-        device=-1 #force CPU
-    )
-    logging.info("✅ Conversation-optimized summarizer loaded successfully.")
-except Exception as e:
-    logging.error(f"❌ Error loading summarizer: {e}")
-    summarizer = None
+summarizer = model_registry.handle("summarizer_samsum")
 
 
 def summarize_text(text: str):
     """
     Generate a short conversational summary with confidence score.
     """
-    if not text or not summarizer:
+    model = summarizer.try_get()
+    if not text or not model:
         return {"summary": "", "confidence": 0.0}
 
     # Skip summarization for short text
@@ -94,7 +104,7 @@ def summarize_text(text: str):
         return {"summary": text, "confidence": 1.0}
 
     try:
-        result = summarizer(
+        result = model(
             text,
             max_length=60,
             min_length=15,
@@ -119,15 +129,22 @@ def summarize_text(text: str):
 # --------------------------------------------------------
 # 4. Keyword Extraction
 # --------------------------------------------------------
-try:
-    kw_model = KeyBERT(model=SentenceTransformer("all-MiniLM-L12-v2"))
-    logging.info("✅ Keyword model loaded successfully.")
-except Exception as e:
-    logging.error(f"❌ Error loading KeyBERT model: {e}")
-    kw_model = None
+sentence_encoder = model_registry.handle("minilm_l12")
+_kw_model = None
+
+
+def get_kw_model():
+    """KeyBERT wrapper around the shared all-MiniLM-L12-v2 encoder."""
+    global _kw_model
+    if _kw_model is None:
+        encoder = sentence_encoder.try_get()
+        if encoder is not None:
+            _kw_model = KeyBERT(model=encoder)
+    return _kw_model
 
 
 def extract_keywords(text: str):
+    kw_model = get_kw_model()
     if not text or not kw_model:
         return {"keywords": []}
 
@@ -158,15 +175,10 @@ def extract_keywords(text: str):
 # --------------------------------------------------------
 class NLPHandler:
     def __init__(self):
-        try:
-            self.emotion_classifier = pipeline(
-                "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base"
-            )
+        # Same weights as analyze_emotion(); the registry hands back the shared pipeline
+        self.emotion_classifier = emotion_model.try_get()
+        if self.emotion_classifier:
             logging.info("✅ NLPHandler emotion classifier initialized.")
-        except Exception as e:
-            logging.error(f"❌ Error initializing emotion classifier: {e}")
-            self.emotion_classifier = None
 
     def process_message(self, text):
         if not text:
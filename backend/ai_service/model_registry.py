@@ -0,0 +1,345 @@
+# ai_service/model_registry.py
+"""
+Process-wide registry for the local ML models (Hugging Face pipelines,
+Whisper, sentence encoders).
+
+Every module asks the registry for a model by key instead of building its
+own pipeline, so each set of weights is loaded at most once per worker.
+Loading is lazy, thread-safe and reference-counted: the first `acquire()`
+loads the model, `release()` drops a reference and the weights are freed
+once nobody holds them any more.
+"""
+import gc
+import os
+import time
+import logging
+import threading
+
+from ai_service.config.settings import CLASSIFIER_BACKEND
+
+# =========================================================
+# 🗂 MODEL CATALOGUE
+# =========================================================
+def _torch_device():
+    """GPU index when CUDA is available, otherwise CPU (-1)."""
+    try:
+        import torch
+        return 0 if torch.cuda.is_available() else -1
+    except ImportError:
+        return -1
+
+
+def _hf_pipeline(task, model_id, device=-1, **kwargs):
+    def _load():
+        from transformers import pipeline
+        return pipeline(task, model=model_id, device=device, **kwargs)
+    return _load
+
+
+def _classifier(model_id):
+    """text-classification on the configured backend: PyTorch, or int8 ONNX Runtime."""
+    torch_loader = _hf_pipeline("text-classification", model_id)
+
+    def _load():
+        if CLASSIFIER_BACKEND == "onnx":
+            try:
+                from ai_service.onnx_classifiers import load_quantized_pipeline
+                return load_quantized_pipeline(model_id)
+            except Exception as e:
+                logging.warning(f"⚠️ ONNX backend unavailable for {model_id} ({e}), using PyTorch.")
+        return torch_loader()
+    return _load
+
+
+def _hf_chat_pipeline(model_id, **kwargs):
+    def _load():
+        import torch
+        from transformers import pipeline
+        cuda = torch.cuda.is_available()
+        return pipeline(
+            "text-generation",
+            model=model_id,
+            device=0 if cuda else -1,
+            torch_dtype=torch.float16 if cuda else torch.float32,
+            **kwargs
+        )
+    return _load
+
+
+def _hf_asr(model_id):
+    def _load():
+        from transformers import pipeline
+        return pipeline("automatic-speech-recognition", model=model_id, device=_torch_device())
+    return _load
+
+
+def _openai_whisper(size):
+    def _load():
+        import whisper
+        return whisper.load_model(size)
+    return _load
+
+
+def _faster_whisper(size, compute_type="int8"):
+    def _load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(size, device="cpu", compute_type=compute_type)
+    return _load
+
+
+def _sentence_transformer(model_id):
+    def _load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_id, device="cpu")
+    return _load
+
+
+# key → (model id shown in /models, loader)
+MODEL_SPECS = {
+    "emotion": (
+        "j-hartmann/emotion-english-distilroberta-base",
+        _classifier("j-hartmann/emotion-english-distilroberta-base"),
+    ),
+    "sentiment": (
+        "distilbert/distilbert-base-uncased-finetuned-sst-2-english",
+        _classifier("distilbert/distilbert-base-uncased-finetuned-sst-2-english"),
+    ),
+    "summarizer_samsum": (
+        "philschmid/bart-large-cnn-samsum",
+        _hf_pipeline("summarization", "philschmid/bart-large-cnn-samsum"),
+    ),
+    "summarizer_cnn": (
+        "facebook/bart-large-cnn",
+        _hf_pipeline("summarization", "facebook/bart-large-cnn"),
+    ),
+    "whisper_tiny": ("openai/whisper-tiny", _hf_asr("openai/whisper-tiny")),
+    "whisper_base": ("openai/whisper-base", _hf_asr("openai/whisper-base")),
+    "openai_whisper_base": ("whisper:base", _openai_whisper("base")),
+    "faster_whisper_base": ("faster-whisper:base/int8", _faster_whisper("base")),
+    "phi3_chat": ("microsoft/Phi-3-mini-4k-instruct", _hf_chat_pipeline("microsoft/Phi-3-mini-4k-instruct")),
+    "mistral_chat": (
+        "mistralai/Mistral-7B-Instruct-v0.2",
+        _hf_pipeline("text-generation", "mistralai/Mistral-7B-Instruct-v0.2", device=None, device_map="auto"),
+    ),
+    "minilm_l12": ("all-MiniLM-L12-v2", _sentence_transformer("all-MiniLM-L12-v2")),
+    "minilm_l6": ("all-MiniLM-L6-v2", _sentence_transformer("all-MiniLM-L6-v2")),
+}
+
+
+def register(key: str, model_id: str, loader):
+    """Add (or replace) a catalogue entry. Must happen before the first acquire()."""
+    with _lock:
+        if key in _entries:
+            raise RuntimeError(f"Model '{key}' is already resident; cannot re-register it.")
+        MODEL_SPECS[key] = (model_id, loader)
+
+
+# =========================================================
+# 📏 MEMORY ACCOUNTING
+# =========================================================
+def process_rss_mb() -> float:
+    """Current resident set size of this worker, in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        # Non-Linux fallback: peak RSS (KB on Linux/BSD, bytes on macOS)
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def _param_mb(model) -> float:
+    """Size of the torch parameters behind a pipeline / model, when we can see them."""
+    module = getattr(model, "model", model)
+    params = getattr(module, "parameters", None)
+    if not callable(params):
+        return 0.0
+    try:
+        total = sum(p.numel() * p.element_size() for p in params())
+    except Exception:
+        return 0.0
+    return round(total / 1024 / 1024, 1)
+
+
+# =========================================================
+# 🔒 REGISTRY STATE
+# =========================================================
+class _Entry:
+    def __init__(self, key):
+        self.key = key
+        self.lock = threading.Lock()
+        self.model = None
+        self.refcount = 0
+        self.loaded_at = None
+        self.load_seconds = 0.0
+        self.rss_delta_mb = 0.0
+        self.param_mb = 0.0
+
+
+_lock = threading.Lock()
+_entries = {}
+
+
+def _entry(key: str) -> _Entry:
+    with _lock:
+        if key not in MODEL_SPECS:
+            raise KeyError(f"Unknown model key: {key}")
+        if key not in _entries:
+            _entries[key] = _Entry(key)
+        return _entries[key]
+
+
+def acquire(key: str):
+    """
+    Return the shared model for `key`, loading it on first use.
+    Each call takes one reference; pair it with release(key).
+    """
+    entry = _entry(key)
+    with entry.lock:
+        if entry.model is None:
+            model_id, loader = MODEL_SPECS[key]
+            logging.info(f"📦 Loading model '{key}' ({model_id})...")
+            rss_before = process_rss_mb()
+            started = time.perf_counter()
+            entry.model = loader()
+            entry.load_seconds = round(time.perf_counter() - started, 2)
+            entry.rss_delta_mb = round(max(process_rss_mb() - rss_before, 0.0), 1)
+            entry.param_mb = _param_mb(entry.model)
+            entry.loaded_at = time.time()
+            logging.info(f"✅ Model '{key}' loaded in {entry.load_seconds}s (+{entry.rss_delta_mb} MB RSS).")
+        entry.refcount += 1
+        return entry.model
+
+
+def release(key: str):
+    """Drop one reference to `key`; the weights are freed when the count hits zero."""
+    with _lock:
+        entry = _entries.get(key)
+    if entry is None:
+        return
+    with entry.lock:
+        if entry.refcount == 0:
+            return
+        entry.refcount -= 1
+        if entry.refcount == 0 and entry.model is not None:
+            entry.model = None
+            entry.loaded_at = None
+            gc.collect()
+            logging.info(f"🧹 Model '{key}' unloaded.")
+
+
+def is_resident(key: str) -> bool:
+    with _lock:
+        entry = _entries.get(key)
+    return entry is not None and entry.model is not None
+
+
+_pinned = []
+
+
+def preload(keys):
+    """Warm (and pin) the given models at startup. Failures are logged, not raised."""
+    for key in keys:
+        h = handle(key)
+        if h.try_get() is not None:
+            _pinned.append(h)
+
+
+def resident_models() -> dict:
+    """Snapshot of what is loaded in this worker (served by GET /models)."""
+    with _lock:
+        entries = list(_entries.values())
+    models = []
+    for e in entries:
+        if e.model is None:
+            continue
+        models.append({
+            "key": e.key,
+            "model_id": MODEL_SPECS[e.key][0],
+            "refcount": e.refcount,
+            "loaded_at": e.loaded_at,
+            "load_seconds": e.load_seconds,
+            "param_mb": e.param_mb,
+            "rss_delta_mb": e.rss_delta_mb,
+        })
+    return {
+        "pid": os.getpid(),
+        "process_rss_mb": process_rss_mb(),
+        "models": models,
+    }
+
+
+# =========================================================
+# 🤝 LAZY HANDLES
+# =========================================================
+class ModelHandle:
+    """
+    Lazy, callable stand-in for a registry model.
+
+    Module-level code can keep writing `emotion_model(text)`; the weights are
+    only acquired on the first call and the handle holds a single reference
+    until release() is called.
+    """
+
+    def __init__(self, key: str):
+        if key not in MODEL_SPECS:
+            raise KeyError(f"Unknown model key: {key}")
+        self.key = key
+        self._model = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = acquire(self.key)
+        return self._model
+
+    def try_get(self):
+        """Like get(), but logs and returns None when the model can't be loaded."""
+        try:
+            return self.get()
+        except Exception as e:
+            if not self._failed:
+                logging.error(f"❌ Error loading model '{self.key}': {e}")
+                self._failed = True
+            return None
+
+    def release(self):
+        with self._lock:
+            if self._model is not None:
+                self._model = None
+                release(self.key)
+
+    def __call__(self, *args, **kwargs):
+        return self.get()(*args, **kwargs)
+
+    def __reduce__(self):
+        # Pickles as just the key, so handles can be shipped to CPU pool
+        # processes, which resolve them against their own registry.
+        return (_shared_handle, (self.key,))
+
+    def __getattr__(self, name):
+        # Forward attribute access (e.g. .transcribe, .tokenizer) to the real model
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+def handle(key: str) -> ModelHandle:
+    return ModelHandle(key)
+
+
+_shared = {}
+
+
+def _shared_handle(key: str) -> ModelHandle:
+    """One handle per key per process (used when unpickling handles in workers)."""
+    with _lock:
+        if key not in _shared:
+            _shared[key] = ModelHandle(key)
+        return _shared[key]
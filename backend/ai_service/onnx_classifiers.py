@@ -0,0 +1,242 @@
+# ai_service/onnx_classifiers.py
+"""
+Optional ONNX Runtime backend for the DistilRoBERTa emotion and DistilBERT
+SST-2 sentiment classifiers.
+
+Each model is exported to ONNX once, dynamically quantized to int8, cached on
+disk and served through a regular `text-classification` pipeline, so
+model.analyze_text / analyze_emotion and every registry user see the same
+interface. Enable with MIMIR_CLASSIFIER_BACKEND=onnx.
+
+Requires `optimum[onnxruntime]`.
+
+CLI:
+    python -m ai_service.onnx_classifiers export
+    python -m ai_service.onnx_classifiers check      # parity vs PyTorch
+    python -m ai_service.onnx_classifiers bench      # latency vs PyTorch
+"""
+import os
+import time
+import shutil
+import logging
+import platform
+import tempfile
+import statistics
+from contextlib import contextmanager
+
+from ai_service.config.settings import ONNX_CACHE_DIR, ONNX_QUANT_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: no cross-process lock
+    fcntl = None
+
+QUANTIZED_FILE = "model_quantized.onnx"
+
+CLASSIFIERS = {
+    "emotion": "j-hartmann/emotion-english-distilroberta-base",
+    "sentiment": "distilbert/distilbert-base-uncased-finetuned-sst-2-english",
+}
+
+SAMPLE_TEXTS = [
+    "I used to play piano with my grandmother every Sunday.",
+    "I feel nervous and hopeful about the future.",
+    "My father passed away when I was twelve and I still miss him.",
+    "Honestly, nothing special happened today.",
+    "I was furious when they cancelled the trip without telling us.",
+    "We got married in a tiny church by the sea, it was the happiest day of my life.",
+    "I'm scared the doctors will find something wrong again.",
+    "I didn't expect the whole family to show up for my birthday!",
+]
+
+
+# =========================================================
+# 📦 EXPORT + QUANTIZE
+# =========================================================
+def _model_dir(model_id: str) -> str:
+    return os.path.join(ONNX_CACHE_DIR, model_id.replace("/", "__"))
+
+
+def _quantization_config():
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    name = ONNX_QUANT_CONFIG
+    if not name:
+        name = "arm64" if platform.machine().lower() in ("arm64", "aarch64") else "avx2"
+    return getattr(AutoQuantizationConfig, name)(is_static=False, per_channel=False)
+
+
+@contextmanager
+def _export_lock(out_dir: str):
+    """One exporter per model across workers (flock on <model dir>.lock)."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{out_dir}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def export_quantized(model_id: str, force: bool = False) -> str:
+    """
+    Export `model_id` to ONNX and apply dynamic int8 quantization. Returns the model dir.
+
+    The export is written to a temporary directory next to the cache and
+    renamed into place under an flock, so a worker never loads a half-written
+    model and concurrent workers export it once.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from transformers import AutoTokenizer
+
+    out_dir = _model_dir(model_id)
+    quantized = os.path.join(out_dir, QUANTIZED_FILE)
+    if not force and os.path.exists(quantized):
+        return out_dir
+
+    os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+    with _export_lock(out_dir):
+        if not force and os.path.exists(quantized):   # another worker exported it meanwhile
+            return out_dir
+
+        logging.info(f"📦 Exporting {model_id} to ONNX → {out_dir}")
+        tmp_dir = tempfile.mkdtemp(prefix=f"{os.path.basename(out_dir)}.", dir=ONNX_CACHE_DIR)
+        try:
+            model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+            model.save_pretrained(tmp_dir)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(tmp_dir)
+
+            quantizer = ORTQuantizer.from_pretrained(tmp_dir)
+            quantizer.quantize(save_dir=tmp_dir, quantization_config=_quantization_config())
+
+            # A forced re-export (or a directory left by an older, unlocked export)
+            # is moved aside first: os.replace only renames over an empty directory
+            os.chmod(tmp_dir, 0o755)   # mkdtemp makes it private
+            stale = None
+            if os.path.exists(out_dir):
+                stale = f"{tmp_dir}.stale"
+                os.replace(out_dir, stale)
+            os.replace(tmp_dir, out_dir)
+            if stale:
+                shutil.rmtree(stale, ignore_errors=True)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    logging.info(f"✅ Quantized {model_id} (int8) → {quantized}")
+    return out_dir
+
+
+def load_quantized_pipeline(model_id: str):
+    """text-classification pipeline backed by the int8 ONNX Runtime model (exported on first use)."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer, pipeline
+
+    model_dir = export_quantized(model_id)
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=QUANTIZED_FILE)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+
+def _load_torch_pipeline(model_id: str):
+    from transformers import pipeline
+    return pipeline("text-classification", model=model_id, device=-1)
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return round(total / 1024 / 1024, 1)
+
+
+# =========================================================
+# 🧪 PARITY CHECK
+# =========================================================
+def parity_check(name: str, texts=None, max_prob_diff: float = 0.05, min_agreement: float = 0.95) -> dict:
+    """
+    Compare the int8 ONNX model against PyTorch on `texts`.
+    Passes when top labels agree on at least `min_agreement` of inputs and no
+    class probability moves by more than `max_prob_diff`.
+    """
+    texts = texts or SAMPLE_TEXTS
+    model_id = CLASSIFIERS[name]
+    torch_out = _load_torch_pipeline(model_id)(texts, top_k=None)
+    onnx_out = load_quantized_pipeline(model_id)(texts, top_k=None)
+
+    agree = 0
+    worst = 0.0
+    for ref, got in zip(torch_out, onnx_out):
+        ref_scores = {r["label"]: r["score"] for r in ref}
+        got_scores = {r["label"]: r["score"] for r in got}
+        if max(ref_scores, key=ref_scores.get) == max(got_scores, key=got_scores.get):
+            agree += 1
+        worst = max(worst, max(abs(ref_scores[k] - got_scores.get(k, 0.0)) for k in ref_scores))
+
+    agreement = agree / len(texts)
+    return {
+        "model": model_id,
+        "samples": len(texts),
+        "top1_agreement": round(agreement, 4),
+        "max_prob_diff": round(worst, 4),
+        "passed": agreement >= min_agreement and worst <= max_prob_diff,
+    }
+
+
+# =========================================================
+# ⏱ LATENCY BENCHMARK
+# =========================================================
+def _time_runs(pipe, texts, runs):
+    pipe(texts[0])  # warmup
+    per_call = []
+    for _ in range(runs):
+        for text in texts:
+            started = time.perf_counter()
+            pipe(text)
+            per_call.append((time.perf_counter() - started) * 1000)
+    per_call.sort()
+    return {
+        "p50_ms": round(statistics.median(per_call), 2),
+        "p95_ms": round(per_call[int(len(per_call) * 0.95) - 1], 2),
+    }
+
+
+def benchmark(name: str, texts=None, runs: int = 5) -> dict:
+    """Single-text latency (p50/p95) of PyTorch vs int8 ONNX on CPU, plus on-disk size."""
+    texts = texts or SAMPLE_TEXTS
+    model_id = CLASSIFIERS[name]
+    torch_stats = _time_runs(_load_torch_pipeline(model_id), texts, runs)
+    onnx_stats = _time_runs(load_quantized_pipeline(model_id), texts, runs)
+    return {
+        "model": model_id,
+        "torch": torch_stats,
+        "onnx_int8": onnx_stats,
+        "speedup_p50": round(torch_stats["p50_ms"] / onnx_stats["p50_ms"], 2) if onnx_stats["p50_ms"] else None,
+        "onnx_size_mb": round(os.path.getsize(os.path.join(_model_dir(model_id), QUANTIZED_FILE)) / 1024 / 1024, 1),
+        "onnx_dir_mb": _dir_size_mb(_model_dir(model_id)),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Int8 ONNX Runtime backend for the Mimir text classifiers")
+    parser.add_argument("command", choices=["export", "check", "bench"])
+    parser.add_argument("--model", choices=list(CLASSIFIERS), action="append",
+                        help="Classifier to process (default: all)")
+    parser.add_argument("--force", action="store_true", help="Re-export even if a cached model exists")
+    parser.add_argument("--runs", type=int, default=5, help="Benchmark passes over the sample texts")
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.model or list(CLASSIFIERS):
+        if args.command == "export":
+            print(name, "→", export_quantized(CLASSIFIERS[name], force=args.force))
+        elif args.command == "check":
+            report = parity_check(name)
+            failed = failed or not report["passed"]
+            print(json.dumps(report, indent=2))
+        else:
+            print(json.dumps(benchmark(name, runs=args.runs), indent=2))
+    raise SystemExit(1 if failed else 0)
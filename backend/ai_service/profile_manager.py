@@ -1,13 +1,67 @@
 # ai_service/profile_manager.py
+"""
+Per-user profiles: one JSON file per user under PROFILE_DIR, written
+atomically (temp file + rename), behind a write-through in-process cache.
+
+A cached profile is served while it is younger than PROFILE_CACHE_TTL_S and
+its file has not changed on disk (one stat, so writes from other workers are
+seen at once). A turn therefore costs one small file read at most and one
+small file write, however many users there are.
+
+The old single user_profiles.json is split into per-user files the first
+time the directory is created, and left in place.
+"""
+import copy
 import json
 import os
+import time
+import logging
+import threading
+from urllib.parse import quote
+
+from ai_service.config.settings import PROFILE_DIR, PROFILE_CACHE_TTL_S
 
 PROFILE_FILE = "user_profiles.json"
 
+_cache = {}   # user_id → (expires_at, file mtime_ns, profile)
+_lock = threading.RLock()
+_stats = {"hits": 0, "misses": 0, "writes": 0}
+_dir_ready = False
+
 # ---------- Utility Functions ----------
 
+def _default_profile(user_id: str) -> dict:
+    return {
+        "user_id": user_id,
+        "preferred_tone": "empathetic",
+        "conversation_pacing": "moderate",
+        "topics_of_interest": [],
+        "last_session_summary": "",
+        "emotional_baseline": "neutral",
+    }
+
+
+def _profile_path(user_id: str) -> str:
+    return os.path.join(PROFILE_DIR, quote(str(user_id), safe="") + ".json")
+
+
+def _ensure_dir():
+    """Create PROFILE_DIR, splitting a legacy user_profiles.json into it the first time."""
+    global _dir_ready
+    if _dir_ready:
+        return
+    if not os.path.isdir(PROFILE_DIR):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        legacy = _load_profiles()
+        for user_id, profile in legacy.items():
+            _write_file(user_id, profile)
+        if legacy:
+            logging.info(f"📦 Split {len(legacy)} profiles from {PROFILE_FILE} into {PROFILE_DIR}")
+    _dir_ready = True
+
+
 def _load_profiles():
-    """Load all user profiles from disk."""
+    """Load the legacy single-file profiles (migration only)."""
     if not os.path.exists(PROFILE_FILE):
         return {}
     with open(PROFILE_FILE, "r") as f:
@@ -16,63 +70,132 @@ def _load_profiles():
         except json.JSONDecodeError:
             return {}
 
-def _save_profiles(profiles):
-    """Save all profiles to disk."""
-    with open(PROFILE_FILE, "w") as f:
-        json.dump(profiles, f, indent=4)
+
+def _write_file(user_id: str, profile: dict) -> int:
+    path = _profile_path(user_id)
+    tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w") as f:
+        json.dump(profile, f, indent=4)
+    os.replace(tmp, path)
+    return os.stat(path).st_mtime_ns
+
+
+def _mtime(user_id: str):
+    try:
+        return os.stat(_profile_path(user_id)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read(user_id: str):
+    """Cached profile (shared object: callers copy before handing it out) or None."""
+    with _lock:
+        now = time.monotonic()
+        cached = _cache.get(user_id)
+        mtime = _mtime(user_id)
+        if cached and cached[0] > now and cached[1] == mtime:
+            _stats["hits"] += 1
+            return cached[2]
+
+        _stats["misses"] += 1
+        if mtime is None:
+            _cache.pop(user_id, None)
+            return None
+        try:
+            with open(_profile_path(user_id), "r") as f:
+                profile = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"⚠️ Unreadable profile for {user_id}: {e}")
+            return None
+        _cache[user_id] = (now + PROFILE_CACHE_TTL_S, mtime, profile)
+        _evict_expired(now)
+        return profile
+
+
+def _save(user_id: str, profile: dict):
+    """Write-through: atomic file write, then the cache."""
+    with _lock:
+        mtime = _write_file(user_id, profile)
+        _cache[user_id] = (time.monotonic() + PROFILE_CACHE_TTL_S, mtime, profile)
+        _stats["writes"] += 1
+
+
+def _evict_expired(now: float):
+    if _stats["misses"] % 256:
+        return
+    for user_id in [u for u, (expires, _, _) in _cache.items() if expires <= now]:
+        del _cache[user_id]
+
+
+def _load_or_create(user_id: str) -> dict:
+    """The stored profile, creating the default one on first use (caller holds _lock)."""
+    _ensure_dir()
+    profile = _read(user_id)
+    if profile is None:
+        profile = _default_profile(user_id)
+        _save(user_id, profile)
+    return profile
+
+
+def profile_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "cached": len(_cache),
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None,
+    }
 
 # ---------- Public API ----------
 
 def get_user_profile(user_id: str):
     """Fetch or initialize a user profile."""
-    profiles = _load_profiles()
-    if user_id not in profiles:
-        profiles[user_id] = {
-            "user_id": user_id,
-            "preferred_tone": "empathetic",
-            "conversation_pacing": "moderate",
-            "topics_of_interest": [],
-            "last_session_summary": "",
-            "emotional_baseline": "neutral",
-        }
-        _save_profiles(profiles)
-    return profiles[user_id]
+    with _lock:
+        return copy.deepcopy(_load_or_create(user_id))
 
 
 def update_user_profile(user_id: str, updates: dict):
     """Update user profile with provided fields."""
-    profiles = _load_profiles()
-    profile = profiles.get(user_id, get_user_profile(user_id))
-    profile.update(updates)
-    profiles[user_id] = profile
-    _save_profiles(profiles)
-    return profile
+    with _lock:
+        profile = copy.deepcopy(_load_or_create(user_id))
+        profile.update(updates)
+        _save(user_id, profile)
+        return copy.deepcopy(profile)
 
 
 def list_all_profiles():
     """List all stored user profiles."""
-    return _load_profiles()
+    with _lock:
+        _ensure_dir()
+        profiles = {}
+        for name in sorted(os.listdir(PROFILE_DIR)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(PROFILE_DIR, name), "r") as f:
+                    profile = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            profiles[profile.get("user_id", name[:-5])] = profile
+        return profiles
 
 def add_reflection(user_id: str, reflection: dict):
-    profiles = _load_profiles()
-    profile = profiles.get(user_id, get_user_profile(user_id))
+    with _lock:
+        profile = copy.deepcopy(_load_or_create(user_id))
 
-    if "reflections" not in profile:
-        profile["reflections"] = []
+        if "reflections" not in profile:
+            profile["reflections"] = []
 
-    profile["reflections"].append(reflection)
-    profile["reflections"] = profile["reflections"][-10:]  # keep last 10
+        profile["reflections"].append(reflection)
+        profile["reflections"] = profile["reflections"][-10:]  # keep last 10
 
-    profiles[user_id] = profile
-    _save_profiles(profiles)
-    return profile
+        _save(user_id, profile)
+        return copy.deepcopy(profile)
 
 def update_emotional_baseline(user_id: str, new_emotion: str):
-    profiles = _load_profiles()
-    profile = profiles.get(user_id, get_user_profile(user_id))
+    with _lock:
+        profile = copy.deepcopy(_load_or_create(user_id))
 
-    # Simple drift logic – can be upgraded later
-    profile["emotional_baseline"] = new_emotion
-    profiles[user_id] = profile
-    _save_profiles(profiles)
-    return profile
+        # Simple drift logic – can be upgraded later
+        profile["emotional_baseline"] = new_emotion
+        _save(user_id, profile)
+        return copy.deepcopy(profile)
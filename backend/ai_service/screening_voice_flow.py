@@ -1,9 +1,12 @@
 # ai_service/screening_voice_flow.py
 import os, uuid, logging
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from transformers import pipeline
-from elevenlabs import ElevenLabs
-import google.generativeai as genai
+from pathlib import Path
+from ai_service import model_registry
+from ai_service.services.executors import run_cpu, run_io
+from ai_service.services.asr import get_engine
+from ai_service.services.providers import agemini
+from ai_service.services.tts_cache import aelevenlabs_bytes
 from fastapi.responses import FileResponse
 
 router = APIRouter(prefix="/screening", tags=["Screening Voice Flow"])
@@ -14,40 +17,31 @@ TTS_DIR = os.path.join(BASE_DIR, "tts")
 os.makedirs(INPUT_DIR, exist_ok=True)
 os.makedirs(TTS_DIR, exist_ok=True)
 
-ELEVEN_API_KEY = os.getenv("ELEVENLABS_API_KEY")
-GEMINI_KEY = os.getenv("GOOGLE_API_KEY")
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
-genai.configure(api_key=GEMINI_KEY)
+asr_engine = get_engine("screening")
+emotion_model = model_registry.handle("emotion")
+
+async def _synthesize_to_file(text: str, out_path: str) -> str:
+    audio = await aelevenlabs_bytes(text, "EXAVITQu4vr4xnSDxMaL")
+    await run_io(Path(out_path).write_bytes, audio)
+    return out_path
 
-asr_model = pipeline("automatic-speech-recognition", model="openai/whisper-tiny", device=-1)
-emotion_model = pipeline("text-classification", model="j-hartmann/emotion-english-distilroberta-base", device=-1)
 
 @router.post("/analyze")
 async def screening(audio: UploadFile = File(...)):
     """Analyzes a short voice clip for emotional screening."""
     try:
         input_path = os.path.join(INPUT_DIR, f"in_{uuid.uuid4().hex}.wav")
-        with open(input_path, "wb") as f:
-            f.write(await audio.read())
+        await run_io(Path(input_path).write_bytes, await audio.read())
 
-        text = asr_model(input_path)["text"].strip()
-        emotion = emotion_model(text)[0]["label"].lower()
+        text = (await asr_engine.atranscribe(input_path))["text"]
+        emotion = (await run_cpu(emotion_model, text))[0]["label"].lower()
 
-        model = genai.GenerativeModel("models/gemini-2.0-pro")
         prompt = f"The person said '{text}' and seems {emotion}. Summarize their mood in one sentence."
-        summary = model.generate_content(prompt).text.strip()
+        summary = await agemini(prompt)
 
         # TTS response
-        audio_stream = client.text_to_speech.convert(
-            voice_id="EXAVITQu4vr4xnSDxMaL",
-            model_id="eleven_multilingual_v2",
-            text=summary
-        )
         out_path = os.path.join(TTS_DIR, f"screen_{uuid.uuid4().hex}.mp3")
-        with open(out_path, "wb") as f:
-            for chunk in audio_stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
+        await _synthesize_to_file(summary, out_path)
 
         return {
             "transcript": text,
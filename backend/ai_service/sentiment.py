@@ -12,3 +12,10 @@ def analyze_sentiment(text: str):
     if "error" in result:
         return {"sentiment": "unknown", "confidence": 0.0, "error": result["error"]}
     return result
+
+async def analyze_sentiment_async(text: str):
+    """Async analyze_sentiment(); concurrent callers are micro-batched into one forward pass."""
+    result = await _sentiment_tool.arun(text)
+    if "error" in result:
+        return {"sentiment": "unknown", "confidence": 0.0, "error": result["error"]}
+    return result
@@ -0,0 +1,222 @@
+# ai_service/services/asr.py
+"""
+One speech-to-text interface over every ASR backend the project uses.
+
+    engine = get_engine("conversation")
+    result = await engine.atranscribe(wav_path)   # or engine.transcribe(...)
+    result["text"], result["rtf"]
+
+Backends:
+    faster_whisper  — CTranslate2 int8 Whisper base on CPU (default)
+    hf_whisper      — transformers pipeline (openai/whisper-tiny), batched windows
+    openai_whisper  — the `whisper` package (base)
+    openai_api      — OpenAI whisper-1 over the network
+
+Every call reports its real-time factor (processing seconds / audio seconds);
+running totals per engine are served on /models.
+"""
+import io
+import time
+import logging
+import threading
+
+from ai_service import model_registry
+from ai_service.services.executors import run_cpu, run_provider
+from ai_service.services.transcription import load_audio, transcribe as transcribe_windows
+from ai_service.config.settings import (
+    ASR_SAMPLE_RATE, ASR_ENGINE, ASR_FLOW_ENGINES, ASR_LANGUAGE, ASR_BEAM_SIZE
+)
+
+
+# =========================================================
+# 🧩 BASE ENGINE
+# =========================================================
+class ASREngine:
+    """
+    Subclasses implement `_transcribe(audio) -> (text, language)` for a
+    16 kHz mono float32 array. Local engines run in the CPU executor, remote
+    ones in the IO pool; engines only hold registry keys so they pickle cheaply.
+    """
+
+    name = "base"
+    remote = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.audio_s = 0.0
+        self.elapsed_s = 0.0
+
+    def __getstate__(self):
+        # Metrics stay in the parent; workers get a clean copy
+        return {k: v for k, v in self.__dict__.items() if k not in ("_lock", "calls", "audio_s", "elapsed_s")}
+
+    def __setstate__(self, state):
+        ASREngine.__init__(self)
+        self.__dict__.update(state)
+
+    def _transcribe(self, audio):
+        raise NotImplementedError
+
+    def _run(self, source) -> dict:
+        started = time.perf_counter()
+        audio = load_audio(source)
+        text, language = self._transcribe(audio)
+        elapsed = time.perf_counter() - started
+        audio_s = len(audio) / ASR_SAMPLE_RATE
+        return {
+            "text": text.strip(),
+            "language": language or ASR_LANGUAGE,
+            "engine": self.name,
+            "audio_s": round(audio_s, 2),
+            "elapsed_s": round(elapsed, 3),
+            "rtf": round(elapsed / audio_s, 3) if audio_s else None,
+        }
+
+    def _record(self, result: dict) -> dict:
+        with self._lock:
+            self.calls += 1
+            self.audio_s += result["audio_s"]
+            self.elapsed_s += result["elapsed_s"]
+        logging.info(
+            f"🗣️ ASR[{self.name}] {result['audio_s']:.1f}s audio in {result['elapsed_s']:.2f}s (RTF {result['rtf']})"
+        )
+        return result
+
+    def transcribe(self, source) -> dict:
+        """Blocking transcription of a path, encoded bytes or 16 kHz array."""
+        return self._record(self._run(source))
+
+    async def atranscribe(self, source) -> dict:
+        """Same as transcribe(), off the event loop."""
+        runner = run_provider if self.remote else run_cpu
+        return self._record(await runner(self._run, source))
+
+    def stats(self) -> dict:
+        return {
+            "engine": self.name,
+            "calls": self.calls,
+            "audio_s": round(self.audio_s, 1),
+            "elapsed_s": round(self.elapsed_s, 2),
+            "rtf": round(self.elapsed_s / self.audio_s, 3) if self.audio_s else None,
+        }
+
+
+# =========================================================
+# 🔌 BACKENDS
+# =========================================================
+class FasterWhisperEngine(ASREngine):
+    """CTranslate2 Whisper with int8 weights — base quality at roughly tiny-model CPU cost."""
+
+    name = "faster_whisper"
+
+    def __init__(self, model_key: str = "faster_whisper_base", beam_size: int = ASR_BEAM_SIZE):
+        super().__init__()
+        self.model = model_registry.handle(model_key)
+        self.beam_size = beam_size
+
+    def _transcribe(self, audio):
+        segments, info = self.model.transcribe(
+            audio, language=ASR_LANGUAGE, beam_size=self.beam_size, vad_filter=True
+        )
+        # segments is a generator; decoding happens while we join
+        return " ".join(s.text.strip() for s in segments), info.language
+
+
+class HFWhisperEngine(ASREngine):
+    """transformers Whisper pipeline; long audio goes through the batched window transcriber."""
+
+    name = "hf_whisper"
+
+    def __init__(self, model_key: str = "whisper_tiny"):
+        super().__init__()
+        self.model_key = model_key
+
+    def _transcribe(self, audio):
+        return transcribe_windows(audio, model_key=self.model_key), None
+
+
+class OpenAIWhisperEngine(ASREngine):
+    """The reference `whisper` package."""
+
+    name = "openai_whisper"
+
+    def __init__(self, model_key: str = "openai_whisper_base"):
+        super().__init__()
+        self.model = model_registry.handle(model_key)
+
+    def _transcribe(self, audio):
+        result = self.model.transcribe(audio, fp16=False, language=ASR_LANGUAGE)
+        return result.get("text", ""), result.get("language")
+
+
+class OpenAIAPIEngine(ASREngine):
+    """OpenAI whisper-1 — network STT, used when local CPU is not enough."""
+
+    name = "openai_api"
+    remote = True
+
+    def __init__(self, model: str = "whisper-1"):
+        super().__init__()
+        self.model = model
+
+    def _transcribe(self, audio):
+        import soundfile as sf
+        from ai_service.services.providers import openai_sync_client
+
+        buf = io.BytesIO()
+        sf.write(buf, audio, ASR_SAMPLE_RATE, format="WAV", subtype="PCM_16")
+        resp = openai_sync_client().audio.transcriptions.create(
+            model=self.model,
+            file=("audio.wav", buf.getvalue(), "audio/wav"),
+            language=ASR_LANGUAGE,
+        )
+        return resp.text, None
+
+
+ENGINES = {
+    "faster_whisper": FasterWhisperEngine,
+    "hf_whisper": HFWhisperEngine,
+    "openai_whisper": OpenAIWhisperEngine,
+    "openai_api": OpenAIAPIEngine,
+}
+
+# =========================================================
+# 🗂 PER-FLOW SELECTION
+# =========================================================
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def engine_name(flow: str = None) -> str:
+    return ASR_FLOW_ENGINES.get(flow, ASR_ENGINE) if flow else ASR_ENGINE
+
+
+def get_engine(flow: str = None) -> ASREngine:
+    """The configured engine for `flow` (MIMIR_ASR_FLOW_ENGINES), else MIMIR_ASR_ENGINE. One instance per backend."""
+    name = engine_name(flow)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown ASR engine '{name}' (expected one of {', '.join(ENGINES)})")
+    with _engines_lock:
+        if name not in _engines:
+            _engines[name] = ENGINES[name]()
+        return _engines[name]
+
+
+def asr_stats() -> list:
+    return [e.stats() for e in _engines.values()]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Compare ASR engines (text + real-time factor) on one recording")
+    parser.add_argument("audio")
+    parser.add_argument("--engine", choices=list(ENGINES), action="append", help="Engine to run (default: all local)")
+    args = parser.parse_args()
+
+    for name in args.engine or [n for n, cls in ENGINES.items() if not cls.remote]:
+        engine = ENGINES[name]()
+        engine.transcribe(args.audio)  # warmup / model load
+        print(json.dumps(engine.transcribe(args.audio), indent=2))
@@ -0,0 +1,203 @@
+# ai_service/services/audio_ingest.py
+"""
+Upload → 16 kHz mono float32 PCM, entirely in memory.
+
+The upload is streamed into an async ffmpeg subprocess over stdin while raw
+f32le samples are read back from stdout, so nothing is written to disk and
+the event loop never blocks on the decoder. Archival of the original bytes
+is opt-in (MIMIR_AUDIO_ARCHIVE_DIR).
+
+Before ASR, silence is trimmed with the energy VAD (services/vad.py), so ASR
+cost scales with speech rather than with recording length. A recording with
+no speech comes back empty; callers answer it with REPEAT_PROMPT instead of
+running ASR, emotion and the LLM on nothing.
+"""
+import os
+import asyncio
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from ai_service.services.executors import run_io
+from ai_service.services.vad import trim_silence
+from ai_service.config.settings import (
+    ASR_SAMPLE_RATE, AUDIO_ARCHIVE_DIR, AUDIO_DECODE_TIMEOUT_S, AUDIO_IDLE_TIMEOUT_S, VAD_TRIM_UPLOADS
+)
+
+READ_CHUNK = 64 * 1024
+
+REPEAT_PROMPT = "Could you please repeat that? I didn’t quite catch it."
+
+_stats = {"uploads": 0, "empty": 0, "audio_s": 0.0, "speech_s": 0.0, "kept_s": 0.0}
+
+
+class AudioDecodeError(RuntimeError):
+    pass
+
+
+# =========================================================
+# 🎛️ DECODE
+# =========================================================
+def _ffmpeg_cmd(sr: int) -> list:
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(sr),
+        "pipe:1",
+    ]
+
+
+async def _feed(proc, chunks, idle_timeout: float):
+    """Write upload chunks into ffmpeg's stdin, then close it so ffmpeg can finish."""
+    chunks = chunks.__aiter__()
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), idle_timeout)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                raise AudioDecodeError(f"No audio received for {idle_timeout:g}s")
+            proc.stdin.write(chunk)
+            await proc.stdin.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # ffmpeg gave up early; its stderr says why
+    finally:
+        proc.stdin.close()
+
+
+async def _drain(proc) -> tuple:
+    return await asyncio.gather(proc.stdout.read(), proc.stderr.read())
+
+
+async def decode_stream(chunks, sr: int = ASR_SAMPLE_RATE, timeout: float = AUDIO_DECODE_TIMEOUT_S,
+                        idle_timeout: float = AUDIO_IDLE_TIMEOUT_S) -> np.ndarray:
+    """
+    Decode an async iterator of encoded audio bytes into mono float32 PCM at `sr`.
+
+    The stream may take as long as the patient speaks; it only fails when no
+    chunk arrives for `idle_timeout` seconds. `timeout` bounds the decode
+    after the last chunk. Both raise AudioDecodeError.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *_ffmpeg_cmd(sr),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    # stdout is drained while we feed, so ffmpeg never blocks on a full pipe
+    reader = asyncio.create_task(_drain(proc))
+    feeder = asyncio.create_task(_feed(proc, chunks, idle_timeout))
+    try:
+        await feeder
+        pcm, err = await asyncio.wait_for(reader, timeout)
+        await proc.wait()
+    except asyncio.TimeoutError:
+        raise AudioDecodeError(f"ffmpeg did not finish within {timeout:g}s of the last chunk")
+    finally:
+        feeder.cancel()
+        reader.cancel()
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+    if proc.returncode != 0:
+        raise AudioDecodeError(f"ffmpeg exited with {proc.returncode}: {err.decode(errors='ignore').strip()[-300:]}")
+    # copy: frombuffer views are read-only and pin the bytes object
+    return np.frombuffer(pcm, dtype=np.float32).copy()
+
+
+async def decode_bytes(data: bytes, sr: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    async def _one():
+        yield data
+    return await decode_stream(_one(), sr)
+
+
+# =========================================================
+# 🎚️ SILENCE TRIM
+# =========================================================
+def speech_only(pcm: np.ndarray, sr: int = ASR_SAMPLE_RATE, label: str = "upload") -> np.ndarray:
+    """Trim silence from a decoded recording and record the speech-seconds metric."""
+    audio_s = len(pcm) / sr
+    if VAD_TRIM_UPLOADS:
+        trimmed, speech_s = trim_silence(pcm, sr)
+    else:
+        trimmed, speech_s = pcm, audio_s
+
+    _stats["uploads"] += 1
+    _stats["audio_s"] += audio_s
+    _stats["speech_s"] += speech_s
+    _stats["kept_s"] += len(trimmed) / sr
+    if not len(trimmed):
+        _stats["empty"] += 1
+    logging.info(f"🎚️ {label}: {audio_s:.1f}s recorded, {speech_s:.1f}s speech → {len(trimmed) / sr:.1f}s to ASR")
+    return trimmed
+
+
+def ingest_stats() -> dict:
+    audio_s = _stats["audio_s"]
+    return {
+        "uploads": _stats["uploads"],
+        "empty": _stats["empty"],
+        "audio_s": round(audio_s, 1),
+        "speech_s": round(_stats["speech_s"], 1),
+        "asr_s": round(_stats["kept_s"], 1),
+        "trimmed_ratio": round(1 - _stats["kept_s"] / audio_s, 3) if audio_s else None,
+    }
+
+
+# =========================================================
+# 📥 INGEST
+# =========================================================
+async def _upload_chunks(upload):
+    while True:
+        chunk = await upload.read(READ_CHUNK)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _tee(chunks, sink: list):
+    async for chunk in chunks:
+        if sink is not None:
+            sink.append(chunk)
+        yield chunk
+
+
+def _archive(name: str, data: bytes) -> str:
+    os.makedirs(AUDIO_ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(AUDIO_ARCHIVE_DIR, name)
+    Path(path).write_bytes(data)
+    return path
+
+
+async def ingest_stream(chunks, archive_name: str = None, ext: str = ".webm", sr: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """
+    Stream encoded audio chunks (upload reads, WebSocket frames, ...) through
+    ffmpeg as they arrive and return the speech samples (empty: no speech).
+    When archival is enabled the original bytes are written afterwards, off
+    the loop.
+    """
+    archived = [] if AUDIO_ARCHIVE_DIR else None
+    pcm = await decode_stream(_tee(chunks, archived), sr)
+    logging.info(f"📥 Decoded upload → {len(pcm) / sr:.1f}s PCM in memory")
+
+    if archived is not None:
+        name = f"{archive_name or 'upload'}{ext}"
+        try:
+            await run_io(_archive, name, b"".join(archived))
+        except Exception as e:
+            logging.error(f"❌ Audio archival failed ({name}): {e}")
+    return speech_only(pcm, sr, archive_name or "upload")
+
+
+async def ingest_upload(upload, archive_name: str = None, sr: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """Stream a FastAPI UploadFile through ffmpeg and return its speech samples."""
+    ext = os.path.splitext(upload.filename or "")[1] or ".webm"
+    return await ingest_stream(_upload_chunks(upload), archive_name, ext, sr)
+
+
+async def ingest_bytes(data: bytes, label: str = "upload", sr: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """Already-read upload bytes (flows that also keep the original file) → speech samples."""
+    return speech_only(await decode_bytes(data, sr), sr, label)
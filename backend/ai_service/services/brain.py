@@ -1,46 +1,106 @@
-from openai import AsyncOpenAI
-import os
+import logging
+
+from ai_service.services.providers import openai_client, keep_alive
+from ai_service.services.context_window import RollingContext
+from ai_service.config.settings import CONTEXT_SUMMARY_TOKENS
+
+client = openai_client()
+
+SYSTEM_PROMPT = ("You are AI Afi, a warm, conversational female guide. "
+                 "Ask thoughtful reflective questions, not robotic ones.")
+
+
+async def summarize_turns(summary: str, messages: list) -> str:
+    """Fold older turns into the running summary (background, never on a turn's critical path)."""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    resp = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system",
+             "content": "You keep a running summary of a reflective conversation between AI Afi and a person. "
+                        "Keep names, people, places, dates, feelings and topics already covered. "
+                        "Write a few plain sentences, no lists."},
+            {"role": "user",
+             "content": f"Current summary:\n{summary or '(none yet)'}\n\nNew turns:\n{transcript}\n\nUpdated summary:"},
+        ],
+        max_tokens=CONTEXT_SUMMARY_TOKENS,
+        temperature=0
+    )
+    return resp.choices[0].message.content
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 class SessionBrain:
     def __init__(self):
-        self.history = []
+        # Last turns verbatim + a background summary, capped at CONTEXT_TOKEN_BUDGET
+        self.context = RollingContext(SYSTEM_PROMPT, summarize=summarize_turns)
         self.last_question = None       # <-- ADDED
         self.last_category = None       # <-- ADDED
+        self.last_prompt_tokens = 0
 
-    async def handle_user_message(self, msg: str, category: str = None) -> str:
-        """
-        Handles user's message and returns the AI-generated next question.
-        Also stores the last asked question so DB saving works correctly.
-        """
+    def _prompt(self, msg: str, category: str = None) -> list:
         # Store category for this turn
         if category:
             self.last_category = category
 
         # Add user message to history
-        self.history.append({"role": "user", "content": msg})
+        self.context.add("user", msg)
 
-        # Prompt
-        prompt = [
-            {"role": "system",
-             "content": "You are AI Afi, a warm, conversational female guide. "
-                        "Ask thoughtful reflective questions, not robotic ones."},
-        ] + self.history
+        messages, tokens = self.context.messages()
+        self.last_prompt_tokens = tokens
+        logging.info(f"🧮 Prompt: {tokens} tokens ({len(messages)} messages, summary: {bool(self.context.summary)})")
+        return messages
+
+    def _remember(self, ai_msg: str):
+        # Save AI response to chat history (older turns fold into the summary in the background)
+        self.context.add("assistant", ai_msg)
 
-        # LLM call
+        # <-- CRITICAL: store last question asked
+        self.last_question = ai_msg
+
+    async def handle_user_message(self, msg: str, category: str = None) -> str:
+        """
+        Handles user's message and returns the AI-generated next question.
+        Also stores the last asked question so DB saving works correctly.
+        """
         resp = await client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=prompt,
+            messages=self._prompt(msg, category),
             max_tokens=120
         )
 
         ai_msg = resp.choices[0].message.content
+        self._remember(ai_msg)
+        return ai_msg
 
-        # Save AI response to chat history
-        self.history.append({"role": "assistant", "content": ai_msg})
+    async def stream_user_message(self, msg: str, category: str = None):
+        """
+        Same as handle_user_message, but yields the reply token by token as
+        gpt-4o-mini produces it. History and last_question are updated once
+        the stream completes; if it fails (or is abandoned) the user message
+        is taken back out of the history, so no turn is left without a reply.
 
-        # <-- CRITICAL: store last question asked
-        self.last_question = ai_msg
+        Once the reply is out, the pooled OpenAI connection is kept open while
+        the patient listens and answers (providers.keep_alive).
+        """
+        messages = self._prompt(msg, category)
+        parts = []
+        try:
+            stream = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=120,
+                stream=True
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except BaseException:
+            self.context.discard_last("user")
+            raise
 
-        return ai_msg
+        self._remember("".join(parts))
+        keep_alive()
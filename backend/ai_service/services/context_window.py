@@ -0,0 +1,162 @@
+# ai_service/services/context_window.py
+"""
+Token-budgeted rolling context for chat sessions.
+
+The last CONTEXT_KEEP_TURNS exchanges are sent verbatim; older ones are
+folded into a running summary by a background task, so the prompt (and
+with it per-turn latency and cost) stays flat however long the session
+runs. Every prompt is counted with a local tokenizer and trimmed to
+CONTEXT_TOKEN_BUDGET before it is sent.
+
+    context = RollingContext(system_prompt, summarize=my_summarizer)
+    context.add("user", text)
+    messages, tokens = context.messages()
+    context.add("assistant", reply)       # may start a background fold
+"""
+import asyncio
+import logging
+import threading
+
+from ai_service.config.settings import (
+    CONTEXT_KEEP_TURNS, CONTEXT_TOKEN_BUDGET, CONTEXT_TOKENIZER
+)
+
+# Per-message framing overhead of the chat format, and the reply primer
+_MESSAGE_OVERHEAD = 4
+_REPLY_PRIMER = 3
+
+_stats = {"prompts": 0, "prompt_tokens": 0, "max_prompt_tokens": 0, "folds": 0, "fold_errors": 0, "trimmed": 0}
+
+
+# =========================================================
+# 🔢 LOCAL TOKENIZER
+# =========================================================
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _encoder():
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(CONTEXT_TOKENIZER)
+            except Exception as e:
+                logging.warning(f"⚠️ tiktoken unavailable ({e}) — estimating tokens as chars / 4")
+                _encoding = False
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoder()
+    if encoding:
+        return len(encoding.encode(text or ""))
+    return (len(text or "") + 3) // 4
+
+
+def message_tokens(message: dict) -> int:
+    return count_tokens(message["content"]) + _MESSAGE_OVERHEAD
+
+
+# =========================================================
+# 🧠 ROLLING CONTEXT
+# =========================================================
+class RollingContext:
+    """
+    `summarize(previous_summary, messages) -> str` is a coroutine function that
+    folds `messages` into the summary. It runs off the critical path: until a
+    fold finishes, the turns it covers stay in the prompt verbatim (budget
+    permitting).
+    """
+
+    def __init__(self, system: str, summarize=None, keep_turns: int = CONTEXT_KEEP_TURNS,
+                 budget: int = CONTEXT_TOKEN_BUDGET):
+        self.system = {"role": "system", "content": system}
+        self.summarize = summarize
+        self.keep_messages = max(keep_turns, 1) * 2
+        self.budget = budget
+
+        self.summary = ""
+        self.pending = []   # left the verbatim window, not yet in the summary
+        self.recent = []    # verbatim window, oldest first
+        self.last_prompt_tokens = 0
+        self._fold_task = None
+
+    def add(self, role: str, content: str):
+        self.recent.append({"role": role, "content": content})
+        if role == "assistant" and len(self.recent) > self.keep_messages:
+            overflow = len(self.recent) - self.keep_messages
+            self.pending.extend(self.recent[:overflow])
+            self.recent = self.recent[overflow:]
+            self._schedule_fold()
+
+    def discard_last(self, role: str):
+        """Drop the newest message if it has `role` (a user turn whose reply never came)."""
+        if self.recent and self.recent[-1]["role"] == role:
+            self.recent.pop()
+
+    def _summary_message(self) -> list:
+        if not self.summary:
+            return []
+        return [{"role": "system", "content": f"Summary of the conversation so far: {self.summary}"}]
+
+    def messages(self) -> tuple:
+        """(messages for the LLM, prompt tokens), trimmed to the token budget."""
+        head = [self.system] + self._summary_message()
+        tokens = _REPLY_PRIMER + sum(message_tokens(m) for m in head)
+
+        # Newest first, contiguous: the latest user message always goes in
+        history = self.pending + self.recent
+        body = []
+        for message in reversed(history):
+            cost = message_tokens(message)
+            if body and tokens + cost > self.budget:
+                break
+            body.append(message)
+            tokens += cost
+        body.reverse()
+        trimmed = len(history) - len(body)
+
+        self.last_prompt_tokens = tokens
+        _stats["prompts"] += 1
+        _stats["prompt_tokens"] += tokens
+        _stats["max_prompt_tokens"] = max(_stats["max_prompt_tokens"], tokens)
+        _stats["trimmed"] += trimmed
+        return head + body, tokens
+
+    # =========================================================
+    # 🗜️ BACKGROUND SUMMARY
+    # =========================================================
+    def _schedule_fold(self):
+        if self.summarize is None:
+            self.pending = []
+            return
+        if self._fold_task is None or self._fold_task.done():
+            self._fold_task = asyncio.get_running_loop().create_task(self._fold())
+
+    async def _fold(self):
+        while self.pending:
+            batch = list(self.pending)
+            try:
+                summary = await self.summarize(self.summary, batch)
+            except Exception as e:
+                _stats["fold_errors"] += 1
+                logging.error(f"❌ Context summary failed: {e}")
+                return  # retried with the next overflow
+            self.summary = (summary or "").strip() or self.summary
+            self.pending = self.pending[len(batch):]
+            _stats["folds"] += 1
+
+
+def context_stats() -> dict:
+    prompts = _stats["prompts"]
+    return {
+        "prompts": prompts,
+        "avg_prompt_tokens": round(_stats["prompt_tokens"] / prompts, 1) if prompts else None,
+        "max_prompt_tokens": _stats["max_prompt_tokens"],
+        "budget": CONTEXT_TOKEN_BUDGET,
+        "folds": _stats["folds"],
+        "fold_errors": _stats["fold_errors"],
+        "trimmed_messages": _stats["trimmed"],
+    }
@@ -0,0 +1,99 @@
+# ai_service/services/emotion_cascade.py
+"""
+Local-first emotion labels with an LLM fallback.
+
+The DistilRoBERTa classifier (7 labels, already resident and micro-batched
+through EmotionTool) answers first. Its scores are mapped onto the caller's
+vocabulary and summed per target label; when the best mapped score reaches
+EMOTION_LOCAL_THRESHOLD that label is returned without a network hop. Only
+low-confidence messages go to the LLM, which can also pick labels the local
+model has no equivalent for (nostalgia, pride, anxious, ...).
+
+    LIFE_REVIEW_EMOTION = EmotionCascade(
+        "life_review",
+        mapping={"joy": "joy", "sadness": "sadness", "fear": "stress", ...},
+        llm=classify_with_gpt,          # async (text) -> label or None
+    )
+    label = await LIFE_REVIEW_EMOTION.classify(text)
+
+Per-cascade local/LLM counts and the local hit rate are in GET /models.
+"""
+import logging
+
+from ai_service.tools.emotion_tool import EmotionTool
+from ai_service.config.settings import EMOTION_LOCAL_THRESHOLD
+
+_tool = None
+
+
+def _emotion_tool() -> EmotionTool:
+    global _tool
+    if _tool is None:
+        _tool = EmotionTool()
+    return _tool
+
+
+class EmotionCascade:
+
+    def __init__(self, name: str, mapping: dict, llm, default: str = "neutral",
+                 threshold: float = EMOTION_LOCAL_THRESHOLD):
+        self.name = name
+        self.mapping = mapping
+        self.llm = llm
+        self.default = default
+        self.threshold = threshold
+        self.counts = {"local": 0, "llm": 0, "llm_errors": 0, "local_errors": 0}
+
+    async def local(self, text: str) -> tuple:
+        """(label, score) from the local classifier, mapped to this vocabulary."""
+        result = await _emotion_tool().arun(text)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+
+        mapped = {}
+        for label, score in result["all_scores"].items():
+            target = self.mapping.get(label.lower(), self.default)
+            mapped[target] = mapped.get(target, 0.0) + score
+        best = max(mapped, key=mapped.get)
+        return best, mapped[best]
+
+    async def classify(self, text: str) -> str:
+        label, score = self.default, 0.0
+        try:
+            label, score = await self.local(text)
+        except Exception as e:
+            self.counts["local_errors"] += 1
+            logging.warning(f"⚠️ Local emotion ({self.name}) failed: {e}")
+
+        if score >= self.threshold:
+            self.counts["local"] += 1
+            return label
+
+        # Low confidence → ask the LLM; its failure falls back to the local guess
+        self.counts["llm"] += 1
+        try:
+            return await self.llm(text) or label
+        except Exception as e:
+            self.counts["llm_errors"] += 1
+            logging.warning(f"⚠️ LLM emotion ({self.name}) failed: {e} — using '{label}'")
+            return label
+
+    def stats(self) -> dict:
+        total = self.counts["local"] + self.counts["llm"]
+        return {
+            **self.counts,
+            "threshold": self.threshold,
+            "local_hit_rate": round(self.counts["local"] / total, 3) if total else None,
+        }
+
+
+CASCADES = {}
+
+
+def register(cascade: EmotionCascade) -> EmotionCascade:
+    CASCADES[cascade.name] = cascade
+    return cascade
+
+
+def cascade_stats() -> dict:
+    return {name: c.stats() for name, c in CASCADES.items()}
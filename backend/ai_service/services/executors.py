@@ -0,0 +1,174 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ai_service import model_registry
+from ai_service.config.settings import (
+    CPU_EXECUTOR, CPU_WORKERS, IO_WORKERS, PROVIDER_WORKERS, LOOP_LAG_INTERVAL_MS, LOOP_LAG_WARN_MS,
+    PRELOAD_MODELS
+)
+
+# =========================================================
+# 🧵 EXECUTORS
+# =========================================================
+# Heavy model work (torch forward passes, Whisper, local generation) runs in
+# the CPU pool; light blocking work (file IO) in the IO pool; blocking provider
+# SDK calls, which may wait on a provider's concurrency limit, in the provider pool.
+# Nothing that takes more than a few ms should run on the event loop itself.
+_cpu_pool = None
+_io_pool = None
+_provider_pool = None
+
+
+def _cpu_executor():
+    global _cpu_pool
+    if _cpu_pool is None:
+        if CPU_EXECUTOR == "process":
+            # spawn: never fork a process that already holds torch threads / open clients.
+            # Each worker warms the preloaded models itself.
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=CPU_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=model_registry.preload,
+                initargs=(PRELOAD_MODELS,),
+            )
+        else:
+            _cpu_pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="mimir-cpu")
+        logging.info(f"⚙️ CPU executor: {CPU_EXECUTOR} × {CPU_WORKERS}")
+    return _cpu_pool
+
+
+def _io_executor():
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="mimir-io")
+    return _io_pool
+
+
+def _provider_executor():
+    global _provider_pool
+    if _provider_pool is None:
+        _provider_pool = ThreadPoolExecutor(max_workers=PROVIDER_WORKERS, thread_name_prefix="mimir-provider")
+    return _provider_pool
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """
+    Run model inference off the event loop.
+
+    In process mode `fn` and its arguments must be picklable: module-level
+    functions, registry ModelHandles (they pickle as their key and reload in
+    the worker) or functools.partial of those.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_io(fn, *args, **kwargs):
+    """Run light blocking work (file IO) in the IO thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_provider(fn, *args, **kwargs):
+    """
+    Run blocking provider SDK calls (sync ElevenLabs / OpenAI / Gemini, and
+    crew steps that make them) in their own thread pool, so threads queued on
+    a provider limit never starve run_io.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_provider_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown():
+    global _cpu_pool, _io_pool, _provider_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+    if _io_pool is not None:
+        _io_pool.shutdown(wait=False, cancel_futures=True)
+        _io_pool = None
+    if _provider_pool is not None:
+        _provider_pool.shutdown(wait=False, cancel_futures=True)
+        _provider_pool = None
+
+
+# =========================================================
+# ⏱ EVENT-LOOP LAG MONITOR
+# =========================================================
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up for a periodic sleep.
+    Any lag beyond a few ms means something blocked the loop (and every
+    other patient's SSE stream with it).
+    """
+
+    def __init__(self, interval_ms: float = LOOP_LAG_INTERVAL_MS, warn_ms: float = LOOP_LAG_WARN_MS, window: int = 600):
+        self.interval = interval_ms / 1000
+        self.warn_ms = warn_ms
+        self.window = window
+        self.samples = []
+        self.max_lag_ms = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max((time.perf_counter() - started - self.interval) * 1000, 0.0)
+            self.samples.append(lag_ms)
+            if len(self.samples) > self.window:
+                self.samples.pop(0)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms > self.warn_ms:
+                logging.warning(f"⚠️ Event loop blocked for {lag_ms:.1f} ms")
+
+    def stats(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "samples": len(ordered),
+            "p50_ms": round(ordered[len(ordered) // 2], 2) if ordered else 0.0,
+            "p99_ms": round(ordered[max(int(len(ordered) * 0.99) - 1, 0)], 2) if ordered else 0.0,
+            "max_ms": round(self.max_lag_ms, 2),
+        }
+
+
+loop_monitor = LoopLagMonitor()
+
+
+async def measure_loop_lag(load, duration: float = 2.0, concurrency: int = 8, interval_ms: float = 5) -> dict:
+    """
+    Drive `load` (a coroutine function) from `concurrency` tasks for `duration`
+    seconds while sampling loop lag. Used to verify handlers never block the loop:
+
+        stats = await measure_loop_lag(lambda: run_cpu(model, text))
+        assert stats["max_ms"] < 20
+    """
+    monitor = LoopLagMonitor(interval_ms=interval_ms, warn_ms=float("inf"), window=100000)
+    monitor.start()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await load()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await monitor.stop()
+    return monitor.stats()
+
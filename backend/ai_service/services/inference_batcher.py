@@ -0,0 +1,152 @@
+import asyncio
+import functools
+import logging
+import time
+
+from ai_service import model_registry
+from ai_service.services.executors import run_cpu
+from ai_service.config.settings import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_BUCKET_WIDTH
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching for text classifiers.
+
+    Concurrent callers `await submit(text)`; a background task drains the queue,
+    groups up to `max_batch_size` requests (or whatever arrived within
+    `max_wait_ms` of the first one), splits them into length buckets so each
+    forward pass pads to similar lengths, and resolves every caller's future
+    with its own result.
+
+    `infer_fn` is a sync callable: list[str] -> list[result], same order.
+    It runs in the CPU executor, so in process mode it must be picklable.
+    """
+
+    def __init__(self, name: str, infer_fn, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS, bucket_width: int = BATCH_BUCKET_WIDTH):
+        self.name = name
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.bucket_width = bucket_width
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        # Metrics
+        self.batches = 0
+        self.items = 0
+
+    # =========================================================
+    # 🚪 PUBLIC API
+    # =========================================================
+    async def submit(self, text: str):
+        """Queue one text and wait for its result."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._queue = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+    # =========================================================
+    # ⚙️ WORKER
+    # =========================================================
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self):
+        """Block for the first request, then gather more until the batch is full or the wait expires."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _buckets(self, batch):
+        """Group requests of similar length so each forward pass pads as little as possible."""
+        buckets = {}
+        for item in batch:
+            buckets.setdefault(len(item[0]) // self.bucket_width, []).append(item)
+        return [buckets[k] for k in sorted(buckets)]
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            for bucket in self._buckets(batch):
+                texts = [text for text, _ in bucket]
+                try:
+                    results = await run_cpu(self.infer_fn, texts)
+                except Exception as e:
+                    logging.error(f"❌ Batched inference failed ({self.name}): {e}")
+                    for _, future in bucket:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                self.batches += 1
+                self.items += len(bucket)
+                for (_, future), result in zip(bucket, results):
+                    if not future.done():
+                        future.set_result(result)
+
+
+# =========================================================
+# 🗂 SHARED BATCHERS
+# =========================================================
+_batchers = {}
+
+
+def get_batcher(name: str, infer_fn) -> MicroBatcher:
+    """One batcher per name, so every module feeding the same model shares a queue."""
+    if name not in _batchers:
+        _batchers[name] = MicroBatcher(name, infer_fn)
+    return _batchers[name]
+
+
+def batcher_stats() -> list:
+    return [b.stats() for b in _batchers.values()]
+
+
+def classifier_batcher(key: str, **call_kwargs) -> MicroBatcher:
+    """
+    Shared batcher in front of a registry text-classification pipeline.
+    Results are the raw per-text pipeline outputs, called with `call_kwargs`.
+    """
+    name = key + "".join(f":{k}={v}" for k, v in sorted(call_kwargs.items()))
+    if name not in _batchers:
+        _batchers[name] = MicroBatcher(
+            name, functools.partial(_classify, model_registry.handle(key), call_kwargs)
+        )
+    return _batchers[name]
+
+
+def _classify(model, call_kwargs, texts):
+    return model(texts, batch_size=len(texts), **call_kwargs)
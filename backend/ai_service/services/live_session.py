@@ -0,0 +1,222 @@
+# ai_service/services/live_session.py
+"""
+Full-duplex live conversation: PCM frames in while the patient speaks,
+VAD + incremental ASR on the fly, reply audio out as soon as they stop.
+
+Speech is cut into ASR segments at short pauses (or at the quietest frame
+once a segment reaches LIVE_MAX_SEGMENT_S). Each segment is transcribed in
+the background while the patient keeps talking, so at end-of-speech only
+the last short segment is still in flight and the LLM can start almost
+immediately. Speaking over the reply interrupts it (barge-in).
+"""
+import time
+import asyncio
+import logging
+
+import numpy as np
+
+from ai_service.services.vad import StreamingVAD, frame_db
+from ai_service.config.settings import (
+    ASR_SAMPLE_RATE, VAD_FRAME_MS, LIVE_MAX_SEGMENT_S, LIVE_PREROLL_MS
+)
+
+# Trailing silence kept on each segment so final consonants are not clipped
+_TAIL_MS = 100
+
+
+# Bytes per sample of each frame encoding a /live client may ask for
+FRAME_ENCODINGS = {"pcm16": 2, "f32": 4}
+
+
+def decode_frame(data: bytes, encoding: str = "pcm16") -> np.ndarray:
+    """
+    Binary WebSocket frame → float32 samples. Browsers send pcm16 from an AudioWorklet.
+    Raises ValueError for an unknown encoding or a frame that is not whole samples.
+    """
+    width = FRAME_ENCODINGS.get(encoding)
+    if width is None:
+        raise ValueError(f"Unknown encoding {encoding!r} — use one of: {', '.join(FRAME_ENCODINGS)}")
+    if len(data) % width:
+        raise ValueError(f"{encoding} frames must be a multiple of {width} bytes, got {len(data)}")
+    if encoding == "f32":
+        return np.frombuffer(data, dtype=np.float32)
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+class LiveSession:
+    """
+    `send_json` / `send_bytes`: coroutine functions writing to the client.
+    `respond(transcript)`: async iterator of ("sentence" | "audio" | "text" | "error", data).
+    `engine`: ASREngine used for the segments.
+    """
+
+    def __init__(self, send_json, send_bytes, respond, engine, sr: int = ASR_SAMPLE_RATE):
+        self._send_json = send_json
+        self._send_bytes = send_bytes
+        self.respond = respond
+        self.engine = engine
+        self.sr = sr
+        self.vad = StreamingVAD(sr=sr)
+
+        self.preroll = int(LIVE_PREROLL_MS * sr / 1000)
+        self.tail = int(_TAIL_MS * sr / 1000)
+        self.max_segment = int(LIVE_MAX_SEGMENT_S * sr)
+
+        # Audio kept = _store[_lo:_hi]; appends are amortized O(1), trims just move _lo
+        self._store = np.zeros(sr * 4, dtype=np.float32)
+        self._lo = self._hi = 0
+        self.buffer_start = 0     # absolute sample offset of buffer[0]
+        self.speaking = False
+        self.seg_start = 0        # absolute offset where the open segment begins
+        self.segments = []        # transcription tasks of this utterance, in order
+        self.reply_task = None
+        self._send_lock = asyncio.Lock()
+
+    # =========================================================
+    # 📡 OUTPUT
+    # =========================================================
+    async def send_json(self, payload: dict):
+        async with self._send_lock:
+            await self._send_json(payload)
+
+    async def send_bytes(self, data: bytes):
+        async with self._send_lock:
+            await self._send_bytes(data)
+
+    # =========================================================
+    # 🎙️ INPUT
+    # =========================================================
+    @property
+    def buffer(self) -> np.ndarray:
+        return self._store[self._lo:self._hi]
+
+    @property
+    def _end(self) -> int:
+        return self.buffer_start + (self._hi - self._lo)
+
+    def _append(self, samples: np.ndarray):
+        n = len(samples)
+        if self._hi + n > len(self._store):
+            kept = self._hi - self._lo
+            if kept + n > len(self._store):
+                store = np.zeros(max(2 * len(self._store), kept + n), dtype=np.float32)
+            else:
+                store = self._store
+            store[:kept] = self._store[self._lo:self._hi]
+            self._store, self._lo, self._hi = store, 0, kept
+        self._store[self._hi:self._hi + n] = samples
+        self._hi += n
+
+    def _drop_before(self, offset: int):
+        """Forget the audio before absolute sample `offset`."""
+        drop = min(max(offset - self.buffer_start, 0), self._hi - self._lo)
+        self._lo += drop
+        self.buffer_start += drop
+
+    async def feed(self, samples: np.ndarray):
+        self._append(samples)
+
+        for event, offset in self.vad.process(samples):
+            if event == "speech_start":
+                await self._on_speech_start(offset)
+            elif event == "pause":
+                self._cut(offset + self.tail)
+            elif event == "speech_end":
+                self._cut(offset + self.tail)
+                self._finish_utterance()
+
+        if self.speaking and self._end - self.seg_start > self.max_segment:
+            self._cut(self._quietest_point())
+
+        if self.speaking:
+            # Cut audio is already in its segment; the open segment needs all of
+            # itself, and _quietest_point looks back at most one second
+            self._drop_before(min(self.seg_start, self._end - self.sr))
+        else:
+            # Only keep enough history for the next utterance's pre-roll
+            self._drop_before(self._end - self.preroll)
+
+    async def _on_speech_start(self, offset: int):
+        if self.reply_task and not self.reply_task.done():
+            self.reply_task.cancel()
+            await self.send_json({"type": "interrupted"})
+        self.speaking = True
+        self.seg_start = max(offset - self.preroll, self.buffer_start)
+        await self.send_json({"type": "speech_start"})
+
+    def _quietest_point(self) -> int:
+        """Cut long monologues in the quietest frame of the last second, not mid-word."""
+        frame = int(self.sr * VAD_FRAME_MS / 1000)
+        window = self.buffer[max(len(self.buffer) - self.sr, self.seg_start - self.buffer_start):]
+        n = len(window) // frame
+        if n < 2:
+            return self._end
+        quietest = int(np.argmin(frame_db(window[:n * frame].reshape(n, frame))))
+        return self._end - len(window) + (quietest + 1) * frame
+
+    def _cut(self, end: int):
+        end = min(end, self._end)
+        if end - self.seg_start < int(0.1 * self.sr):
+            return
+        segment = self.buffer[self.seg_start - self.buffer_start:end - self.buffer_start].copy()
+        self.segments.append(asyncio.create_task(self._transcribe(segment)))
+        self.seg_start = end
+
+    async def _transcribe(self, segment: np.ndarray) -> str:
+        try:
+            text = (await self.engine.atranscribe(segment))["text"]
+        except Exception as e:
+            logging.error(f"❌ Live ASR segment failed: {e}")
+            text = ""
+        await self._send_partial(asyncio.current_task(), text)
+        return text
+
+    async def _send_partial(self, current, current_text: str):
+        """Transcript of the segments finished so far, in order (`current` is finishing now)."""
+        done = []
+        for task in self.segments:
+            if task is current:
+                done.append(current_text)
+            elif not task.done() or task.cancelled():
+                break
+            else:
+                done.append(task.result())
+        text = " ".join(t for t in done if t)
+        if text:
+            await self.send_json({"type": "partial_transcript", "text": text})
+
+    # =========================================================
+    # 💬 TURN
+    # =========================================================
+    def _finish_utterance(self):
+        self.speaking = False
+        segments, self.segments = self.segments, []
+        self.reply_task = asyncio.create_task(self._reply(segments, time.perf_counter()))
+
+    async def _reply(self, segments: list, speech_end: float):
+        transcript = " ".join(t for t in await asyncio.gather(*segments) if t).strip()
+        asr_wait_ms = round((time.perf_counter() - speech_end) * 1000)
+        if not transcript:
+            await self.send_json({"type": "no_speech"})
+            return
+        await self.send_json({"type": "user_transcript", "text": transcript})
+
+        first_audio_ms = None
+        async for event, data in self.respond(transcript):
+            if event == "audio":
+                if first_audio_ms is None:
+                    first_audio_ms = round((time.perf_counter() - speech_end) * 1000)
+                await self.send_bytes(data)
+            elif event == "error":
+                await self.send_json({"type": "error", "detail": "Could not answer that — please try again."})
+            else:
+                await self.send_json({"type": "next_question" if event == "text" else "next_question_sentence", "text": data})
+
+        await self.send_json({"type": "audio_complete"})
+        await self.send_json({"type": "turn_metrics", "asr_wait_ms": asr_wait_ms, "first_audio_ms": first_audio_ms})
+        logging.info(f"⏱ Live turn: ASR ready {asr_wait_ms} ms after speech end, first audio at {first_audio_ms} ms")
+
+    async def close(self):
+        for task in [self.reply_task, *self.segments]:
+            if task and not task.done():
+                task.cancel()
@@ -0,0 +1,730 @@
+# ai_service/services/memory_store.py
+"""
+Storage backends for MemoryManager.
+
+A store owns one piece of state (the per-user session dict, the global
+memory list). Every change is a small record ({"op": "turn", ...}) that is
+applied to the in-memory state at once and queued; queued records are
+written together at most MEMORY_FLUSH_INTERVAL_MS later, so a burst of turns
+costs one locked write. On startup the state is rebuilt by replaying the
+records through the same `apply(state, record)` function the live path uses.
+
+- "log" (default): records are appended to <name>.log.jsonl, so a write
+  costs the same however much memory is stored. Every MEMORY_COMPACT_EVERY
+  records the state is written to <name>.snapshot.json (atomically, tagged
+  with the last record's seq) and the log is replaced by an empty one.
+  Recovery = snapshot + the log records after its seq; a torn last line from
+  a crash mid-append is dropped.
+- "json": the original single JSON file, rewritten on every flush (via an
+  atomic replace, so a crash cannot leave it half-written).
+
+Several uvicorn workers can share one log: writes take an exclusive flock
+on <name>.lock, and before writing (or reading, when the log has changed on
+disk) a store first applies the records other processes appended. The json
+backend only gets the lock; the last flush wins, as before.
+
+Stores are shared per file within a process (open_store returns the same
+one), so every MemoryManager() sees the same state. Flush latency, queued
+records and cross-process records are in GET /models -> "memory".
+
+    store = open_store("/data/session_memory.json", default={}, apply=apply_turn)
+    store.commit({"op": "turn", ...})
+    turns = store.current()["user-1"]
+
+The log backend imports an existing legacy <name>.json the first time it
+opens, and leaves that file untouched afterwards.
+"""
+import os
+import copy
+import json
+import time
+import uuid
+import bisect
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+from ai_service.config.settings import (
+    MEMORY_BACKEND, MEMORY_COMPACT_EVERY, MEMORY_FSYNC, MEMORY_FLUSH_INTERVAL_MS,
+    MEMORY_MAX_ENTRIES, MEMORY_SEGMENT_ENTRIES
+)
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: no cross-process lock
+    fcntl = None
+
+
+def _write_atomic(path: str, data, indent=None):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        if MEMORY_FSYNC:
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _read_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        logging.warning(f"⚠️ JSON decode error in {path}, resetting.")
+        return default
+
+
+def _stem(path: str) -> str:
+    return path[:-5] if path.endswith(".json") else path
+
+
+# =========================================================
+# 🧱 SHARED: QUEUE, DEBOUNCED FLUSH, LOCKING, METRICS
+# =========================================================
+class _Store:
+
+    def __init__(self, path: str, default, apply, flush_interval_ms: float = MEMORY_FLUSH_INTERVAL_MS):
+        self.path = path
+        self.default = default
+        self.apply = apply
+        self.flush_interval = flush_interval_ms / 1000
+        self.lock_path = f"{_stem(path)}.lock"
+
+        self.state = None
+        self.pending = []   # applied in memory, not yet on disk
+        self._lock = threading.RLock()
+        self._timer = None
+        self.metrics = {
+            "flushes": 0, "records_written": 0, "max_batch": 0,
+            "flush_ms_total": 0.0, "max_flush_ms": 0.0, "flush_errors": 0,
+            "foreign_records": 0, "compactions": 0,
+        }
+
+    @contextmanager
+    def _locked(self):
+        """This process's lock + an exclusive flock shared with the other workers."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        with self._locked():
+            self.state = self._load()
+        return self.state
+
+    def current(self):
+        """The state, including what other processes have flushed since we last looked."""
+        return self.state
+
+    def commit(self, record: dict):
+        """Apply `record` now; it reaches disk with the next flush."""
+        with self._lock:
+            self.state = self.apply(self.state, record)
+            self.pending.append(record)
+            if self.flush_interval <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self.pending:
+                return
+            batch, began = self.pending, time.perf_counter()
+            try:
+                with self._locked():
+                    self._write(batch)
+                self.pending = []
+            except Exception as e:
+                self.metrics["flush_errors"] += 1
+                logging.error(f"❌ Memory flush failed for {self.path} ({len(batch)} records kept queued): {e}")
+                return
+
+            elapsed = (time.perf_counter() - began) * 1000
+            self.metrics["flushes"] += 1
+            self.metrics["records_written"] += len(batch)
+            self.metrics["max_batch"] = max(self.metrics["max_batch"], len(batch))
+            self.metrics["flush_ms_total"] += elapsed
+            self.metrics["max_flush_ms"] = max(self.metrics["max_flush_ms"], elapsed)
+
+    def stats(self) -> dict:
+        m = self.metrics
+        return {
+            "backend": self.backend,
+            "queued": len(self.pending),
+            "flushes": m["flushes"],
+            "records_written": m["records_written"],
+            "avg_batch": round(m["records_written"] / m["flushes"], 2) if m["flushes"] else None,
+            "max_batch": m["max_batch"],
+            "avg_flush_ms": round(m["flush_ms_total"] / m["flushes"], 2) if m["flushes"] else None,
+            "max_flush_ms": round(m["max_flush_ms"], 2),
+            "flush_errors": m["flush_errors"],
+            "foreign_records": m["foreign_records"],
+            "compactions": m["compactions"],
+        }
+
+
+# =========================================================
+# 📄 SINGLE JSON FILE (legacy)
+# =========================================================
+class JSONFileStore(_Store):
+    backend = "json"
+
+    def _load(self):
+        return _read_json(self.path, copy.deepcopy(self.default))
+
+    def _write(self, batch: list):
+        _write_atomic(self.path, self.state, indent=2)
+
+
+# =========================================================
+# 🪵 APPEND-ONLY LOG + SNAPSHOT
+# =========================================================
+class LogStore(_Store):
+    backend = "log"
+
+    def __init__(self, path: str, default, apply, compact_every: int = MEMORY_COMPACT_EVERY, **kwargs):
+        super().__init__(path, default, apply, **kwargs)
+        stem = _stem(path)
+        self.snapshot_path = f"{stem}.snapshot.json"
+        self.log_path = f"{stem}.log.jsonl"
+        self.compact_every = compact_every
+
+        self.seq = 0
+        self.since_snapshot = 0
+        self.offset = 0      # bytes of the log already applied to self.durable
+        self.log_id = None   # header line of that log; compaction swaps in a new file
+        # The state exactly as the log on disk orders it; self.state is this plus
+        # our queued records, so other workers' records never land under ours.
+        self.durable = None
+
+    def load(self):
+        with self._locked():
+            self.durable = self._load()
+            self.state = copy.deepcopy(self.durable)
+        return self.state
+
+    def _load(self):
+        if os.path.exists(self.snapshot_path):
+            snapshot = _read_json(self.snapshot_path, {"seq": 0, "data": copy.deepcopy(self.default)})
+            state, self.seq = snapshot["data"], snapshot["seq"]
+        elif not os.path.exists(self.log_path) and os.path.exists(self.path):
+            state, self.seq = _read_json(self.path, copy.deepcopy(self.default)), 0
+            _write_atomic(self.snapshot_path, {"seq": 0, "data": state})
+            logging.info(f"📦 Imported legacy {self.path} into {self.snapshot_path}")
+        else:
+            state, self.seq = copy.deepcopy(self.default), 0
+
+        self.offset, self.log_id = 0, None
+        records = self._read_log()
+        for record in records:
+            state = self.apply(state, record)
+        self.since_snapshot = len(records)
+        if records:
+            logging.info(f"🪵 Replayed {len(records)} memory records from {self.log_path}")
+        return state
+
+    def _read_log(self) -> list:
+        """The log records past self.offset, in log order (caller holds the flock); drops a torn tail."""
+        if not os.path.exists(self.log_path) or not os.path.getsize(self.log_path):
+            self._new_log()
+        records = []
+        with open(self.log_path, "r+b") as f:
+            self.log_id = f.readline()
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Only a crash mid-append leaves this (writers hold the flock)
+                    logging.warning(f"⚠️ Dropping torn record at the end of {self.log_path}")
+                    f.truncate(self.offset)
+                    break
+                self.offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logging.warning(f"⚠️ Skipping unreadable record in {self.log_path}")
+                    continue
+                if record.get("seq", 0) <= self.seq:
+                    continue  # already in the snapshot (crash between snapshot and log swap)
+                records.append(record)
+                self.seq = record["seq"]
+        return records
+
+    def _rebuild_view(self):
+        """self.state = the durable state with our queued records re-applied on top."""
+        state = copy.deepcopy(self.durable)
+        for record in self.pending:
+            state = self.apply(state, copy.deepcopy(record))
+        self.state = state
+
+    def _new_log(self):
+        """Swap in an empty log whose first line identifies it (inodes get reused; this does not)."""
+        tmp = f"{self.log_path}.tmp.{os.getpid()}"
+        with open(tmp, "w") as f:
+            f.write(json.dumps({"log": uuid.uuid4().hex, "base_seq": self.seq}) + "\n")
+        os.replace(tmp, self.log_path)
+
+    def _disk_log_id(self):
+        try:
+            with open(self.log_path, "rb") as f:
+                return f.readline(), os.fstat(f.fileno()).st_size
+        except OSError:
+            return None, 0
+
+    def _catch_up(self):
+        """
+        Apply what other processes flushed (caller holds the flock).
+
+        Their records go onto the durable state in log order; our queued
+        records are then re-applied on top, so the view matches what a fresh
+        load will see once the queue is written.
+        """
+        log_id, size = self._disk_log_id()
+        if log_id == self.log_id and size == self.offset:
+            return
+
+        seq_before = self.seq
+        if log_id != self.log_id:
+            # Another worker compacted: restart from its snapshot
+            self.durable = self._load()
+            self._rebuild_view()
+        else:
+            records = self._read_log()
+            for record in records:
+                self.durable = self.apply(self.durable, copy.deepcopy(record))
+            if self.pending:
+                self._rebuild_view()
+            else:
+                for record in records:
+                    self.state = self.apply(self.state, record)
+            self.since_snapshot += len(records)
+
+        if self.seq > seq_before:
+            self.metrics["foreign_records"] += self.seq - seq_before
+            logging.info(f"🔄 Applied memory records {seq_before + 1}–{self.seq} from other workers ({self.log_path})")
+
+    def current(self):
+        with self._lock:
+            if self._disk_log_id() != (self.log_id, self.offset):
+                with self._locked():
+                    self._catch_up()
+            return self.state
+
+    def _write(self, batch: list):
+        self._catch_up()
+        lines, seq = [], self.seq
+        for record in batch:
+            seq += 1
+            lines.append(json.dumps({**record, "seq": seq}) + "\n")
+        data = "".join(lines).encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            f.write(data)
+            f.flush()
+            if MEMORY_FSYNC:
+                os.fsync(f.fileno())
+        for record in batch:
+            self.durable = self.apply(self.durable, copy.deepcopy(record))
+        self.seq = seq
+        self.offset += len(data)
+        self.since_snapshot += len(batch)
+
+        if self.since_snapshot >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """Snapshot the durable state, then swap in an empty log (records <= seq are skipped on replay)."""
+        try:
+            _write_atomic(self.snapshot_path, {"seq": self.seq, "data": self.durable})
+            self._new_log()
+            self.offset = 0
+            self._read_log()  # just the header: sets offset and log_id
+            self.since_snapshot = 0
+            self.metrics["compactions"] += 1
+            logging.info(f"🗜️ Compacted {self.log_path} at seq {self.seq}")
+        except Exception as e:
+            logging.error(f"❌ Memory log compaction failed for {self.log_path}: {e}")
+
+
+# =========================================================
+# 🗂 INDEXED COLLECTION (global memories)
+# =========================================================
+# Append-only entries (global reflections) that are read by page, not whole:
+#
+#     store = open_collection("/data/memories.json")
+#     store.commit({"op": "memory", "entry": {"timestamp": ..., "emotion": "joy", ...}})
+#     page = store.query(emotion="joy", since="2025-01-01", limit=20)
+#     older = store.query(emotion="joy", cursor=page["next_cursor"])
+#
+# Entries get an increasing "id"; pages are newest first and `next_cursor`
+# (None on the last page) continues below the oldest id returned. Only the
+# newest MEMORY_MAX_ENTRIES entries are kept.
+def _emotion_key(emotion) -> str:
+    return (emotion if isinstance(emotion, str) else json.dumps(emotion, sort_keys=True)).strip().lower()
+
+
+def _apply_entries(entries: list, record: dict) -> list:
+    if record["op"] == "memory":
+        entries.append(record["entry"])
+    elif record["op"] == "clear":
+        entries = []
+    return entries
+
+
+class JSONListStore(JSONFileStore):
+    """The "json" backend's collection: one list in one file, filtered in memory."""
+
+    def __init__(self, path: str, max_entries: int = MEMORY_MAX_ENTRIES, **kwargs):
+        super().__init__(path, [], self._apply, **kwargs)
+        self.max_entries = max_entries
+
+    def _apply(self, entries, record):
+        if record["op"] == "memory":
+            last = entries[-1].get("id", len(entries)) if entries else 0
+            record["entry"] = {**record["entry"], "id": last + 1}
+        entries = _apply_entries(entries, record)
+        del entries[:-self.max_entries]
+        return entries
+
+    def all(self) -> list:
+        return list(self.state)
+
+    def count(self) -> int:
+        return len(self.state)
+
+    def query(self, emotion=None, since=None, until=None, cursor=None, limit: int = 50) -> dict:
+        key = _emotion_key(emotion) if emotion is not None else None
+        matches = [
+            e for e in self.state
+            if (key is None or _emotion_key(e.get("emotion", "")) == key)
+            and (since is None or e.get("timestamp", "") >= since)
+            and (until is None or e.get("timestamp", "") <= until)
+            and (cursor is None or e.get("id", 0) < cursor)
+        ]
+        page = matches[-limit:] if limit > 0 else []
+        return {
+            "items": page[::-1],
+            "next_cursor": page[0]["id"] if page and len(matches) > len(page) else None,
+        }
+
+    def stats(self) -> dict:
+        return {**super().stats(), "entries": len(self.state or [])}
+
+
+class SegmentStore(_Store):
+    """
+    The "log" backend's collection. Entries live in <name>.segments/NNNNNNNN.jsonl
+    (MEMORY_SEGMENT_ENTRIES each); a full segment is sealed with a small
+    .idx.json sidecar. Only the index (id, timestamp, emotion → file offset)
+    is held in memory, built on first use from the sidecars, so startup does
+    not read the entries and RSS tracks the retention cap, not the history.
+    Retention drops whole sealed segments from the old end.
+    """
+    backend = "log"
+
+    def __init__(self, path: str, max_entries: int = MEMORY_MAX_ENTRIES,
+                 segment_entries: int = MEMORY_SEGMENT_ENTRIES, **kwargs):
+        super().__init__(path, None, lambda state, record: state, **kwargs)
+        self.dir = f"{_stem(path)}.segments"
+        self.max_entries = max_entries
+        self.segment_entries = segment_entries
+        self.last_id = 0
+        self._reset_index()
+
+    def _reset_index(self):
+        # Keys are (timestamp, id): workers flush interleaved, so write order is not time order
+        self.keys = []         # every entry, ascending
+        self.by_emotion = {}   # emotion → ascending keys
+        self.loc = {}          # id → (segment, byte offset, timestamp)
+        self.segments = {}     # segment → {"rows": [[id, timestamp, emotion, offset]], "bytes": indexed}
+        self._view = None
+
+    def load(self):
+        return None  # lazy: the index is built on first use
+
+    # ---------- index ----------
+    def _index(self, segment: str, row: list):
+        entry_id, stamp, emotion, offset = row
+        key = (stamp, entry_id)
+        self.segments[segment]["rows"].append(row)
+        bisect.insort(self.keys, key)
+        bisect.insort(self.by_emotion.setdefault(emotion, []), key)
+        self.loc[entry_id] = (segment, offset, stamp)
+        self.last_id = max(self.last_id, entry_id)
+
+    def _path(self, segment: str) -> str:
+        return os.path.join(self.dir, segment)
+
+    def _sidecar(self, segment: str) -> str:
+        return self._path(segment)[:-len(".jsonl")] + ".idx.json"
+
+    def _disk_view(self) -> tuple:
+        names = tuple(sorted(n for n in os.listdir(self.dir) if n.endswith(".jsonl")))
+        return names, tuple(os.path.getsize(self._path(n)) for n in names)
+
+    def _scan(self, segment: str, size: int, sealed: bool):
+        """Index `segment` past what is already indexed (from its sidecar when sealed and new)."""
+        if segment not in self.segments:
+            self.segments[segment] = {"rows": [], "bytes": 0}
+            sidecar = _read_json(self._sidecar(segment), None) if sealed else None
+            if sidecar is not None and sidecar["bytes"] == size:
+                for row in sidecar["rows"]:
+                    self._index(segment, row)
+                self.segments[segment]["bytes"] = size
+                return
+
+        with open(self._path(segment), "r+b") as f:
+            offset = self.segments[segment]["bytes"]
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Only a crash mid-append leaves this (writers hold the flock)
+                    logging.warning(f"⚠️ Dropping torn entry at the end of {segment}")
+                    f.truncate(offset)
+                    break
+                try:
+                    entry = json.loads(line)
+                    self._index(segment, [entry["id"], entry.get("timestamp", ""),
+                                          _emotion_key(entry.get("emotion", "")), offset])
+                except (ValueError, KeyError):
+                    logging.warning(f"⚠️ Skipping unreadable entry in {segment}")
+                offset += len(line)
+            self.segments[segment]["bytes"] = offset
+
+    def _refresh(self):
+        """Bring the index up to date with the segment files (caller holds the flock)."""
+        if not os.path.isdir(self.dir):
+            os.makedirs(self.dir, exist_ok=True)
+            self._import_legacy()
+        view = self._disk_view()
+        if view == self._view:
+            return
+        names, sizes = view
+        if any(name not in names for name in self.segments):
+            # Segments went away (retention or a clear in another worker): rebuild, cheap with sidecars
+            self._reset_index()
+        for i, (name, size) in enumerate(zip(names, sizes)):
+            if name not in self.segments or self.segments[name]["bytes"] != size:
+                self._scan(name, size, sealed=i < len(names) - 1)
+        self._view = self._disk_view()
+
+    def _sync(self):
+        """Index what is on disk, including other workers' entries (caller holds self._lock)."""
+        if self._view is None or self._disk_view() != self._view:
+            with self._locked():
+                self._refresh()
+
+    def _import_legacy(self):
+        """First start on the log backend: bring over memories.json / the previous snapshot+log files."""
+        stem = _stem(self.path)
+        snapshot_path, log_path = f"{stem}.snapshot.json", f"{stem}.log.jsonl"
+        if os.path.exists(snapshot_path) or os.path.exists(log_path):
+            snapshot = _read_json(snapshot_path, {"seq": 0, "data": []})
+            entries, seq = snapshot["data"], snapshot["seq"]
+            if os.path.exists(log_path):
+                with open(log_path, "rb") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if "op" in record and record.get("seq", 0) > seq:
+                            entries = _apply_entries(entries, record)
+        else:
+            entries = _read_json(self.path, [])
+        if entries:
+            self._view = self._disk_view()
+            self._append([{"op": "memory", "entry": e} for e in entries[-self.max_entries:]])
+            logging.info(f"📦 Imported {min(len(entries), self.max_entries)} global memories into {self.dir}")
+
+    # ---------- writes ----------
+    def _seal(self, segment: str):
+        _write_atomic(self._sidecar(segment), self.segments[segment])
+
+    def _append(self, batch: list):
+        names = self._view[0]
+        active = names[-1] if names else None
+        f = None
+        try:
+            for record in batch:
+                if record["op"] == "clear":
+                    if f:
+                        f.close()
+                        f = None
+                    for name in os.listdir(self.dir):
+                        os.remove(self._path(name))
+                    self._reset_index()
+                    active = None
+                    continue
+
+                if active is None or len(self.segments[active]["rows"]) >= self.segment_entries:
+                    if f:
+                        f.close()
+                        f = None
+                    if active is not None:
+                        self._seal(active)
+                    number = int(active[:-len(".jsonl")]) + 1 if active else 1
+                    active = f"{number:08d}.jsonl"
+                    self.segments[active] = {"rows": [], "bytes": 0}
+                if f is None:
+                    f = open(self._path(active), "ab")
+
+                entry = {**record["entry"], "id": self.last_id + 1}
+                line = (json.dumps(entry) + "\n").encode("utf-8")
+                offset = self.segments[active]["bytes"]
+                f.write(line)
+                self.segments[active]["bytes"] += len(line)
+                self._index(active, [entry["id"], entry.get("timestamp", ""),
+                                     _emotion_key(entry.get("emotion", "")), offset])
+            if f:
+                f.flush()
+                if MEMORY_FSYNC:
+                    os.fsync(f.fileno())
+        finally:
+            if f:
+                f.close()
+
+        self._enforce_retention()
+        self._view = self._disk_view()
+
+    def _write(self, batch: list):
+        self._refresh()
+        self._append(batch)
+
+    def _enforce_retention(self):
+        """Drop the oldest sealed segments while the rest still hold max_entries."""
+        names = sorted(self.segments)
+        dropped = 0
+        while len(names) > 1 and len(self.loc) - len(self.segments[names[0]]["rows"]) >= self.max_entries:
+            oldest = names.pop(0)
+            for path in (self._path(oldest), self._sidecar(oldest)):
+                if os.path.exists(path):
+                    os.remove(path)
+            for row in self.segments.pop(oldest)["rows"]:
+                del self.loc[row[0]]
+                dropped += 1
+        if dropped:
+            self.keys = [k for k in self.keys if k[1] in self.loc]
+            for emotion, keys in list(self.by_emotion.items()):
+                kept = [k for k in keys if k[1] in self.loc]
+                if kept:
+                    self.by_emotion[emotion] = kept
+                else:
+                    del self.by_emotion[emotion]
+            logging.info(f"🧹 Retention: dropped {dropped} global memories (cap {self.max_entries})")
+
+    # ---------- reads ----------
+    def _read(self, ids: list) -> list:
+        """Entries by id, in the given order (caller holds the flock, so retention cannot race)."""
+        by_segment = {}
+        for entry_id in ids:
+            segment, offset, _ = self.loc[entry_id]
+            by_segment.setdefault(segment, []).append((entry_id, offset))
+        entries = {}
+        for segment, wanted in by_segment.items():
+            with open(self._path(segment), "rb") as f:
+                for entry_id, offset in wanted:
+                    f.seek(offset)
+                    entries[entry_id] = json.loads(f.readline())
+        return [entries[i] for i in ids]
+
+    def query(self, emotion=None, since=None, until=None, cursor=None, limit: int = 50) -> dict:
+        """Newest-first page of entries, filtered by emotion and ISO timestamp range."""
+        self.flush()
+        with self._lock:
+            self._sync()
+            pool = self.keys if emotion is None else self.by_emotion.get(_emotion_key(emotion), [])
+            a = bisect.bisect_left(pool, (since,)) if since else 0
+            b = bisect.bisect_right(pool, (until, float("inf"))) if until else len(pool)
+            if cursor is not None:
+                if cursor not in self.loc:
+                    return {"items": [], "next_cursor": None}  # past the retention cap
+                b = min(b, bisect.bisect_left(pool, (self.loc[cursor][2], cursor)))
+            if a >= b or limit <= 0:
+                return {"items": [], "next_cursor": None}
+
+            start = max(a, b - limit)
+            page = [entry_id for _, entry_id in pool[start:b][::-1]]
+            with self._locked():
+                items = self._read(page)
+        return {"items": items, "next_cursor": page[-1] if start > a else None}
+
+    def all(self) -> list:
+        """Every retained entry, oldest first (reads them all; prefer query())."""
+        self.flush()
+        with self._lock:
+            self._sync()
+            with self._locked():
+                return self._read([entry_id for _, entry_id in self.keys])
+
+    def count(self) -> int:
+        self.flush()
+        with self._lock:
+            self._sync()
+            return len(self.loc)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "entries": len(self.loc), "segments": len(self.segments),
+                "max_entries": self.max_entries}
+
+
+BACKENDS = {"log": LogStore, "json": JSONFileStore}
+COLLECTIONS = {"log": SegmentStore, "json": JSONListStore}
+
+# One store per file in this process: every MemoryManager() shares it
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path: str, default, apply, backend: str = MEMORY_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown memory backend '{backend}' (expected one of {sorted(BACKENDS)})")
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = BACKENDS[backend](path, default, apply)
+            store.load()
+        return store
+
+
+def open_collection(path: str, backend: str = MEMORY_BACKEND):
+    """Shared indexed collection for `path` (global memories); loads lazily."""
+    if backend not in COLLECTIONS:
+        raise ValueError(f"Unknown memory backend '{backend}' (expected one of {sorted(COLLECTIONS)})")
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = COLLECTIONS[backend](path)
+            store.load()
+        return store
+
+
+def flush_all():
+    """Write every queued record now (shutdown)."""
+    for store in list(_stores.values()):
+        store.flush()
+
+
+def memory_stats() -> dict:
+    return {os.path.basename(path): store.stats() for path, store in _stores.items()}
+
+
+atexit.register(flush_all)
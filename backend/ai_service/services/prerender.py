@@ -0,0 +1,240 @@
+# ai_service/services/prerender.py
+"""
+Offline pre-synthesis of the static question bank.
+
+Every prompt variant and followup in knowledge/*.json, the category openers
+in test_flow/interactive_flow.py and the fixed LifeReviewSession lines are
+rendered once per voice into PRERENDER_DIR/<voice>/<key>.<ext>, with a
+manifest.json mapping TTS cache keys to files. The TTS cache consults the
+manifest before the provider, so /start endpoints and LifeReviewSession
+get these clips with no TTS round trip.
+
+Runs are incremental: a string whose text, voice, model or format is
+unchanged keeps its file; new or edited strings are rendered; strings that
+left the bank are pruned.
+
+CLI:
+    python -m ai_service.services.prerender                 # all voices
+    python -m ai_service.services.prerender --voice screening --dry-run
+"""
+import os
+import ast
+import json
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ai_service.services.tts_cache import tts_cache, elevenlabs_bytes, ELEVEN_MODEL, ELEVEN_FORMAT, MANIFEST_FILE, _ext
+from ai_service.config.settings import PRERENDER_DIR
+
+AI_SERVICE_DIR = os.path.dirname(os.path.dirname(__file__))
+KNOWLEDGE_DIR = os.path.join(AI_SERVICE_DIR, "knowledge")
+INTERACTIVE_FLOW = os.path.join(AI_SERVICE_DIR, "test_flow", "interactive_flow.py")
+STORAGE_DIR = os.path.join(AI_SERVICE_DIR, "storage")
+
+# Voices the flows speak the bank with (must match the live call sites)
+VOICES = {
+    # about_you_voice_flow
+    "about_you": {"provider": "elevenlabs", "voice_id": "EXAVITQu4vr4xnSDxMaL", "model_id": ELEVEN_MODEL, "format": ELEVEN_FORMAT},
+    # generate_voice() neutral / default voice (screening, About You tasks, life reflection)
+    "screening": {"provider": "elevenlabs", "voice_id": "MF3mGyEYCl7XYWbV9V6O", "model_id": ELEVEN_MODEL, "format": ELEVEN_FORMAT},
+    # tts_full / synthesize_speech (conversation API, LifeReviewSession, interactive flow)
+    "conversation": {"provider": "openai", "voice_id": "alloy", "model_id": "gpt-4o-mini-tts", "format": "mp3"},
+}
+
+
+# =========================================================
+# 📚 COLLECT THE BANK
+# =========================================================
+def _category_questions() -> dict:
+    """CATEGORY_QUESTIONS from interactive_flow.py, read without importing the module (and its clients)."""
+    with open(INTERACTIVE_FLOW, "r") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "CATEGORY_QUESTIONS" for t in node.targets):
+            return ast.literal_eval(node.value)
+    return {}
+
+
+def collect_texts() -> dict:
+    """Static text → sorted list of where it comes from."""
+    from ai_service.sessions.life_review import clean_question, SADNESS_FOLLOWUPS, SECTION_DONE
+    from ai_service.services.audio_ingest import REPEAT_PROMPT
+
+    bank = {}
+
+    def add(text, source):
+        text = (text or "").strip()
+        if text:
+            bank.setdefault(text, set()).add(source)
+
+    for name in sorted(os.listdir(KNOWLEDGE_DIR)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(KNOWLEDGE_DIR, name), "r") as f:
+                questions = json.load(f)
+        except Exception as e:
+            logging.warning(f"⚠️ Skipping {name}: {e}")
+            continue
+        for q in questions:
+            source = f"{name}:{q.get('id')}"
+            for variant in q.get("prompt_variants", []):
+                add(variant, source)
+                add(clean_question(variant), source)  # what LifeReviewSession actually speaks
+            for followup in q.get("followups", []):
+                add(followup, source)
+
+    categories = _category_questions()
+    for category, question in categories.items():
+        add(question, f"interactive_flow:{category}")
+        # /conversation/start opener
+        add(f"Let's talk about {category.lower()}. Can you tell me a bit about yourself?", f"conversation_api:{category}")
+    add("Tell me more about that part of your life.", "interactive_flow:default")
+
+    for line in SADNESS_FOLLOWUPS:
+        add(line, "life_review:sadness")
+    add(SECTION_DONE, "life_review:done")
+    add(REPEAT_PROMPT, "audio_ingest:no_speech")
+
+    return {text: sorted(sources) for text, sources in bank.items()}
+
+
+# =========================================================
+# 🎙️ RENDER
+# =========================================================
+def _synthesize(voice: dict, text: str) -> bytes:
+    from ai_service.services.providers import elevenlabs_client, openai_sync_client
+
+    if voice["provider"] == "elevenlabs":
+        return elevenlabs_bytes(elevenlabs_client(), text, voice["voice_id"], voice["model_id"], voice["format"])
+
+    resp = openai_sync_client().audio.speech.create(
+        model=voice["model_id"], voice=voice["voice_id"], input=text, response_format=voice["format"]
+    )
+    return resp.read()
+
+
+def _load_manifest(root: str) -> dict:
+    try:
+        with open(os.path.join(root, MANIFEST_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"entries": {}}
+
+
+def _save_manifest(root: str, manifest: dict):
+    manifest["updated_at"] = datetime.utcnow().isoformat()
+    path = os.path.join(root, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def build(voices=None, root: str = PRERENDER_DIR, workers: int = 4, dry_run: bool = False, prune: bool = True) -> dict:
+    """Render whatever is missing or changed for `voices` (default: all) and update the manifest."""
+    voices = voices or list(VOICES)
+    bank = collect_texts()
+    manifest = _load_manifest(root)
+    entries = manifest.setdefault("entries", {})
+
+    wanted, todo = {}, []
+    for name in voices:
+        voice = VOICES[name]
+        for text, sources in bank.items():
+            key = tts_cache.key(text, voice["voice_id"], voice["model_id"], voice["format"])
+            wanted[key] = name
+            entry = entries.get(key)
+            if entry and os.path.exists(os.path.join(root, entry["file"])):
+                entry["sources"] = sources
+            else:
+                todo.append((key, name, text, sources))
+
+    stale = [key for key, entry in entries.items() if entry.get("voice") in voices and key not in wanted]
+    report = {"texts": len(bank), "voices": voices, "to_render": len(todo), "stale": len(stale),
+              "rendered": 0, "failed": 0}
+    if dry_run:
+        return report
+
+    lock = threading.Lock()
+
+    def render(key, name, text, sources):
+        voice = VOICES[name]
+        rel = os.path.join(name, f"{key}.{_ext(voice['format'])}")
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = _synthesize(voice, text)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        with lock:
+            entries[key] = {"voice": name, "text": text, "file": rel, "bytes": len(data), "sources": sources,
+                            **{k: voice[k] for k in ("provider", "voice_id", "model_id", "format")}}
+
+    os.makedirs(root, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render, *item): item for item in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            key, name, text, _ = futures[future]
+            try:
+                future.result()
+                report["rendered"] += 1
+            except Exception as e:
+                report["failed"] += 1
+                logging.error(f"❌ [{name}] {text[:50]}…: {e}")
+            if i % 50 == 0:
+                with lock:
+                    _save_manifest(root, manifest)
+                logging.info(f"🔊 {i}/{len(todo)} rendered")
+
+    if prune:
+        for key in stale:
+            entry = entries.pop(key)
+            try:
+                os.remove(os.path.join(root, entry["file"]))
+            except OSError:
+                pass
+
+    _save_manifest(root, manifest)
+    return report
+
+
+# =========================================================
+# 🔎 LOOKUP
+# =========================================================
+def prerendered_path(text: str, voice: str):
+    """File for `text` in `voice` if it was rendered offline, else None (in memory; safe on the loop)."""
+    spec = VOICES[voice]
+    key = tts_cache.key(text, spec["voice_id"], spec["model_id"], spec["format"])
+    return tts_cache.bank.peek(key) if tts_cache.bank is not None else None
+
+
+def prerendered_url(text: str, voice: str):
+    """Path under the /storage mount (e.g. /storage/prerendered/...) or None."""
+    return storage_url(prerendered_path(text, voice))
+
+
+def storage_url(path):
+    """URL of a file under the /storage mount, or None if it is not served from there."""
+    if not path:
+        return None
+    rel = os.path.relpath(path, STORAGE_DIR)
+    return None if rel.startswith("..") else "/storage/" + rel.replace(os.sep, "/")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Pre-render the static question bank for each voice")
+    parser.add_argument("--voice", choices=list(VOICES), action="append", help="Voice to render (default: all)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent provider requests")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be rendered")
+    parser.add_argument("--keep-stale", action="store_true", help="Do not delete clips no longer in the bank")
+    args = parser.parse_args()
+
+    report = build(args.voice, workers=args.workers, dry_run=args.dry_run, prune=not args.keep_stale)
+    print(json.dumps(report, indent=2))
+    raise SystemExit(1 if report["failed"] else 0)
@@ -0,0 +1,443 @@
+# ai_service/services/providers.py
+"""
+Shared provider clients: one pooled HTTP/2 connection pool per process.
+
+Every OpenAI / ElevenLabs SDK client in the service is built on the same
+httpx pool, so keep-alive connections (and their TLS sessions) are reused
+across flows instead of each module paying its own handshakes. Requests are
+also capped per provider (MIMIR_OPENAI_CONCURRENCY, MIMIR_ELEVENLABS_CONCURRENCY):
+over the cap they queue here, in order, rather than piling onto the provider.
+
+    from ai_service.services.providers import openai_client, elevenlabs_client
+
+    client = openai_client()        # AsyncOpenAI
+    tts = elevenlabs_client()       # sync ElevenLabs, for run_provider
+    tts = elevenlabs_async_client() # AsyncElevenLabs
+    text = await agemini(prompt)    # Gemini, cached model handle, async gRPC
+
+Gemini does not go through httpx; its model handles are cached here and its
+calls are capped by MIMIR_GEMINI_CONCURRENCY instead.
+"""
+import os
+import time
+import logging
+import threading
+import asyncio
+from collections import deque
+
+import httpx
+
+from ai_service.config.settings import (
+    HTTP2, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY_S,
+    HTTP_CONNECT_TIMEOUT_S, HTTP_TIMEOUT_S, OPENAI_CONCURRENCY, ELEVENLABS_CONCURRENCY,
+    GEMINI_CONCURRENCY, GEMINI_TIMEOUT_S, PROVIDER_KEEPALIVE_S
+)
+
+OPENAI_HOST = "api.openai.com"
+ELEVENLABS_HOST = "api.elevenlabs.io"
+GEMINI_PRO = "models/gemini-2.0-pro"
+GEMINI_FLASH = "models/gemini-2.5-flash"
+
+
+# =========================================================
+# 🚦 PER-PROVIDER LIMITS
+# =========================================================
+class ProviderLimit:
+    """
+    At most `limit` requests in flight to one provider, async and sync callers
+    together. There is one counter and one first-come-first-served queue of
+    waiters: futures for coroutines and events for threads. A release hands
+    its permit straight to the next waiter. A permit is held until the response
+    body is closed, so streamed TTS/LLM responses count for as long as they are
+    being read.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(limit, 1)
+        self.in_flight = 0
+        self.requests = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _take(self) -> bool:
+        # caller holds _lock; never jump the queue
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.requests += 1
+            return True
+        return False
+
+    async def acquire(self):
+        with self._lock:
+            if self._take():
+                return self._releaser()
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = future in self._waiters
+                if queued:
+                    self._waiters.remove(future)
+            if not queued and future.done() and not future.cancelled():
+                self._release()   # granted just as we were cancelled: pass it on
+            raise
+        return self._releaser()
+
+    def acquire_sync(self):
+        with self._lock:
+            if self._take():
+                return self._releaser()
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+        return self._releaser()
+
+    def _release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    self.requests += 1
+                    waiter.set()
+                    return
+                try:
+                    waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+                    return
+                except RuntimeError:   # its event loop is closed
+                    continue
+            self.in_flight -= 1
+
+    def _grant(self, future):
+        # on the waiter's loop; a waiter cancelled meanwhile passes the permit on
+        if future.cancelled():
+            self._release()
+            return
+        with self._lock:
+            self.requests += 1
+        future.set_result(None)
+
+    def _releaser(self):
+        done = []
+
+        def _release():
+            if not done:
+                done.append(True)
+                self._release()
+        return _release
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting, "requests": self.requests}
+
+
+LIMITS = {
+    OPENAI_HOST: ProviderLimit("openai", OPENAI_CONCURRENCY),
+    ELEVENLABS_HOST: ProviderLimit("elevenlabs", ELEVENLABS_CONCURRENCY),
+}
+# host → time.monotonic() of its last request through the pool (see keep_alive)
+_last_request = {}
+
+
+class _ReleasingAsyncStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _ReleasingSyncStream(httpx.SyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _LimitedAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        limit = LIMITS.get(request.url.host)
+        if limit is None:
+            return await self._transport.handle_async_request(request)
+        release = await limit.acquire()
+        _last_request[request.url.host] = time.monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _ReleasingAsyncStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class _LimitedSyncTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request):
+        limit = LIMITS.get(request.url.host)
+        if limit is None:
+            return self._transport.handle_request(request)
+        release = limit.acquire_sync()
+        _last_request[request.url.host] = time.monotonic()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _ReleasingSyncStream(response.stream, release)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+# =========================================================
+# 🌐 SHARED HTTP POOL
+# =========================================================
+_http = None
+_http_sync = None
+_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    if not HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx[http2])
+        return True
+    except ImportError:
+        logging.warning("⚠️ MIMIR_HTTP2=1 but the h2 package is missing — using HTTP/1.1 keep-alive")
+        return False
+
+
+def _pool_kwargs() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_S,
+        ),
+        "http2": _http2_enabled(),
+    }
+
+
+def http_client() -> httpx.AsyncClient:
+    """The process-wide async pool."""
+    global _http
+    with _lock:
+        if _http is None or _http.is_closed:
+            _http = httpx.AsyncClient(
+                transport=_LimitedAsyncTransport(httpx.AsyncHTTPTransport(**_pool_kwargs())),
+                timeout=httpx.Timeout(HTTP_TIMEOUT_S, connect=HTTP_CONNECT_TIMEOUT_S),
+            )
+        return _http
+
+
+def http_client_sync() -> httpx.Client:
+    """The process-wide sync pool, for SDK calls made from the provider executor."""
+    global _http_sync
+    with _lock:
+        if _http_sync is None or _http_sync.is_closed:
+            _http_sync = httpx.Client(
+                transport=_LimitedSyncTransport(httpx.HTTPTransport(**_pool_kwargs())),
+                timeout=httpx.Timeout(HTTP_TIMEOUT_S, connect=HTTP_CONNECT_TIMEOUT_S),
+            )
+        return _http_sync
+
+
+# =========================================================
+# 🔌 PROVIDER CLIENTS
+# =========================================================
+_clients = {}
+
+
+def _cached(name: str, factory):
+    with _lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def openai_client():
+    """Shared AsyncOpenAI on the async pool."""
+    from openai import AsyncOpenAI
+    http = http_client()
+    return _cached("openai", lambda: AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http))
+
+
+def openai_sync_client():
+    """Shared sync OpenAI on the sync pool (run it via run_provider)."""
+    from openai import OpenAI
+    http = http_client_sync()
+    return _cached("openai_sync", lambda: OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http))
+
+
+def elevenlabs_client():
+    """Shared sync ElevenLabs on the sync pool (run it via run_provider)."""
+    from elevenlabs import ElevenLabs
+    http = http_client_sync()
+    return _cached("elevenlabs", lambda: ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"), httpx_client=http))
+
+
+def elevenlabs_async_client():
+    """Shared AsyncElevenLabs on the async pool."""
+    from elevenlabs import AsyncElevenLabs
+    http = http_client()
+    return _cached("elevenlabs_async", lambda: AsyncElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"), httpx_client=http))
+
+
+# =========================================================
+# ✨ GEMINI
+# =========================================================
+_gemini_models = {}
+_gemini_limit = ProviderLimit("gemini", GEMINI_CONCURRENCY)
+
+
+def gemini_model(name: str = GEMINI_PRO):
+    """Cached GenerativeModel handle (configured once per process)."""
+    import google.generativeai as genai
+    with _lock:
+        if name not in _gemini_models:
+            if not _gemini_models:
+                genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+            _gemini_models[name] = genai.GenerativeModel(name)
+        return _gemini_models[name]
+
+
+def gemini(prompt: str, model: str = GEMINI_PRO) -> str:
+    """Blocking Gemini call for sync code (crew tasks, run_provider)."""
+    release = _gemini_limit.acquire_sync()
+    try:
+        response = gemini_model(model).generate_content(prompt, request_options={"timeout": GEMINI_TIMEOUT_S})
+    finally:
+        release()
+    return response.text.strip()
+
+
+async def agemini(prompt: str, model: str = GEMINI_PRO) -> str:
+    """Gemini on the event loop (async gRPC); a slow response only holds its own request."""
+    release = await _gemini_limit.acquire()
+    try:
+        response = await gemini_model(model).generate_content_async(
+            prompt, request_options={"timeout": GEMINI_TIMEOUT_S}
+        )
+    finally:
+        release()
+    return response.text.strip()
+
+
+# =========================================================
+# ♻️ LIFECYCLE
+# =========================================================
+async def warm():
+    """Open a pooled (TLS) connection to each provider so the first turn starts warm."""
+    from ai_service.services.executors import run_provider
+
+    async def _one(url, client):
+        try:
+            await client(url)
+        except Exception as e:
+            logging.warning(f"⚠️ Provider warm-up failed for {url}: {e}")
+
+    urls = [f"https://{host}/" for host in LIMITS]
+    await asyncio.gather(
+        *[_one(url, http_client().head) for url in urls],
+        *[_one(url, lambda u: run_provider(http_client_sync().head, u)) for url in urls],
+    )
+    logging.info(f"🌐 Provider pools warm (HTTP/2: {_http2_enabled()})")
+
+
+# =========================================================
+# 🔁 CONNECTION KEEP-ALIVE
+# =========================================================
+KEEPALIVE_HOSTS = (OPENAI_HOST,)   # conversation replies: LLM and TTS
+_keepalive = {"until": 0.0, "task": None, "pings": 0}
+
+
+def keep_alive(duration: float = PROVIDER_KEEPALIVE_S):
+    """
+    Keep the pooled connections to KEEPALIVE_HOSTS open for the next
+    `duration` seconds, e.g. after a reply while the patient listens and
+    answers. There is one task per process however many sessions are idle;
+    each call only pushes its deadline out.
+    """
+    _keepalive["until"] = max(_keepalive["until"], time.monotonic() + duration)
+    task = _keepalive["task"]
+    loop = asyncio.get_running_loop()
+    if task is None or task.done() or task.get_loop() is not loop:
+        _keepalive["task"] = loop.create_task(_keep_alive())
+
+
+async def _keep_alive():
+    """A host idle for most of HTTP_KEEPALIVE_EXPIRY_S gets a HEAD before its connection expires."""
+    interval = HTTP_KEEPALIVE_EXPIRY_S * 0.75
+
+    async def _ping(host):
+        try:
+            await http_client().head(f"https://{host}/")
+            _keepalive["pings"] += 1
+        except Exception as e:
+            logging.debug(f"Keep-alive ping to {host} failed: {e}")
+        finally:
+            _last_request[host] = time.monotonic()
+
+    while True:
+        now = time.monotonic()
+        await asyncio.gather(*[_ping(h) for h in KEEPALIVE_HOSTS if now - _last_request.get(h, 0.0) >= interval])
+        due = min(_last_request[h] for h in KEEPALIVE_HOSTS) + interval
+        if due >= _keepalive["until"]:
+            return
+        await asyncio.sleep(max(due - time.monotonic(), 1.0))
+
+
+async def aclose():
+    global _http, _http_sync
+    task = _keepalive["task"]
+    if task is not None and not task.done():
+        task.cancel()
+    with _lock:
+        http, http_sync = _http, _http_sync
+        _http = _http_sync = None
+        _clients.clear()
+    if http is not None:
+        await http.aclose()
+    if http_sync is not None:
+        http_sync.close()
+
+
+def provider_stats() -> dict:
+    report = {limit.name: limit.stats() for limit in LIMITS.values()}
+    report["gemini"] = _gemini_limit.stats()
+    report["keep_alive"] = {
+        "active": _keepalive["task"] is not None and not _keepalive["task"].done(),
+        "pings": _keepalive["pings"],
+    }
+    return report
@@ -0,0 +1,78 @@
+# ai_service/services/speculation.py
+"""
+Speculative next-turn work while the patient listens and answers.
+
+Between sending a question and receiving the answer the server is idle for
+the whole TTS playback plus the patient's reply. A session starts a
+Speculator then; it precomputes candidate results keyed by what the next
+turn will need to look them up (e.g. the detected emotion), and the next
+turn takes the matching one instead of doing the work again.
+
+    speculator = Speculator("life_review")
+    speculator.start(precompute, state=version)     # after sending the question
+    ...
+    hit = speculator.take(emotion, state=version)    # next turn; None on a miss
+
+`precompute(put)` is a coroutine function that calls `put(key, value)` for
+every candidate as soon as it is ready, so a turn arriving mid-speculation
+can still use what is done. `state` guards against stale candidates: a take
+only matches candidates computed for the same session state. Starting a new
+speculation cancels the previous one.
+
+Totals (speculations, candidates, hits, misses, cancelled) are in GET /models.
+"""
+import asyncio
+import logging
+
+from ai_service.config.settings import SPECULATE
+
+_stats = {"speculations": 0, "candidates": 0, "hits": 0, "misses": 0, "cancelled": 0, "errors": 0}
+
+
+class Speculator:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = None
+        self.candidates = {}
+        self._task = None
+
+    def start(self, precompute, state=None):
+        """Run `precompute(put)` in the background for session state `state`."""
+        self.cancel()
+        self.state = state
+        self.candidates = {}
+        if not SPECULATE:
+            return
+        _stats["speculations"] += 1
+        self._task = asyncio.get_running_loop().create_task(self._run(precompute, state))
+
+    async def _run(self, precompute, state):
+        def put(key, value):
+            if self.state == state:
+                self.candidates[key] = value
+                _stats["candidates"] += 1
+
+        try:
+            await precompute(put)
+        except asyncio.CancelledError:
+            _stats["cancelled"] += 1
+        except Exception as e:
+            _stats["errors"] += 1
+            logging.warning(f"⚠️ Speculation ({self.name}) failed: {e}")
+
+    def take(self, key, state=None):
+        """The candidate for `key` if one was computed for `state`, else None."""
+        value = self.candidates.get(key) if state == self.state else None
+        _stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+
+def speculation_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {**_stats, "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None}
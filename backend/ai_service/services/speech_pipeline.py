@@ -0,0 +1,132 @@
+# ai_service/services/speech_pipeline.py
+"""
+LLM token stream → sentences → TTS audio, pipelined.
+
+The segmenter cuts the token stream at sentence boundaries; each sentence is
+sent to TTS as soon as it is complete, while the LLM keeps generating. Audio
+is emitted strictly in sentence order: the first sentence streams live and
+later ones synthesize in the background (up to TTS_PIPELINE_LOOKAHEAD at a
+time), so time-to-first-audio is roughly first-sentence latency instead of
+full completion + full synthesis.
+
+    async for kind, data in speak(brain.stream_user_message(text), tts_stream):
+        # ("sentence", str) · ("audio", bytes) · ("text", full reply) or ("error", str)
+"""
+import re
+import asyncio
+import logging
+
+from ai_service.config.settings import SENTENCE_MIN_CHARS, TTS_PIPELINE_LOOKAHEAD
+
+# Terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_BOUNDARY = re.compile(r"[.!?…]+[\"'”’)\]]*\s+")
+# Words whose trailing period is not a sentence end
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "jr", "sr", "vs", "etc", "e.g", "i.e", "prof", "mt"}
+
+
+# =========================================================
+# ✂️ SENTENCE SEGMENTER
+# =========================================================
+class SentenceSegmenter:
+    """Incremental splitter: feed() token deltas, get back sentences that are complete."""
+
+    def __init__(self, min_chars: int = SENTENCE_MIN_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def _is_abbreviation(self, end: int) -> bool:
+        word = self.buffer[:end].rstrip(".").rsplit(None, 1)[-1:] or [""]
+        word = word[0].lower()
+        return word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+    def feed(self, delta: str) -> list:
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self.buffer):
+            if match.group().startswith(".") and self._is_abbreviation(match.start() + 1):
+                continue
+            candidate = self.buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue  # too short to synthesize on its own; grow it with the next sentence
+            sentences.append(candidate)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> list:
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
+
+
+# =========================================================
+# 🔊 PIPELINE
+# =========================================================
+_DONE = object()
+
+
+async def speak(tokens, tts_stream, lookahead: int = TTS_PIPELINE_LOOKAHEAD):
+    """
+    `tokens`: async iterator of text deltas.
+    `tts_stream(text)`: async iterator of audio chunks for one sentence.
+    Yields ("sentence", text) when a sentence is dispatched, ("audio", chunk)
+    in playback order, and ("text", full_reply) once the LLM stream completes.
+    If the LLM stream fails, ("error", message) comes instead of "text" (the
+    audio of sentences already dispatched still plays) and no partial reply
+    is reported as the answer.
+    """
+    out = asyncio.Queue()
+    order = asyncio.Queue()  # per-sentence chunk queues, in sentence order
+    slots = asyncio.Semaphore(max(lookahead, 1))
+    tasks = []
+
+    async def synthesize(sentence, chunks):
+        async with slots:
+            try:
+                async for chunk in tts_stream(sentence):
+                    await chunks.put(chunk)
+            except Exception as e:
+                logging.error(f"❌ TTS failed for sentence '{sentence[:40]}': {e}")
+            finally:
+                await chunks.put(_DONE)
+
+    async def dispatch(sentence):
+        chunks = asyncio.Queue()
+        tasks.append(asyncio.create_task(synthesize(sentence, chunks)))
+        await order.put(chunks)
+        await out.put(("sentence", sentence))
+
+    async def produce():
+        segmenter = SentenceSegmenter()
+        parts = []
+        try:
+            async for delta in tokens:
+                parts.append(delta)
+                for sentence in segmenter.feed(delta):
+                    await dispatch(sentence)
+            for sentence in segmenter.flush():
+                await dispatch(sentence)
+        except Exception as e:
+            logging.error(f"❌ Reply stream failed after {len(parts)} tokens: {e}")
+            await out.put(("error", str(e)))
+        else:
+            await out.put(("text", "".join(parts).strip()))
+        finally:
+            await order.put(_DONE)
+
+    async def play():
+        while (chunks := await order.get()) is not _DONE:
+            while (chunk := await chunks.get()) is not _DONE:
+                await out.put(("audio", chunk))
+        await out.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    player = asyncio.create_task(play())
+    try:
+        while (item := await out.get()) is not _DONE:
+            yield item
+        await producer
+    finally:
+        for task in [producer, player, *tasks]:
+            task.cancel()
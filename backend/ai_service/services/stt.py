@@ -1,17 +1,11 @@
-import os
-import tempfile
-from openai import AsyncOpenAI
+from ai_service.services.asr import get_engine
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-async def transcribe_audio(wav_path: str) -> str:
+async def transcribe_audio(audio) -> str:
+    """`audio`: wav path, encoded bytes or 16 kHz float32 PCM."""
     try:
-        with open(wav_path, "rb") as f:
-            resp = await client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f
-            )
-        return resp.text
+        # Local faster-whisper by default; MIMIR_ASR_FLOW_ENGINES=conversation=openai_api for whisper-1
+        result = await get_engine("conversation").atranscribe(audio)
+        return result["text"]
     except Exception as e:
         print("❌ STT ERROR:", e)
         return ""
@@ -1,26 +1,39 @@
 import base64
 import os
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from pathlib import Path
+from ai_service.services.providers import openai_client
+from ai_service.services.executors import run_io
+from ai_service.services.tts_cache import tts_cache
 
 load_dotenv()
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = openai_client()
 
 # ----------------------------------
 # NON-STREAMING TTS (FULL AUDIO)
 # ----------------------------------
+async def _synthesize(text: str) -> bytes:
+    resp = await client.audio.speech.create(
+        model="gpt-4o-mini-tts",
+        voice="alloy",
+        input=text
+    )
+
+    # YOUR SDK returns HttpxBinaryResponseContent
+    # So .read() is SYNC — do NOT await.
+    return resp.read()
+
+
+async def tts_cached(text: str) -> str:
+    """Path of the cached mp3 for `text`; cached by (text, voice, model, format), concurrent misses share one request."""
+    return await tts_cache.aget_or_create(text, "alloy", "gpt-4o-mini-tts", "mp3", lambda: _synthesize(text))
+
+
 async def tts_full(text: str) -> str:
     try:
-        resp = await client.audio.speech.create(
-            model="gpt-4o-mini-tts",
-            voice="alloy",
-            input=text
-        )
-
-        # YOUR SDK returns HttpxBinaryResponseContent
-        # So .read() is SYNC — do NOT await.
-        audio_bytes = resp.read()
+        path = await tts_cached(text)
+        audio_bytes = await run_io(Path(path).read_bytes)
 
         return base64.b64encode(audio_bytes).decode()
 
@@ -30,19 +43,29 @@ async def tts_full(text: str) -> str:
 
 
 # ----------------------------------
-# STREAMING TTS (PCM chunks)
+# STREAMING TTS (raw audio chunks)
 # ----------------------------------
-async def tts_stream(text: str):
+async def tts_stream_bytes(text: str, audio_format: str = "mp3"):
+    """Raw audio bytes as they arrive; `audio_format`: mp3, opus, aac, flac, wav or pcm."""
     try:
         async with client.audio.speech.with_streaming_response.create(
             model="gpt-4o-mini-tts",
             voice="alloy",
-            input=text
+            input=text,
+            response_format=audio_format
         ) as r:
             async for chunk in r.iter_bytes():
                 if chunk:
-                    yield base64.b64encode(chunk).decode()
+                    yield chunk
 
     except Exception as e:
         print("❌ STREAM TTS ERROR:", e)
         return
+
+
+# ----------------------------------
+# STREAMING TTS (base64 chunks)
+# ----------------------------------
+async def tts_stream(text: str):
+    async for chunk in tts_stream_bytes(text):
+        yield base64.b64encode(chunk).decode()
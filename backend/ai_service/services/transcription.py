@@ -0,0 +1,140 @@
+# ai_service/services/transcription.py
+"""
+Long-audio transcription on top of a registry ASR pipeline.
+
+Audio is decoded once into a float32 NumPy array, cut into overlapping
+windows and sent to the pipeline as a single batched call — no chunk files
+on disk. Each window shares ASR_OVERLAP_S seconds with its neighbour, so a
+word cut at one boundary is heard whole in the next window; the repeated
+words are removed when the transcripts are stitched.
+"""
+import re
+import logging
+
+import numpy as np
+
+from ai_service import model_registry
+from ai_service.config.settings import ASR_SAMPLE_RATE, ASR_WINDOW_S, ASR_OVERLAP_S, ASR_BATCH_SIZE
+
+# Whisper speaks roughly 2–3 words per second; look a bit further to be safe
+_WORDS_PER_SECOND = 4
+_MIN_MATCH_WORDS = 2
+
+
+# =========================================================
+# 🎧 AUDIO
+# =========================================================
+def load_audio(source, sr: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """Path, encoded audio bytes or array → mono float32 samples at `sr`."""
+    if isinstance(source, np.ndarray):
+        return source.astype(np.float32, copy=False)
+    import librosa
+    if isinstance(source, (bytes, bytearray)):
+        import io
+        import soundfile as sf
+        audio, native_sr = sf.read(io.BytesIO(source), dtype="float32", always_2d=True)
+        audio = audio.mean(axis=1)
+        if native_sr != sr:
+            audio = librosa.resample(audio, orig_sr=native_sr, target_sr=sr)
+        return audio.astype(np.float32, copy=False)
+    audio, _ = librosa.load(source, sr=sr, mono=True)
+    return audio.astype(np.float32, copy=False)
+
+
+def split_windows(audio: np.ndarray, sr: int = ASR_SAMPLE_RATE,
+                  window_s: float = ASR_WINDOW_S, overlap_s: float = ASR_OVERLAP_S) -> list:
+    """
+    Overlapping views into `audio` (no copies). The last window is aligned
+    to the end of the recording so no tail is left out or padded.
+    """
+    window = int(window_s * sr)
+    if len(audio) <= window:
+        return [audio]
+    step = max(window - int(overlap_s * sr), 1)
+    starts = list(range(0, len(audio) - window, step)) + [len(audio) - window]
+    return [audio[s:s + window] for s in starts]
+
+
+# =========================================================
+# 🧵 STITCHING
+# =========================================================
+def _norm(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _seam(tail: list, head: list, reach: int):
+    """
+    (a, b, size) of the shared word run that sits at the seam, or None.
+
+    The overlap audio is the end of one window and the start of the next, so
+    the repeated words must end within `reach` words of the tail's end and
+    start within `reach` words of the head. Of those runs the one closest to
+    the seam wins (then the longest): a phrase the patient merely says twice
+    is never taken for the overlap.
+    """
+    best = None
+    for i in range(len(tail)):
+        for j in range(min(len(head), reach + 1)):
+            if tail[i] != head[j] or (i and j and tail[i - 1] == head[j - 1]):
+                continue  # not the start of a run
+            size = 0
+            while i + size < len(tail) and j + size < len(head) and tail[i + size] == head[j + size]:
+                size += 1
+            gap = len(tail) - (i + size)
+            if size < _MIN_MATCH_WORDS or gap > reach:
+                continue
+            key = (gap + j, -size)
+            if best is None or key < best[0]:
+                best = (key, i, j, size)
+    return best[1:] if best else None
+
+
+def stitch(texts: list, overlap_s: float = ASR_OVERLAP_S) -> str:
+    """
+    Join per-window transcripts, dropping the words each window repeats from
+    the previous one. The duplicate run is a common word sequence anchored at
+    the seam (see _seam); when there is none the texts are simply joined.
+    """
+    reach = max(int(overlap_s * _WORDS_PER_SECOND), 4)
+    max_words = reach * 2
+    words = []
+    for text in texts:
+        nxt = text.split()
+        if not nxt:
+            continue
+        if not words:
+            words = nxt
+            continue
+
+        tail = words[-max_words:]
+        head = nxt[:max_words]
+        seam = _seam([_norm(w) for w in tail], [_norm(w) for w in head], reach)
+        if seam:
+            # keep our side up to the end of the shared run, theirs after it
+            a, b, size = seam
+            cut = len(words) - len(tail) + a + size
+            words = words[:cut] + nxt[b + size:]
+        else:
+            words += nxt
+    return " ".join(words)
+
+
+# =========================================================
+# 📝 TRANSCRIBE
+# =========================================================
+def transcribe(source, model_key: str = "whisper_tiny", batch_size: int = ASR_BATCH_SIZE) -> str:
+    """
+    Transcribe a file path or 16 kHz float32 array of any length.
+    All windows go through the ASR pipeline in one batched call.
+    """
+    asr = model_registry.handle(model_key)
+    audio = load_audio(source)
+    windows = split_windows(audio)
+    inputs = [{"raw": w, "sampling_rate": ASR_SAMPLE_RATE} for w in windows]
+
+    if len(inputs) == 1:
+        return asr(inputs[0])["text"].strip()
+
+    outputs = asr(inputs, batch_size=min(batch_size, len(inputs)))
+    logging.info(f"🎧 Transcribed {len(audio) / ASR_SAMPLE_RATE:.1f}s in {len(inputs)} windows")
+    return stitch([o["text"].strip() for o in outputs])
@@ -1,10 +1,10 @@
 import os
 import base64
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from ai_service.services.providers import openai_client
 
 load_dotenv()
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = openai_client()
 
 VOICE = "alloy"
 
@@ -0,0 +1,366 @@
+# ai_service/services/tts_cache.py
+"""
+Content-addressed cache for synthesized speech, shared by every flow.
+
+Audio is stored once per hash(text, voice_id, model_id, format) under
+TTS_CACHE_DIR, indexed in memory in LRU order and evicted once the directory
+grows past TTS_CACHE_MAX_MB. Concurrent misses for the same key are
+coalesced: one caller synthesizes, the others wait for its file.
+
+Clips rendered offline by services/prerender.py (the knowledge question
+bank) sit in front of the LRU under the same keys and are never evicted.
+
+    path = elevenlabs_tts(client, text, voice_id)      # sync (IO pool)
+    path = await aelevenlabs_tts(text, voice_id)       # async SDK, on the loop
+    path = await tts_cache.aget_or_create(text, "alloy", "gpt-4o-mini-tts", "mp3", synth)
+    url_path = publish(path, TTS_DIR, prefix="tts_")   # hardlink into a served dir
+"""
+import os
+import json
+import shutil
+import asyncio
+import hashlib
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from ai_service.services.executors import run_io
+from ai_service.config.settings import TTS_CACHE_DIR, TTS_CACHE_MAX_MB, PRERENDER_DIR
+
+ELEVEN_MODEL = "eleven_multilingual_v2"
+ELEVEN_FORMAT = "mp3_44100_128"
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _ext(fmt: str) -> str:
+    return fmt.split("_", 1)[0]
+
+
+class PrerenderedBank:
+    """
+    Read side of the pre-rendered question bank: cache key → file.
+
+    get() re-reads the manifest when it changed (blocking: IO pool or startup);
+    peek() is the event-loop check and only looks at what is already loaded.
+    """
+
+    def __init__(self, root: str = PRERENDER_DIR):
+        self.root = root
+        self._mtime = None
+        self._entries = {}
+        self._loaded = False
+
+    def refresh(self):
+        self._loaded = True
+        path = os.path.join(self.root, MANIFEST_FILE)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            self._mtime, self._entries = None, {}
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            self._entries = {
+                key: os.path.join(self.root, entry["file"]) for key, entry in manifest.get("entries", {}).items()
+            }
+            self._mtime = mtime
+            logging.info(f"🔊 Pre-rendered bank: {len(self._entries)} clips")
+        except Exception as e:
+            logging.error(f"❌ Could not read pre-render manifest: {e}")
+
+    def get(self, key: str):
+        self.refresh()
+        path = self._entries.get(key)
+        return path if path and os.path.exists(path) else None
+
+    def peek(self, key: str):
+        """In-memory lookup, no disk access (the manifest is read once if startup did not)."""
+        if not self._loaded:
+            self.refresh()
+        return self._entries.get(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TTSCache:
+
+    def __init__(self, root: str = TTS_CACHE_DIR, max_mb: float = TTS_CACHE_MAX_MB, bank: PrerenderedBank = None):
+        self.root = root
+        self.bank = bank
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._index = None  # key → (path, size), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}   # key → concurrent Future (thread callers)
+        self._ainflight = {}  # key → asyncio Task synthesizing it (event-loop callers)
+        # Metrics
+        self.hits = 0
+        self.prerendered_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    # =========================================================
+    # 🗂 INDEX
+    # =========================================================
+    @staticmethod
+    def key(text: str, voice_id: str, model_id: str, fmt: str) -> str:
+        payload = json.dumps([" ".join(text.split()), voice_id, model_id, fmt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{_ext(fmt)}")
+
+    def _load_index(self):
+        """Rebuild the index from disk (oldest first) the first time the cache is touched."""
+        if self._index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.root):
+            for shard in os.scandir(self.root):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, entry.name.split(".", 1)[0], entry.path, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, (path, size)) for _, key, path, size in entries)
+        self._bytes = sum(size for _, _, _, size in entries)
+        logging.info(f"🔊 TTS cache: {len(self._index)} clips, {self._bytes / 1024 / 1024:.1f} MB")
+
+    def load(self):
+        """Read the cache index and the bank manifest (blocking; once at startup, via run_io)."""
+        with self._lock:
+            self._load_index()
+        if self.bank is not None:
+            self.bank.refresh()
+
+    def peek(self, key: str):
+        """
+        Event-loop hit check: in-memory only, no lock, no disk access, so it
+        never waits behind a store() evicting in the IO pool. None means
+        "not known here" and the caller falls back to lookup() via run_io.
+        """
+        if self.bank is not None:
+            path = self.bank.peek(key)
+            if path:
+                self.prerendered_hits += 1
+                return path
+        index = self._index
+        entry = index.get(key) if index is not None else None
+        if entry is None:
+            return None
+        try:
+            index.move_to_end(key)   # one GIL-atomic step; a concurrent eviction may have just taken it
+        except KeyError:
+            return None
+        return entry[0]
+
+    def lookup(self, key: str):
+        if self.bank is not None:
+            path = self.bank.get(key)
+            if path:
+                self.prerendered_hits += 1
+                return path
+        with self._lock:
+            self._load_index()
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            if not os.path.exists(entry[0]):
+                del self._index[key]
+                self._bytes -= entry[1]
+                return None
+            self._index.move_to_end(key)
+            return entry[0]
+
+    def store(self, key: str, fmt: str, data: bytes) -> str:
+        """Write atomically (tmp + rename), index, and evict down to the size cap."""
+        path = self._path(key, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._load_index()
+            old = self._index.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+            self._index[key] = (path, len(data))
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                _, (old_path, size) = self._index.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        return path
+
+    # =========================================================
+    # 🔁 GET OR SYNTHESIZE (single flight)
+    # =========================================================
+    def get_or_create(self, text: str, voice_id: str, model_id: str, fmt: str, synth) -> str:
+        """
+        Blocking variant for thread callers. `synth()` returns the audio bytes
+        and only runs on a miss, at most once per key at a time.
+        """
+        key = self.key(text, voice_id, model_id, fmt)
+        path = self.lookup(key)
+        if path:
+            self.hits += 1
+            return path
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.coalesced += 1
+            return future.result()
+
+        try:
+            path = self.lookup(key)
+            if path is None:
+                self.misses += 1
+                path = self.store(key, fmt, synth())
+            future.set_result(path)
+            return path
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_create(self, text: str, voice_id: str, model_id: str, fmt: str, synth) -> str:
+        """
+        Async variant: `synth` is a coroutine function returning the audio bytes.
+
+        The synthesis runs in its own task that every caller for the key awaits
+        through a shield, so a caller that is cancelled (its client went away)
+        never cancels the clip for the others; it still lands in the cache.
+        """
+        key = self.key(text, voice_id, model_id, fmt)
+        path = self.peek(key)
+        if path is None and key not in self._ainflight:
+            # Index scan, manifest reload, stat and the store lock stay off the loop
+            path = await run_io(self.lookup, key)
+        if path:
+            self.hits += 1
+            return path
+
+        task = self._ainflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._ainflight[key] = asyncio.get_running_loop().create_task(self._asynthesize(key, fmt, synth))
+            # Mark a failure retrieved when every caller has gone away
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task)
+
+    async def _asynthesize(self, key: str, fmt: str, synth) -> str:
+        try:
+            return await run_io(self.store, key, fmt, await synth())
+        finally:
+            self._ainflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "clips": len(self._index),
+                "mb": round(self._bytes / 1024 / 1024, 1),
+                "max_mb": round(self.max_bytes / 1024 / 1024, 1),
+                "hits": self.hits,
+                "prerendered_clips": len(self.bank) if self.bank is not None else 0,
+                "prerendered_hits": self.prerendered_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            }
+
+
+tts_cache = TTSCache(bank=PrerenderedBank())
+
+
+# =========================================================
+# 🎙️ PROVIDER HELPERS
+# =========================================================
+def elevenlabs_bytes(client, text: str, voice_id: str, model_id: str = ELEVEN_MODEL, fmt: str = ELEVEN_FORMAT) -> bytes:
+    stream = client.text_to_speech.convert(
+        voice_id=voice_id, model_id=model_id, text=text, output_format=fmt
+    )
+    return b"".join(chunk for chunk in stream if isinstance(chunk, bytes))
+
+
+def elevenlabs_tts(client, text: str, voice_id: str, model_id: str = ELEVEN_MODEL, fmt: str = ELEVEN_FORMAT) -> str:
+    """Cached ElevenLabs synthesis (sync SDK — call from the IO pool). Returns the cached file path."""
+    return tts_cache.get_or_create(
+        text, voice_id, model_id, fmt, lambda: elevenlabs_bytes(client, text, voice_id, model_id, fmt)
+    )
+
+
+async def aelevenlabs_bytes(text: str, voice_id: str, model_id: str = ELEVEN_MODEL, fmt: str = ELEVEN_FORMAT,
+                            client=None) -> bytes:
+    """ElevenLabs synthesis with the async SDK (shared AsyncElevenLabs unless `client` is given)."""
+    if client is None:
+        from ai_service.services.providers import elevenlabs_async_client
+        client = elevenlabs_async_client()
+    stream = client.text_to_speech.convert(
+        voice_id=voice_id, model_id=model_id, text=text, output_format=fmt
+    )
+    if inspect.isawaitable(stream):  # older SDKs return a coroutine of the iterator
+        stream = await stream
+    return b"".join([chunk async for chunk in stream if isinstance(chunk, bytes)])
+
+
+async def aelevenlabs_tts(text: str, voice_id: str, model_id: str = ELEVEN_MODEL, fmt: str = ELEVEN_FORMAT,
+                          client=None) -> str:
+    """Cached ElevenLabs synthesis without an IO-pool thread. Returns the cached file path."""
+    return await tts_cache.aget_or_create(
+        text, voice_id, model_id, fmt, lambda: aelevenlabs_bytes(text, voice_id, model_id, fmt, client)
+    )
+
+
+def gtts_tts(text: str, lang: str = "en") -> str:
+    """Cached gTTS fallback voice."""
+    def synth():
+        import io
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buf)
+        return buf.getvalue()
+    return tts_cache.get_or_create(text, f"gtts:{lang}", "gtts", "mp3", synth)
+
+
+def publish(path: str, dest_dir: str, prefix: str = "") -> str:
+    """
+    Expose a cached clip inside a flow's served storage dir (hardlink, copy
+    across filesystems). Same content → same filename, so it is linked once.
+    """
+    dest = os.path.join(dest_dir, prefix + os.path.basename(path))
+    if not os.path.exists(dest):
+        try:
+            os.link(path, dest)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copyfile(path, dest)
+    return dest
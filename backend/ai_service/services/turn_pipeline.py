@@ -0,0 +1,148 @@
+# ai_service/services/turn_pipeline.py
+"""
+Per-turn stage orchestrator.
+
+A turn is declared as stages with dependencies; every stage starts as soon
+as the stages it needs are done, so independent work (emotion + sentiment,
+TTS + persistence, ...) overlaps and turn latency tracks the critical path
+instead of the sum of the stages.
+
+    pipeline = TurnPipeline("screening", [
+        Stage("emotion", classify, needs=("transcript",), timeout=5, fallback="neutral"),
+        Stage("sentiment", sentiment, needs=("transcript",), timeout=5, fallback=None),
+        Stage("question", next_question, needs=("transcript", "emotion")),
+        Stage("audio", tts, needs=("question", "emotion")),
+        Stage("save", persist, needs=("transcript", "emotion", "sentiment"), background=True),
+    ])
+    results = await pipeline.run(transcript=text)
+
+A stage is an async function called with its dependencies as keyword
+arguments. On timeout or error it resolves to its `fallback` (a value, or a
+callable taking the exception) when one is given; otherwise the turn fails.
+Background stages (persistence) are not awaited by run(): they finish on
+their own and their errors are only logged.
+"""
+import time
+import asyncio
+import logging
+
+from ai_service.config.settings import STAGE_TIMEOUT_S
+
+_NO_FALLBACK = object()
+
+# Background stages still running (strong refs, so they are not collected mid-flight)
+_background = set()
+
+
+class StageFailed(RuntimeError):
+    pass
+
+
+class Stage:
+    def __init__(self, name: str, fn, needs: tuple = (), timeout: float = STAGE_TIMEOUT_S,
+                 fallback=_NO_FALLBACK, background: bool = False):
+        self.name = name
+        self.fn = fn
+        self.needs = tuple(needs)
+        self.timeout = timeout
+        self.fallback = fallback
+        self.background = background
+
+
+class TurnPipeline:
+
+    def __init__(self, name: str, stages: list):
+        self.name = name
+        self.stages = list(stages)
+        self.turns = 0
+        self.elapsed_ms = 0.0
+        self.stage_ms = {s.name: 0.0 for s in self.stages}
+        self.fallbacks = {s.name: 0 for s in self.stages}
+        self._check_order()
+
+    def _check_order(self):
+        """Stages must be listed after the stages they need (no cycles)."""
+        seen = set()
+        stage_names = {s.name for s in self.stages}
+        for stage in self.stages:
+            missing = [n for n in stage.needs if n in stage_names and n not in seen]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' needs {missing}, which are declared after it")
+            seen.add(stage.name)
+
+    async def _run_stage(self, stage: Stage, futures: dict, inputs: dict):
+        kwargs = {}
+        for need in stage.needs:
+            kwargs[need] = await futures[need] if need in futures else inputs[need]
+
+        began = time.perf_counter()
+        try:
+            return await asyncio.wait_for(stage.fn(**kwargs), stage.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else f"failed: {e}"
+            if stage.fallback is _NO_FALLBACK:
+                raise StageFailed(f"{self.name}.{stage.name} {reason}") from e
+            logging.warning(f"⚠️ {self.name}.{stage.name} {reason} — using fallback")
+            self.fallbacks[stage.name] += 1
+            return stage.fallback(e) if callable(stage.fallback) else stage.fallback
+        finally:
+            self.stage_ms[stage.name] += (time.perf_counter() - began) * 1000
+
+    async def run(self, **inputs) -> dict:
+        """Run one turn; returns every foreground stage's result (plus the inputs) by name."""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for stage in self.stages:
+            futures[stage.name] = loop.create_task(self._run_stage(stage, futures, inputs))
+
+        foreground = {}
+        for stage in self.stages:
+            task = futures[stage.name]
+            if stage.background:
+                _background.add(task)
+                task.add_done_callback(self._background_done)
+            else:
+                foreground[stage.name] = task
+
+        try:
+            values = await asyncio.gather(*foreground.values())
+        except BaseException:
+            for task in foreground.values():
+                task.cancel()
+            raise
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.turns += 1
+        self.elapsed_ms += elapsed
+        logging.info(f"⏱ {self.name} turn: {elapsed:.0f} ms")
+        return {**inputs, **dict(zip(foreground, values))}
+
+    def _background_done(self, task):
+        _background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"❌ {self.name} background stage failed: {task.exception()}")
+
+    def stats(self) -> dict:
+        turns = self.turns or 1
+        return {
+            "turns": self.turns,
+            "avg_turn_ms": round(self.elapsed_ms / turns, 1) if self.turns else None,
+            # Sum of stage averages vs. turn average: the gap is what concurrency saves
+            "avg_stage_ms": {name: round(ms / turns, 1) for name, ms in self.stage_ms.items()},
+            "fallbacks": {name: n for name, n in self.fallbacks.items() if n},
+        }
+
+
+PIPELINES = {}
+
+
+def register(pipeline: TurnPipeline) -> TurnPipeline:
+    PIPELINES[pipeline.name] = pipeline
+    return pipeline
+
+
+def pipeline_stats() -> dict:
+    return {name: p.stats() for name, p in PIPELINES.items()}
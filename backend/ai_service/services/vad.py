@@ -0,0 +1,133 @@
+# ai_service/services/vad.py
+"""
+Energy-based voice activity detection on 16 kHz float32 PCM (NumPy only).
+
+Each frame's RMS level (dBFS) is compared with a noise floor that tracks
+the quiet frames, so it adapts to the room and the microphone.
+
+    StreamingVAD   live frames → speech_start / pause / speech_end events
+    trim_silence   whole recording → speech only (uploads, before ASR)
+"""
+import numpy as np
+
+from ai_service.config.settings import (
+    ASR_SAMPLE_RATE, VAD_FRAME_MS, VAD_MARGIN_DB, VAD_MIN_DB, VAD_SPEECH_DB, VAD_START_MS, VAD_PAD_MS,
+    LIVE_PAUSE_MS, LIVE_END_MS
+)
+
+
+def frame_db(frames: np.ndarray) -> np.ndarray:
+    """RMS level in dBFS of each row of `frames`."""
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-6))
+
+
+class StreamingVAD:
+    """
+    Feed PCM as it arrives; process() returns events with absolute sample offsets:
+
+        ("speech_start", offset)  speech began (VAD_START_MS of consecutive speech)
+        ("pause", offset)         silence of `pause_ms` inside speech — a good ASR cut point
+        ("speech_end", offset)    silence of `end_ms` — the speaker finished the turn
+    """
+
+    def __init__(self, sr: int = ASR_SAMPLE_RATE, frame_ms: int = VAD_FRAME_MS, margin_db: float = VAD_MARGIN_DB,
+                 min_db: float = VAD_MIN_DB, start_ms: int = VAD_START_MS,
+                 pause_ms: int = LIVE_PAUSE_MS, end_ms: int = LIVE_END_MS):
+        self.frame = int(sr * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.start_frames = max(start_ms // frame_ms, 1)
+        self.pause_frames = max(pause_ms // frame_ms, 1)
+        self.end_frames = max(end_ms // frame_ms, 1)
+
+        self.noise_db = min_db - margin_db
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.paused = False
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._offset = 0  # samples consumed so far (frame aligned)
+
+    def is_speech(self, level_db: float) -> bool:
+        return level_db > max(self.noise_db + self.margin_db, self.min_db)
+
+    def process(self, samples: np.ndarray) -> list:
+        samples = np.concatenate([self._rest, samples.astype(np.float32, copy=False)])
+        n = len(samples) // self.frame
+        self._rest = samples[n * self.frame:]
+        if n == 0:
+            return []
+
+        events = []
+        for level in frame_db(samples[:n * self.frame].reshape(n, self.frame)):
+            self._offset += self.frame
+            if self.is_speech(level):
+                self.speech_run += 1
+                self.silence_run = 0
+                self.paused = False
+                if not self.in_speech and self.speech_run >= self.start_frames:
+                    self.in_speech = True
+                    events.append(("speech_start", self._offset - self.speech_run * self.frame))
+            else:
+                self.speech_run = 0
+                # Slowly follow the background level; drop quickly when it gets quieter
+                rate = 0.05 if level > self.noise_db else 0.3
+                self.noise_db += rate * (level - self.noise_db)
+                if self.in_speech:
+                    self.silence_run += 1
+                    if self.silence_run == self.pause_frames and not self.paused:
+                        self.paused = True
+                        events.append(("pause", self._offset - self.silence_run * self.frame))
+                    if self.silence_run >= self.end_frames:
+                        self.in_speech = False
+                        self.paused = False
+                        events.append(("speech_end", self._offset - self.silence_run * self.frame))
+        return events
+
+
+def trim_silence(pcm: np.ndarray, sr: int = ASR_SAMPLE_RATE, frame_ms: int = VAD_FRAME_MS,
+                 margin_db: float = VAD_MARGIN_DB, min_db: float = VAD_MIN_DB,
+                 start_ms: int = VAD_START_MS, pad_ms: int = VAD_PAD_MS, speech_db: float = VAD_SPEECH_DB) -> tuple:
+    """
+    Drop leading/trailing silence and shorten long pauses to 2 × `pad_ms`.
+    Returns (speech samples, seconds of detected speech); an empty array
+    means the recording has no speech at all.
+
+    The noise floor is the 10th percentile of the frame levels, and bursts
+    shorter than `start_ms` (clicks, taps) do not count as speech. When the
+    levels span less than `margin_db` there is nothing to compare against, so
+    frames count as speech only above `speech_db`.
+    """
+    frame = int(sr * frame_ms / 1000)
+    n = len(pcm) // frame
+    if n == 0:
+        return pcm[:0], 0.0
+
+    levels = frame_db(pcm[:n * frame].reshape(n, frame))
+    floor, loud = np.percentile(levels, [10, 90])
+    if loud - floor >= margin_db:
+        # A recording that is speech throughout has no quiet 10th percentile: cap by the loud end
+        threshold = max(min(floor + margin_db, loud - margin_db), min_db)
+    else:
+        # Flat levels: steady background noise or unbroken speech, told apart by absolute level
+        threshold = max(speech_db, min_db)
+    speech = levels > threshold
+
+    # Runs of speech frames: keep only those at least start_ms long
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], speech.astype(np.int8), [0]])))
+    starts, ends = edges[::2], edges[1::2]
+    long_enough = (ends - starts) >= max(start_ms // frame_ms, 1)
+    speech[:] = False
+    for s, e in zip(starts[long_enough], ends[long_enough]):
+        speech[s:e] = True
+    if not speech.any():
+        return pcm[:0], 0.0
+
+    # Pad every run; whatever silence is left uncovered is cut out
+    pad = max(pad_ms // frame_ms, 0)
+    keep = np.convolve(speech.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode="same") > 0
+    mask = np.repeat(keep, frame)
+    if keep[-1]:
+        mask = np.concatenate([mask, np.ones(len(pcm) - len(mask), dtype=bool)])
+    return pcm[:len(mask)][mask], float(speech.sum() * frame / sr)
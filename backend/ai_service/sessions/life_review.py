@@ -1,9 +1,35 @@
 import json
 import random
+import logging
 from pathlib import Path
-from openai import AsyncOpenAI
+from ai_service.services.providers import openai_client
+from ai_service.services.prerender import prerendered_url, storage_url
+from ai_service.services.text_to_speech_tool import tts_cached
+from ai_service.services.speculation import Speculator
+from ai_service.services.turn_pipeline import TurnPipeline, Stage, register
+from ai_service.services import emotion_cascade
+from ai_service.config.settings import ANALYSIS_TIMEOUT_S
+
+client = openai_client()
+
+SADNESS_FOLLOWUPS = [
+    "That sounds really heavy. Do you feel okay talking more about it?",
+    "I hear how difficult that feels. Would you like to continue?",
+    "Thank you for sharing that with me. Want to talk about it more?"
+]
+
+SECTION_DONE = "Thank you. That covers everything for this section."
+
+
+def clean_question(text: str) -> str:
+    """First question only, capped at 30 words."""
+    if "?" in text:
+        text = text.split("?")[0] + "?"
+    words = text.split()
+    if len(words) > 30:
+        text = " ".join(words[:30]) + "?"
+    return text.strip()
 
-client = AsyncOpenAI()
 
 class LifeReviewSession:
 
@@ -16,6 +42,11 @@ class LifeReviewSession:
         # Conversation progression
         self.asked_ids = set()
         self.last_question_id = None
+        # Pre-rendered audio for the last reply, if it is in the offline bank (services/prerender.py)
+        self.last_question_audio_url = None
+        self.last_emotion = "neutral"
+        # Next-question candidates (+ audio) precomputed while the patient listens
+        self.speculator = Speculator("life_review")
         self.memory = []
         self.max_history = 4
 
@@ -65,12 +96,24 @@ class LifeReviewSession:
 
         self._store_memory("user", user_text)
 
-        emotion = await self._detect_emotion(user_text)
+        # emotion (timed out → neutral) → reply; see LIFE_REVIEW_TURN below
+        turn = await LIFE_REVIEW_TURN.run(session=self, user_text=user_text)
+
+        # Idle until the answer arrives: prepare the likely next questions now
+        self.speculator.start(self._speculate, state=frozenset(self.asked_ids))
+        return turn["reply"]
+
+    async def _emotion_stage(self, user_text: str) -> str:
+        return await self._detect_emotion(user_text)
+
+    async def _reply_stage(self, user_text: str, emotion: str) -> str:
+        self.last_emotion = emotion
 
         # SADNESS OVERRIDE
         if emotion == "sadness":
             reply = self._sadness_reply(user_text)
             self._store_memory("ai", reply)
+            self.last_question_audio_url = prerendered_url(reply, "conversation")
             return reply
 
         # NORMAL FLOW
@@ -79,6 +122,7 @@ class LifeReviewSession:
         clean_q = self._clean_question(next_q["prompt"])
         self.last_question_id = next_q["id"]
         self._store_memory("ai", clean_q)
+        self.last_question_audio_url = next_q.get("audio_url") or prerendered_url(clean_q, "conversation")
 
         return clean_q
 
@@ -87,36 +131,14 @@ class LifeReviewSession:
     # EMOTION DETECTION
     # --------------------------------------------
     async def _detect_emotion(self, text: str) -> str:
-        prompt = f"""
-Classify the emotion of this message into ONE category:
-joy, neutral, stress, sadness, nostalgia, pride, regret, curiosity, faith, trust, values, growth, creativity, inspiration, ambition, hope.
-
-Only output the emotion. No punctuation.
-Message: "{text}"
-"""
-        try:
-            res = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=3,
-                temperature=0
-            )
-            emotion = res.choices[0].message.content.lower().strip()
-            return emotion or "neutral"
-        except:
-            return "neutral"
+        # Local classifier first; gpt-4o-mini only when it is unsure
+        return await LIFE_REVIEW_EMOTION.classify(text)
 
 
     # --------------------------------------------
     # SADNESS HANDLER
     # --------------------------------------------
     def _sadness_reply(self, user_text: str) -> str:
-        followups = [
-            "That sounds really heavy. Do you feel okay talking more about it?",
-            "I hear how difficult that feels. Would you like to continue?",
-            "Thank you for sharing that with me. Want to talk about it more?"
-        ]
-
         crisis_terms = ["suicide", "kill myself", "end my life", "self-harm"]
         if any(term in user_text.lower() for term in crisis_terms):
             return (
@@ -125,7 +147,7 @@ Message: "{text}"
                 "a trained professional or someone you trust. "
                 "Would you like to continue our conversation gently?"
             )
-        return random.choice(followups)
+        return random.choice(SADNESS_FOLLOWUPS)
 
 
     # --------------------------------------------
@@ -133,12 +155,24 @@ Message: "{text}"
     # --------------------------------------------
     def _get_next_question(self, emotion: str) -> dict:
 
+        # Speculated during the last playback for this emotion and these asked_ids?
+        chosen = self.speculator.take(emotion, state=frozenset(self.asked_ids))
+        if chosen is None:
+            chosen = self._pick_next_question(emotion)
+
+        if chosen["id"] != "done":
+            self.asked_ids.add(chosen["id"])
+
+        return chosen
+
+    def _pick_next_question(self, emotion: str) -> dict:
+        """Next question for `emotion`, without marking it asked."""
         unused = [q for q in self.question_db if q["id"] not in self.asked_ids]
 
         if not unused:
             return {
                 "id": "done",
-                "prompt": "Thank you. That covers everything for this section."
+                "prompt": SECTION_DONE
             }
 
         # Emotion-matched suggestions
@@ -155,11 +189,39 @@ Message: "{text}"
         chosen = pool[0].copy()
         chosen["prompt"] = random.choice(chosen["prompt_variants"])
 
-        self.asked_ids.add(chosen["id"])
-
         return chosen
 
 
+    # --------------------------------------------
+    # SPECULATIVE NEXT QUESTION (services/speculation.py)
+    # --------------------------------------------
+    async def _speculate(self, put):
+        """
+        Candidate next question for the last emotion and each emotion the local
+        classifier can return, with its audio rendered (bank clip or TTS cache).
+        """
+        emotions = dict.fromkeys([self.last_emotion, *LIFE_REVIEW_EMOTION.mapping.values()])
+        by_id = {}
+        for emotion in emotions:
+            if emotion == "sadness":
+                continue  # answered from SADNESS_FOLLOWUPS (pre-rendered)
+            question = self._pick_next_question(emotion)
+            if question["id"] in by_id:
+                put(emotion, by_id[question["id"]])
+                continue
+
+            question["prompt"] = self._clean_question(question["prompt"])
+            question["audio_url"] = prerendered_url(question["prompt"], "conversation")
+            by_id[question["id"]] = question
+            put(emotion, question)
+
+            if question["audio_url"] is None:
+                try:
+                    question["audio_url"] = storage_url(await tts_cached(question["prompt"]))
+                except Exception as e:
+                    logging.warning(f"⚠️ Speculative TTS failed: {e}")
+
+
     # --------------------------------------------
     # MEMORY STORAGE
     # --------------------------------------------
@@ -173,9 +235,60 @@ Message: "{text}"
     # CLEAN QUESTION
     # --------------------------------------------
     def _clean_question(self, text: str) -> str:
-        if "?" in text:
-            text = text.split("?")[0] + "?"
-        words = text.split()
-        if len(words) > 30:
-            text = " ".join(words[:30]) + "?"
-        return text.strip()
+        return clean_question(text)
+
+
+# --------------------------------------------
+# EMOTION CASCADE (services/emotion_cascade.py)
+# --------------------------------------------
+async def _llm_emotion(text: str) -> str:
+    prompt = f"""
+Classify the emotion of this message into ONE category:
+joy, neutral, stress, sadness, nostalgia, pride, regret, curiosity, faith, trust, values, growth, creativity, inspiration, ambition, hope.
+
+Only output the emotion. No punctuation.
+Message: "{text}"
+"""
+    res = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=3,
+        temperature=0
+    )
+    return res.choices[0].message.content.lower().strip()
+
+
+# DistilRoBERTa labels → question emotion_tags
+LIFE_REVIEW_EMOTION = emotion_cascade.register(emotion_cascade.EmotionCascade(
+    "life_review",
+    mapping={
+        "joy": "joy",
+        "neutral": "neutral",
+        "sadness": "sadness",
+        "fear": "stress",
+        "anger": "stress",
+        "disgust": "stress",
+        "surprise": "curiosity",
+    },
+    llm=_llm_emotion,
+))
+
+
+# --------------------------------------------
+# TURN STAGES (services/turn_pipeline.py)
+# --------------------------------------------
+# Question choice depends on the emotion, so the turn is one chain; the
+# emotion call gets its own timeout so a slow classifier costs at most
+# ANALYSIS_TIMEOUT_S and the turn continues as "neutral".
+async def _emotion(session, user_text):
+    return await session._emotion_stage(user_text)
+
+
+async def _reply(session, user_text, emotion):
+    return await session._reply_stage(user_text, emotion)
+
+
+LIFE_REVIEW_TURN = register(TurnPipeline("life_review", [
+    Stage("emotion", _emotion, needs=("session", "user_text"), timeout=ANALYSIS_TIMEOUT_S, fallback="neutral"),
+    Stage("reply", _reply, needs=("session", "user_text", "emotion")),
+]))
@@ -2,12 +2,14 @@
 import os, uuid, logging
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import FileResponse
-from transformers import pipeline
-from elevenlabs import ElevenLabs
-import google.generativeai as genai
+from ai_service.services.providers import agemini
+from ai_service.services.tts_cache import aelevenlabs_bytes
 import soundfile as sf
 import librosa
 import subprocess
+from pathlib import Path
+from ai_service.services.executors import run_io
+from ai_service.services.asr import get_engine
 
 router = APIRouter(prefix="/speech", tags=["Speech-to-Speech"])
 
@@ -31,9 +33,16 @@ if not ELEVEN_API_KEY:
 if not GEMINI_KEY:
     raise RuntimeError("Missing GOOGLE_API_KEY")
 
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
-genai.configure(api_key=GEMINI_KEY)
-asr_model = pipeline("automatic-speech-recognition", model="openai/whisper-tiny", device=-1)
+asr_engine = get_engine("speech_to_speech")
+
+# =========================================================
+# 🧰 HELPERS
+# =========================================================
+async def _synthesize_to_file(text: str, output_path: str) -> str:
+    audio = await aelevenlabs_bytes(text, "EXAVITQu4vr4xnSDxMaL")
+    await run_io(Path(output_path).write_bytes, audio)
+    return output_path
+
 
 # =========================================================
 # 🎧 SPEECH → SPEECH
@@ -43,39 +52,28 @@ async def speech_to_speech(audio: UploadFile = File(...)):
     """Takes a voice file, transcribes it, generates a human-like reply, and returns voice output."""
     try:
         input_path = os.path.join(INPUT_DIR, f"user_{uuid.uuid4().hex}.wav")
-        with open(input_path, "wb") as f:
-            f.write(await audio.read())
+        await run_io(Path(input_path).write_bytes, await audio.read())
 
         # Convert to mono 16kHz WAV for Whisper
         temp_wav = input_path.replace(".wav", "_converted.wav")
-        subprocess.run(
+        await run_io(
+            subprocess.run,
             ["ffmpeg", "-y", "-i", input_path, "-ar", "16000", "-ac", "1", temp_wav],
             stdout=subprocess.PIPE, stderr=subprocess.PIPE
         )
 
         # Step 1 — Transcribe
-        text = asr_model(temp_wav)["text"].strip()
+        text = (await asr_engine.atranscribe(temp_wav))["text"]
         logging.info(f"🗣️ User said: {text}")
 
         # Step 2 — Generate response (Gemini)
-        model = genai.GenerativeModel("models/gemini-2.0-pro")
         prompt = f"The person said: '{text}'. Reply warmly, naturally, and briefly."
-        response = model.generate_content(prompt)
-        ai_reply = response.text.strip()
+        ai_reply = await agemini(prompt)
         logging.info(f"💬 AI reply: {ai_reply}")
 
         # Step 3 — Convert reply to voice
-        audio_stream = client.text_to_speech.convert(
-            voice_id="EXAVITQu4vr4xnSDxMaL",
-            model_id="eleven_multilingual_v2",
-            text=ai_reply
-        )
-
         output_path = os.path.join(OUTPUT_DIR, f"reply_{uuid.uuid4().hex}.mp3")
-        with open(output_path, "wb") as f:
-            for chunk in audio_stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
+        await _synthesize_to_file(ai_reply, output_path)
 
         return {
             "transcript": text,
@@ -4,16 +4,15 @@ import uuid
 import json
 import random
 import torch
-import librosa
-import soundfile as sf
 import logging
 from datetime import datetime
-from functools import lru_cache
+from functools import partial
 from crewai import Task
 from fastapi import HTTPException
-from transformers import pipeline
-from elevenlabs import ElevenLabs
-from gtts import gTTS
+from ai_service import model_registry
+from ai_service.services.asr import get_engine
+from ai_service.services.tts_cache import elevenlabs_tts, gtts_tts, publish
+from ai_service.services.providers import elevenlabs_client
 from ai_service.agents import legacy_curator  # ✅ Import the actual agent
 
 # =========================================================
@@ -30,59 +29,34 @@ os.makedirs(TTS_DIR, exist_ok=True)
 
 QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "..", "knowledge", "about_you_questions.json")
 SUPER_MEMORY_DIR = os.path.join(os.path.dirname(__file__), "..", "supermemory", "about_you")
-MAX_DURATION = 30  # seconds
 
 # =========================================================
 # ⚙️ MODEL HELPERS
 # =========================================================
-@lru_cache(maxsize=1)
+_asr = model_registry.handle("whisper_tiny")
+_emotion_model = model_registry.handle("emotion")
+_chat_model = model_registry.handle("phi3_chat")
+
 def get_asr():
     """Load Whisper ASR model"""
-    device = 0 if torch.cuda.is_available() else -1
-    return pipeline("automatic-speech-recognition", model="openai/whisper-tiny", device=device)
+    return _asr
 
-@lru_cache(maxsize=1)
 def get_emotion_model():
     """Load emotion classification model"""
-    return pipeline("text-classification", model="j-hartmann/emotion-english-distilroberta-base", device=-1)
+    return _emotion_model
 
-@lru_cache(maxsize=1)
 def get_chat_model():
     """Load Phi-3-mini text generation model"""
-    device = 0 if torch.cuda.is_available() else -1
-    return pipeline(
-        "text-generation",
-        model="microsoft/Phi-3-mini-4k-instruct",
-        device=device,
-        torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-        max_new_tokens=150,
-        temperature=0.7,
-        top_p=0.9
-    )
-
-tts_client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+    return partial(_chat_model, max_new_tokens=150, temperature=0.7, top_p=0.9)
+
+tts_client = elevenlabs_client()
 
 # =========================================================
 # 🎧 AUDIO UTILITIES
 # =========================================================
 def transcribe_audio(file_path: str) -> str:
-    """Transcribe long audio files safely by splitting into chunks."""
-    asr = get_asr()
-    audio, sr = librosa.load(file_path, sr=16000)
-    duration = librosa.get_duration(y=audio, sr=sr)
-
-    if duration <= MAX_DURATION:
-        return asr(file_path)["text"]
-
-    text_output = ""
-    for start in range(0, int(duration), MAX_DURATION):
-        end = min(start + MAX_DURATION, int(duration))
-        chunk = audio[start * sr:end * sr]
-        temp = os.path.join(INPUT_DIR, f"chunk_{uuid.uuid4().hex}.wav")
-        sf.write(temp, chunk, sr)
-        text_output += " " + asr(temp)["text"]
-        os.remove(temp)
-    return text_output.strip()
+    """Transcribe long audio files with the About You ASR engine (see services/asr.py)."""
+    return get_engine("about_you").transcribe(file_path)["text"]
 
 # =========================================================
 # 🧠 MEMORY
@@ -107,8 +81,7 @@ def save_to_memory(question_id, question_text, user_text, emotion, ai_reply):
 # 🔊 TTS
 # =========================================================
 def generate_voice(text, emotion=None):
-    """Generate emotional voice output using ElevenLabs or gTTS fallback."""
-    output_path = os.path.join(TTS_DIR, f"aboutyou_{uuid.uuid4().hex}.mp3")
+    """Generate emotional voice output using ElevenLabs or gTTS fallback (cached, see services/tts_cache.py)."""
     voice_map = {
         "joy": "EXAVITQu4vr4xnSDxMaL",
         "happiness": "EXAVITQu4vr4xnSDxMaL",
@@ -124,20 +97,11 @@ def generate_voice(text, emotion=None):
     selected = voice_map.get(emotion, "MF3mGyEYCl7XYWbV9V6O")
 
     try:
-        stream = tts_client.text_to_speech.convert(
-            voice_id=selected,
-            model_id="eleven_multilingual_v2",
-            text=text
-        )
-        with open(output_path, "wb") as f:
-            for chunk in stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
-        return output_path
+        cached = elevenlabs_tts(tts_client, text, selected)
     except Exception as e:
         logging.warning(f"⚠️ ElevenLabs failed ({e}), falling back to gTTS.")
-        gTTS(text=text, lang="en").save(output_path)
-        return output_path
+        cached = gtts_tts(text)
+    return publish(cached, TTS_DIR, prefix="aboutyou_")
 
 # =========================================================
 # 🧩 CREWAI TASK
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import io
 import uuid
 import json
@@ -8,20 +9,25 @@ import logging
 import librosa
 import soundfile as sf
 from datetime import datetime
-from functools import lru_cache
+from pathlib import Path
+from functools import partial
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse
-from transformers import pipeline
-from elevenlabs import ElevenLabs
-from gtts import gTTS
+from ai_service import model_registry
 from pydub import AudioSegment
 
 # ===== IMPORTS FROM OTHER MODULES =====
-from ai_service.stt import transcribe_audio
-from ai_service.emotion import get_emotion
-from ai_service.sentiment import analyze_sentiment
+from ai_service.emotion import get_emotion_async
+from ai_service.sentiment import analyze_sentiment_async
 from ai_service.profile_manager import add_reflection
+from ai_service.memory_manager import MemoryManager
 from ai_service.agents import get_next_question
+from ai_service.services.executors import run_cpu, run_io, run_provider
+from ai_service.services.asr import get_engine
+from ai_service.services.audio_ingest import ingest_bytes, REPEAT_PROMPT
+from ai_service.services.turn_pipeline import TurnPipeline, Stage, register
+from ai_service.config.settings import ANALYSIS_TIMEOUT_S
+from ai_service.services.tts_cache import aelevenlabs_tts, gtts_tts, publish
 
 # =========================================================
 # 🔧 SETUP
@@ -42,41 +48,32 @@ SUPER_MEMORY_DIR = "/home/ubuntu/Mimir/ai_service/supermemory/screening"
 os.makedirs(SUPER_MEMORY_DIR, exist_ok=True)
 
 MAX_DURATION = 30  # seconds
-TTS_CLIENT = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
 
 # =========================================================
 # 🧠 CACHED MODELS
 # =========================================================
-@lru_cache(maxsize=1)
+_asr = model_registry.handle("whisper_tiny")
+_emotion_model = model_registry.handle("emotion")
+_chat_model = model_registry.handle("phi3_chat")
+_asr_engine = get_engine("screening")
+
 def get_asr():
-    logging.warning("🎧 Loading Whisper ASR model (lazy)...")
-    device = 0 if torch.cuda.is_available() else -1
-    return pipeline("automatic-speech-recognition", model="openai/whisper-tiny", device=device)
+    """Shared Whisper ASR pipeline (loaded lazily by the model registry)."""
+    return _asr
 
-@lru_cache(maxsize=1)
 def get_emotion_model():
-    logging.warning("💬 Loading Emotion Detection model (lazy)...")
-    return pipeline("text-classification", model="j-hartmann/emotion-english-distilroberta-base", device=-1)
+    """Shared emotion classification pipeline."""
+    return _emotion_model
 
-@lru_cache(maxsize=1)
 def get_chat_model():
-    logging.warning("💭 Loading Phi-3-mini Chat model (lazy)...")
-    device = 0 if torch.cuda.is_available() else -1
-    return pipeline(
-        "text-generation",
-        model="microsoft/Phi-3-mini-4k-instruct",
-        device=device,
-        max_new_tokens=150,
-        temperature=0.8,
-        top_p=0.9
-    )
+    """Shared Phi-3-mini pipeline, with this flow's sampling settings."""
+    return partial(_chat_model, max_new_tokens=150, temperature=0.8, top_p=0.9)
 
 # =========================================================
 # 🔊 TTS GENERATOR
 # =========================================================
-def generate_voice(text, emotion=None):
-    """Generate emotion-aware voice."""
-    output_path = os.path.join(TTS_DIR, f"tts_{uuid.uuid4().hex}.mp3")
+async def generate_voice(text, emotion=None):
+    """Generate emotion-aware voice (cached by text + voice, see services/tts_cache.py)."""
     voice_map = {
         "joy": "EXAVITQu4vr4xnSDxMaL",
         "happiness": "EXAVITQu4vr4xnSDxMaL",
@@ -88,22 +85,67 @@ def generate_voice(text, emotion=None):
     selected_voice = voice_map.get(emotion, "MF3mGyEYCl7XYWbV9V6O")
 
     try:
-        audio_stream = TTS_CLIENT.text_to_speech.convert(
-            voice_id=selected_voice,
-            model_id="eleven_multilingual_v2",
-            text=text
-        )
-        with open(output_path, "wb") as f:
-            for chunk in audio_stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
-        logging.info(f"✅ TTS saved → {output_path}")
-        return output_path
+        cached = await aelevenlabs_tts(text, selected_voice)
     except Exception as e:
         logging.warning(f"⚠️ ElevenLabs failed ({e}) — fallback to gTTS.")
-        tts = gTTS(text=text, lang="en")
-        tts.save(output_path)
-        return output_path
+        cached = await run_io(gtts_tts, text)
+    output_path = await run_io(publish, cached, TTS_DIR, "tts_")
+    logging.info(f"✅ TTS ready → {output_path}")
+    return output_path
+
+# =========================================================
+# 🔀 REPLY STAGES (see services/turn_pipeline.py)
+# =========================================================
+# transcript ─┬─ emotion ──┬─ next question ── TTS
+#             │            └──────────────────────────┐
+#             └─ sentiment ─────────────────── save reflection (background)
+FALLBACK_QUESTION = "Would you like to tell me more about that?"
+
+
+def _emotion_label(emotion) -> str:
+    return (emotion.get("dominant_emotion") or "neutral").lower() if isinstance(emotion, dict) else "neutral"
+
+
+async def _stage_emotion(transcript):
+    return await get_emotion_async(transcript)
+
+
+async def _stage_sentiment(transcript):
+    return await analyze_sentiment_async(transcript)
+
+
+async def _stage_question(patient_id, transcript, emotion):
+    next_q = await run_provider(get_next_question, patient_id, transcript, _emotion_label(emotion))
+    return next_q.get("next_question") or next_q.get("text") or FALLBACK_QUESTION
+
+
+async def _stage_audio(question, emotion):
+    return await generate_voice(question, _emotion_label(emotion))
+
+
+async def _stage_save(patient_id, question_id, transcript, emotion, sentiment):
+    await run_io(add_reflection, patient_id, {
+        "question_id": question_id,
+        "transcript": transcript,
+        "emotion": emotion,
+        "sentiment": sentiment
+    })
+    # Semantic memory for later recall: the embedding is a forward pass, so CPU pool
+    await MemoryManager().aremember(
+        patient_id, transcript, kind="reflection", emotion=_emotion_label(emotion), question_id=question_id
+    )
+
+
+reply_turn = register(TurnPipeline("screening_reply", [
+    Stage("emotion", _stage_emotion, needs=("transcript",), timeout=ANALYSIS_TIMEOUT_S,
+          fallback={"dominant_emotion": "neutral"}),
+    Stage("sentiment", _stage_sentiment, needs=("transcript",), timeout=ANALYSIS_TIMEOUT_S,
+          fallback={"sentiment": "unknown", "confidence": 0.0}),
+    Stage("question", _stage_question, needs=("patient_id", "transcript", "emotion"), fallback=FALLBACK_QUESTION),
+    Stage("audio", _stage_audio, needs=("question", "emotion")),
+    Stage("save", _stage_save, needs=("patient_id", "question_id", "transcript", "emotion", "sentiment"),
+          background=True),
+]))
 
 # =========================================================
 # 🚀 ROUTE: START SCREENING
@@ -117,7 +159,7 @@ async def start_screening(patient_id: str = Form(...)):
         first = sorted(questions, key=lambda q: q["priority"])[0]
         question_id = first["id"]
         question_text = random.choice(first["prompt_variants"])
-        audio_file = generate_voice(question_text)
+        audio_file = await generate_voice(question_text)
 
         return {
             "patient_id": patient_id,
@@ -140,47 +182,46 @@ async def screening_reply(
 ):
     """Receive patient's audio, transcribe, analyze emotion, and generate the next adaptive question."""
     try:
-        # 1️⃣ Save audio
+        # 1️⃣ Save audio while it is decoded; trim silence
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         filename = f"{patient_id}_{question_id}_{timestamp}.wav"
         file_path = os.path.join(INPUT_DIR, filename)
-        with open(file_path, "wb") as f:
-            f.write(await audio.read())
+        data = await audio.read()
+        _, speech = await asyncio.gather(
+            run_io(Path(file_path).write_bytes, data),
+            ingest_bytes(data, label=filename),
+        )
         file_url = f"{API_BASE_URL}/storage/screening/input/{filename}"
 
-        # 2️⃣ Transcribe
-        transcript_result = transcribe_audio(file_path)
-        transcript = transcript_result if isinstance(transcript_result, str) else transcript_result.get("text", "")
-
-        # 3️⃣ Analyze emotion & sentiment
-        emotion = get_emotion(transcript)
-        sentiment = analyze_sentiment(transcript)
-
-        # 4️⃣ Save reflection memory
-        add_reflection(patient_id, {
-            "question_id": question_id,
-            "transcript": transcript,
-            "emotion": emotion,
-            "sentiment": sentiment
-        })
+        # 2️⃣ A silent recording is asked again without ASR/emotion/LLM
+        if not len(speech):
+            repeat_audio_file = await generate_voice(REPEAT_PROMPT)
+            return {
+                "message": "No speech detected.",
+                "patient_id": patient_id,
+                "question_id": question_id,
+                "transcript": "",
+                "next_question": REPEAT_PROMPT,
+                "next_question_audio": f"{API_BASE_URL}/storage/screening/tts/{os.path.basename(repeat_audio_file)}",
+                "file_url": file_url
+            }
 
-        # 5️⃣ Get adaptive next question
-        next_q = get_next_question(patient_id, transcript, emotion)
-        next_question_text = next_q.get("text", "Would you like to tell me more about that?")
+        # 3️⃣ Transcribe (speech only)
+        transcript = (await _asr_engine.atranscribe(speech))["text"]
 
-        # 6️⃣ Generate TTS for next question
-        next_audio_file = generate_voice(next_question_text, emotion)
-        next_audio_url = f"{API_BASE_URL}/storage/screening/tts/{os.path.basename(next_audio_file)}"
+        # 4️⃣ Emotion ∥ sentiment → next question → TTS; reflection saved in the background
+        turn = await reply_turn.run(patient_id=patient_id, question_id=question_id, transcript=transcript)
+        next_audio_url = f"{API_BASE_URL}/storage/screening/tts/{os.path.basename(turn['audio'])}"
 
-        # 7️⃣ Respond with full structured data
+        # 5️⃣ Respond with full structured data
         return {
             "message": "Processed successfully.",
             "patient_id": patient_id,
             "question_id": question_id,
             "transcript": transcript,
-            "emotion": emotion,
-            "sentiment": sentiment,
-            "next_question": next_question_text,
+            "emotion": turn["emotion"],
+            "sentiment": turn["sentiment"],
+            "next_question": turn["question"],
             "next_question_audio": next_audio_url,
             "file_url": file_url
         }
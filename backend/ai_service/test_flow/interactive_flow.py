@@ -1,8 +1,10 @@
-from openai import AsyncOpenAI
+import base64
+from ai_service.services.providers import openai_client
+from ai_service.services.prerender import prerendered_path, prerendered_url
 from ai_service.test_flow.qa_stt_tool import qa_speech_to_text
 from ai_service.tools.text_to_speech_tool import synthesize_speech
 
-client = AsyncOpenAI()
+client = openai_client()
 
 CATEGORY_QUESTIONS = {
     "Introduction": "Can you tell me a bit about yourself?",
@@ -29,11 +31,20 @@ CATEGORY_QUESTIONS = {
 # ---------------------- Start Conversation ----------------------
 async def start_conversation_for_category(category: str):
     question = CATEGORY_QUESTIONS.get(category, "Tell me more about that part of your life.")
-    audio_data = await synthesize_speech(question)
+
+    # Openers are rendered offline (services/prerender.py); only synthesize on a miss
+    path = prerendered_path(question, "conversation")
+    if path:
+        with open(path, "rb") as f:
+            audio_b64 = base64.b64encode(f.read()).decode()
+    else:
+        audio_b64 = (await synthesize_speech(question)).get("base64", "")
+
     return {
         "category": category,
         "first_question_text": question,
-        "first_question_audio": audio_data.get("base64", ""),
+        "first_question_audio": audio_b64,
+        "first_question_audio_url": prerendered_url(question, "conversation"),
     }
 
 
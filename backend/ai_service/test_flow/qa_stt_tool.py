@@ -1,6 +1,6 @@
-from openai import AsyncOpenAI
+from ai_service.services.providers import openai_client
 
-client = AsyncOpenAI()
+client = openai_client()
 
 async def qa_speech_to_text(audio_path: str) -> str:
     """
@@ -1,7 +1,7 @@
-from openai import OpenAI
+from ai_service.services.providers import openai_sync_client
 from ai_service.test_flow.qa_stt_tool import qa_speech_to_text
 
-client = OpenAI()
+client = openai_sync_client()
 
 def run_two_agent_test(audio_path: str):
     """
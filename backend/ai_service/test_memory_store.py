@@ -0,0 +1,239 @@
+"""
+MemoryManager storage backends (services/memory_store.py) on real files.
+
+Several workers share one set of files, so most cases open two stores on the
+same path, standing in for two uvicorn processes (each takes the flock and
+catches up on the other's records exactly as a separate process would).
+
+    cd backend && python -m pytest ai_service/test_memory_store.py -q
+"""
+import os
+import json
+import time
+import functools
+
+from ai_service.services import memory_store
+from ai_service.services.memory_store import LogStore, SegmentStore
+
+# Debounce longer than any test: records stay queued until flush() is called
+QUEUED_MS = 60_000
+
+
+def _apply(state, record):
+    state.setdefault(record["user"], []).append(record["text"])
+    return state
+
+
+def _log_store(path, **kwargs):
+    kwargs.setdefault("flush_interval_ms", QUEUED_MS)
+    store = LogStore(str(path), {}, _apply, **kwargs)
+    store.load()
+    return store
+
+
+def _record(text, user="u"):
+    return {"op": "turn", "user": user, "text": text}
+
+
+def _log_lines(store):
+    with open(store.log_path) as f:
+        return [json.loads(line) for line in f][1:]   # first line is the log header
+
+
+# =========================================================
+# 🪵 LOG + SNAPSHOT
+# =========================================================
+def test_replay_after_compaction_is_snapshot_plus_log(tmp_path):
+    store = _log_store(tmp_path / "session.json", compact_every=3)
+    for n in range(5):
+        store.commit(_record(f"t{n}"))
+        store.flush()
+
+    with open(store.snapshot_path) as f:
+        snapshot = json.load(f)
+    assert snapshot == {"seq": 3, "data": {"u": ["t0", "t1", "t2"]}}
+    assert [r["text"] for r in _log_lines(store)] == ["t3", "t4"]
+
+    reloaded = _log_store(tmp_path / "session.json", compact_every=3)
+    assert reloaded.state == {"u": ["t0", "t1", "t2", "t3", "t4"]}
+    assert reloaded.seq == 5
+
+
+def test_records_already_in_the_snapshot_are_not_replayed_twice(tmp_path):
+    # A crash between writing the snapshot and swapping in the empty log
+    store = _log_store(tmp_path / "session.json", compact_every=100)
+    for n in range(3):
+        store.commit(_record(f"t{n}"))
+    store.flush()
+    with open(store.snapshot_path, "w") as f:
+        json.dump({"seq": 2, "data": {"u": ["t0", "t1"]}}, f)
+
+    assert _log_store(tmp_path / "session.json").state == {"u": ["t0", "t1", "t2"]}
+
+
+def test_torn_last_line_is_dropped_and_the_log_stays_writable(tmp_path):
+    store = _log_store(tmp_path / "session.json")
+    store.commit(_record("t0"))
+    store.commit(_record("t1"))
+    store.flush()
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"op": "turn", "user": "u", "te')   # crash mid-append
+
+    reloaded = _log_store(tmp_path / "session.json")
+    assert reloaded.state == {"u": ["t0", "t1"]}
+    with open(store.log_path, "rb") as f:
+        assert f.read().endswith(b"\n")
+
+    reloaded.commit(_record("t2"))
+    reloaded.flush()
+    assert _log_store(tmp_path / "session.json").state == {"u": ["t0", "t1", "t2"]}
+
+
+def test_legacy_json_file_is_imported_once(tmp_path):
+    legacy = tmp_path / "session.json"
+    legacy.write_text(json.dumps({"u": ["old"]}))
+
+    store = _log_store(legacy)
+    store.commit(_record("new"))
+    store.flush()
+
+    assert _log_store(legacy).state == {"u": ["old", "new"]}
+    assert json.loads(legacy.read_text()) == {"u": ["old"]}
+
+
+# =========================================================
+# 👥 TWO WORKERS ON ONE LOG
+# =========================================================
+def test_interleaved_writers_reload_in_log_order(tmp_path):
+    a = _log_store(tmp_path / "session.json")
+    b = _log_store(tmp_path / "session.json")
+
+    a.commit(_record("t1"))
+    a.flush()
+    b.commit(_record("t2"))    # queued in b while a writes t3
+    a.commit(_record("t3"))
+    a.flush()
+
+    # b's view: the log as written, with its own queued record on top
+    assert b.current() == {"u": ["t1", "t3", "t2"]}
+
+    b.flush()
+    assert [r["text"] for r in _log_lines(a)] == ["t1", "t3", "t2"]
+    assert a.current() == {"u": ["t1", "t3", "t2"]}
+    assert _log_store(tmp_path / "session.json").state == {"u": ["t1", "t3", "t2"]}
+    assert a.metrics["foreign_records"] == 1   # t2
+    assert b.metrics["foreign_records"] == 2   # t1, t3
+
+
+def test_worker_catches_up_across_another_workers_compaction(tmp_path):
+    a = _log_store(tmp_path / "session.json", compact_every=2)
+    b = _log_store(tmp_path / "session.json", compact_every=2)
+
+    for n in range(3):   # a compacts after its second record: new snapshot, new log
+        a.commit(_record(f"a{n}"))
+        a.flush()
+    b.commit(_record("b0"))
+    b.flush()
+
+    expected = {"u": ["a0", "a1", "a2", "b0"]}
+    assert b.current() == expected
+    assert a.current() == expected
+    assert _log_store(tmp_path / "session.json").state == expected
+
+
+def test_rapid_commits_are_written_in_one_flush(tmp_path):
+    store = _log_store(tmp_path / "session.json", flush_interval_ms=50)
+    for n in range(5):
+        store.commit(_record(f"t{n}"))
+    assert store.pending and not _log_lines(store)
+
+    deadline = time.monotonic() + 2
+    while store.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [r["text"] for r in _log_lines(store)] == [f"t{n}" for n in range(5)]
+    assert store.metrics["flushes"] == 1 and store.metrics["max_batch"] == 5
+
+
+# =========================================================
+# 🗂 GLOBAL MEMORIES: SEGMENTS, PAGING, RETENTION
+# =========================================================
+def _segment_store(path, **kwargs):
+    kwargs.setdefault("flush_interval_ms", 0)
+    return SegmentStore(str(path), **kwargs)
+
+
+def _memory(message, emotion="joy"):
+    return {"op": "memory", "entry": {"timestamp": f"2025-01-01T00:00:{message:02d}",
+                                      "message": message, "emotion": emotion}}
+
+
+def _pages(query, **filters):
+    pages, cursor = [], None
+    while True:
+        page = query(cursor=cursor, **filters)
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_query_memories_pages_across_segments_and_workers(tmp_path, monkeypatch):
+    from ai_service.memory_manager import MemoryManager
+
+    monkeypatch.setitem(memory_store.COLLECTIONS, "log",
+                        functools.partial(SegmentStore, segment_entries=3, flush_interval_ms=0))
+    manager = MemoryManager(base_dir=str(tmp_path))
+    other_worker = _segment_store(manager.global_file, segment_entries=3)
+
+    for n in range(8):
+        emotion = "joy" if n % 2 else "sadness"
+        if n % 3:
+            manager.add_memory(f"m{n}", f"summary {n}", emotion)
+        else:
+            other_worker.commit({"op": "memory", "entry": {
+                "timestamp": f"2099-01-01T00:00:0{n}", "message": f"m{n}", "summary": "", "emotion": emotion}})
+    assert len(os.listdir(manager.global_store.dir)) > 3   # several sealed segments (+ sidecars)
+
+    pages = _pages(manager.query_memories, limit=3)
+    assert [len(p) for p in pages] == [3, 3, 2]
+    entries = [e for page in pages for e in page]
+    keys = [(e["timestamp"], e["id"]) for e in entries]
+    assert keys == sorted(keys, reverse=True)   # newest first, no entry twice, none skipped
+    assert sorted(e["message"] for e in entries) == [f"m{n}" for n in range(8)]
+
+    joy = [e["message"] for page in _pages(manager.query_memories, emotion="joy", limit=2) for e in page]
+    assert sorted(joy) == ["m1", "m3", "m5", "m7"]
+    assert manager.query_memories(emotion="JOY", limit=10)["next_cursor"] is None
+
+
+def test_timestamp_range_and_cursor_page_newest_first(tmp_path):
+    store = _segment_store(tmp_path / "memories.json", segment_entries=2)
+    for n in range(10):
+        store.commit(_memory(n))
+
+    page = store.query(since="2025-01-01T00:00:02", until="2025-01-01T00:00:07", limit=4)
+    assert [e["message"] for e in page["items"]] == [7, 6, 5, 4]
+    rest = store.query(since="2025-01-01T00:00:02", until="2025-01-01T00:00:07", limit=4,
+                       cursor=page["next_cursor"])
+    assert [e["message"] for e in rest["items"]] == [3, 2] and rest["next_cursor"] is None
+
+
+def test_retention_drops_the_oldest_segments(tmp_path):
+    path = tmp_path / "memories.json"
+    store = _segment_store(path, segment_entries=2, max_entries=4)
+    assert store.query(limit=1) == {"items": [], "next_cursor": None}
+
+    for n in range(7):
+        store.commit(_memory(n))
+
+    # 2+2+2+1 entries; the two oldest segments go while the rest still hold 4
+    assert store.count() == 5
+    assert [e["message"] for e in store.all()] == [2, 3, 4, 5, 6]
+    assert sorted(os.listdir(store.dir)) == [
+        "00000002.idx.json", "00000002.jsonl", "00000003.idx.json", "00000003.jsonl", "00000004.jsonl"]
+    assert store.query(cursor=1)["items"] == []   # a cursor past the cap ends the paging
+
+    reopened = _segment_store(path, segment_entries=2, max_entries=4)
+    assert reopened.count() == 5
+    assert [e["message"] for e in reopened.query(limit=10)["items"]] == [6, 5, 4, 3, 2]
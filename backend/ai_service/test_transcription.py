@@ -0,0 +1,52 @@
+"""
+Stitching of overlapping ASR windows (services/transcription.py).
+
+Pure text in, text out: no model is loaded. overlap_s=1 gives the minimum
+seam reach of 4 words, so the cases stay short.
+
+    cd backend && python -m pytest ai_service/test_transcription.py -q
+"""
+from ai_service.services.transcription import _seam, stitch
+
+OVERLAP_S = 1
+
+
+def test_exact_overlap_is_kept_once():
+    texts = ["we lived by the sea near the harbour", "near the harbour with my brother"]
+    assert stitch(texts, OVERLAP_S) == "we lived by the sea near the harbour with my brother"
+
+
+def test_overlap_matches_across_case_and_punctuation():
+    texts = ["We lived near the Harbour.", "the harbour, with my brother"]
+    assert stitch(texts, OVERLAP_S) == "We lived near the Harbour. with my brother"
+
+
+def test_no_shared_words_joins_the_windows():
+    assert stitch(["good morning to you", "how did you sleep"], OVERLAP_S) == \
+        "good morning to you how did you sleep"
+
+
+def test_repeated_phrase_away_from_the_seam_is_not_dropped():
+    # "my mother" recurs in both windows but ends 5 words before the seam: speech, not overlap
+    texts = ["she said my mother grew roses every summer then",
+             "we visited and my mother smiled"]
+    assert stitch(texts, OVERLAP_S) == " ".join(texts)
+
+
+def test_run_closest_to_the_seam_wins_over_an_earlier_repeat():
+    tail = "i said thank you and she said thank you".split()
+    head = "she said thank you so much".split()
+    assert _seam(tail, head, reach=4) == (5, 0, 4)
+    assert stitch([" ".join(tail), " ".join(head)], OVERLAP_S) == \
+        "i said thank you and she said thank you so much"
+
+
+def test_single_shared_word_is_not_a_seam():
+    assert _seam(["over", "the", "hill"], ["hill", "and", "far"], reach=4) is None
+    assert stitch(["over the hill", "hill and far"], OVERLAP_S) == "over the hill hill and far"
+
+
+def test_empty_window_is_skipped():
+    texts = ["", "we lived by the sea near the harbour", "   ", "near the harbour with my brother"]
+    assert stitch(texts, OVERLAP_S) == "we lived by the sea near the harbour with my brother"
+    assert stitch(["", ""], OVERLAP_S) == ""
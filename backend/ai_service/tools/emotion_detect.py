@@ -1,11 +1,11 @@
-from openai import AsyncOpenAI
-client = AsyncOpenAI()
+from ai_service.services.providers import openai_client
+from ai_service.services.emotion_cascade import EmotionCascade, register
+client = openai_client()
+
+LABELS = ["positive", "neutral", "sad", "angry", "anxious", "fear"]
 
-async def detect_emotion(text: str) -> str:
-    """
-    Returns: "positive", "neutral", "sad", "angry", "fear", "anxious"
-    """
 
+async def _llm_emotion(text: str) -> str:
     prompt = f"""
 Classify the user's emotion from this message:
 "{text}"
@@ -22,6 +22,27 @@ positive, neutral, sad, angry, anxious, fear.
     )
 
     emo = res.choices[0].message.content.strip().lower()
-    return emo if emo in ["positive","neutral","sad","angry","anxious","fear"] else "neutral"
+    return emo if emo in LABELS else "neutral"
+
 
+# DistilRoBERTa labels → this vocabulary; "anxious" only comes from the LLM
+_cascade = register(EmotionCascade(
+    "emotion_detect",
+    mapping={
+        "joy": "positive",
+        "surprise": "positive",
+        "neutral": "neutral",
+        "sadness": "sad",
+        "anger": "angry",
+        "disgust": "angry",
+        "fear": "fear",
+    },
+    llm=_llm_emotion,
+))
 
+
+async def detect_emotion(text: str) -> str:
+    """
+    Returns: "positive", "neutral", "sad", "angry", "fear", "anxious"
+    """
+    return await _cascade.classify(text)
@@ -1,35 +1,130 @@
+import threading
+from collections import OrderedDict
 from ai_service.tools.base_tool import BaseTool
-from transformers import pipeline
+from ai_service import model_registry
+from ai_service.services.inference_batcher import classifier_batcher
+from ai_service.config.settings import EMOTION_CACHE_SIZE, EMOTION_BATCH_SIZE
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different transcripts share a cache entry."""
+    return " ".join(text.split())
 
 
 class EmotionTool(BaseTool):
     """
     A BaseTool-based emotion detector using the DistilRoBERTa model.
+
+    The classifier comes from the shared model registry and is loaded once per
+    process; results are memoized in a bounded LRU keyed by normalized text.
     """
 
     name = "emotion_detector"
     description = "Analyzes the emotional tone of a text input and returns dominant emotion with confidence."
 
+    # Shared by every EmotionTool instance in the process
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, cache_size: int = EMOTION_CACHE_SIZE, batch_size: int = EMOTION_BATCH_SIZE):
+        super().__init__()
+        self.model = model_registry.handle("emotion")
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+
+    def warmup(self):
+        """Load the weights and run one tiny forward pass so the first turn is fast."""
+        self.model(["warmup"], top_k=None)
+
+    # =========================================================
+    # 🗃 RESULT CACHE
+    # =========================================================
+    def _cache_get(self, key):
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _cache_put(self, key, result):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _format(scores) -> dict:
+        emotions = {r["label"]: float(r["score"]) for r in scores}
+        return {
+            "dominant_emotion": max(emotions, key=emotions.get),
+            "all_scores": emotions
+        }
+
+    # =========================================================
+    # 🔍 INFERENCE
+    # =========================================================
+    def run_many(self, texts: list) -> list:
+        """
+        Analyze several texts with a single batched forward pass.
+        Returns one result dict per input, in order (cache hits skip the model).
+        """
+        results = [None] * len(texts)
+        pending = {}  # normalized text → indexes waiting on it
+
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = {"error": "Text input missing."}
+                continue
+            key = normalize_text(text)
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = {"dominant_emotion": cached["dominant_emotion"], "all_scores": dict(cached["all_scores"])}
+            else:
+                pending.setdefault(key, []).append(i)
+
+        if pending:
+            misses = list(pending)
+            try:
+                outputs = self.model(misses, top_k=None, batch_size=min(len(misses), self.batch_size))
+            except Exception as e:
+                for key in misses:
+                    for i in pending[key]:
+                        results[i] = {"error": str(e)}
+                return results
+
+            for key, scores in zip(misses, outputs):
+                result = self._format(scores)
+                self._cache_put(key, result)
+                for i in pending[key]:
+                    results[i] = {"dominant_emotion": result["dominant_emotion"], "all_scores": dict(result["all_scores"])}
+
+        return results
+
     def _run(self, text: str) -> dict:
         """Analyze emotion from text and return results."""
+        return self.run_many([text])[0]
+
+    async def arun(self, text: str) -> dict:
+        """
+        Async _run(): cache misses join the shared emotion micro-batch queue, so
+        concurrent turns are classified together in one forward pass.
+        """
         if not text or not text.strip():
             return {"error": "Text input missing."}
 
-        try:
-            model = pipeline(
-                "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base",
-                top_k=None
-            )
-
-            results = model(text)
-            emotions = {r["label"]: float(r["score"]) for r in results[0]}
-            dominant = max(emotions, key=emotions.get)
-
-            return {
-                "dominant_emotion": dominant,
-                "all_scores": emotions
-            }
+        key = normalize_text(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return {"dominant_emotion": cached["dominant_emotion"], "all_scores": dict(cached["all_scores"])}
 
+        try:
+            scores = await classifier_batcher("emotion", top_k=None).submit(key)
         except Exception as e:
             return {"error": str(e)}
+
+        result = self._format(scores)
+        self._cache_put(key, result)
+        return {"dominant_emotion": result["dominant_emotion"], "all_scores": dict(result["all_scores"])}
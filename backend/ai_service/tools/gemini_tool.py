@@ -1,13 +1,8 @@
-import os
 import random
-import google.generativeai as genai
-from openai import AsyncClient
-
-# Configure Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+from ai_service.services.providers import agemini, openai_client, GEMINI_FLASH
 
 # OpenAI client (for contextual fillers)
-client = AsyncClient()
+client = openai_client()
 
 # Fallback lines if Gemini fails
 fallbacks = [
@@ -67,11 +62,10 @@ async def generate_followup(transcript: str, category: str = "General", history:
         Now output ONE short, warm follow-up question:
         """
 
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        response = model.generate_content(prompt)
-
-        if hasattr(response, "text") and response.text.strip():
-            return response.text.strip()
+        # Async gRPC call on a cached model handle — never blocks the event loop
+        text = await agemini(prompt, GEMINI_FLASH)
+        if text:
+            return text
 
         return random.choice(fallbacks)
 
@@ -1,5 +1,6 @@
 from ai_service.tools.base_tool import BaseTool
-from transformers import pipeline
+from ai_service import model_registry
+from ai_service.services.inference_batcher import classifier_batcher
 
 
 class SentimentTool(BaseTool):
@@ -13,13 +14,30 @@ class SentimentTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.model = pipeline("sentiment-analysis")
+        self.model = model_registry.handle("sentiment")
+
+    @staticmethod
+    def _format(result) -> dict:
+        return {"sentiment": result["label"], "confidence": float(result["score"])}
+
+    def run_many(self, texts: list) -> list:
+        """Analyze several texts in one batched forward pass."""
+        try:
+            results = self.model(texts, batch_size=max(len(texts), 1))
+            return [self._format(r) for r in results]
+        except Exception as e:
+            return [{"error": str(e)} for _ in texts]
 
     def _run(self, text: str) -> dict:
         try:
             results = self.model(text)
-            label = results[0]["label"]
-            score = float(results[0]["score"])
-            return {"sentiment": label, "confidence": score}
+            return self._format(results[0])
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def arun(self, text: str) -> dict:
+        """Async _run() through the shared sentiment micro-batch queue."""
+        try:
+            return self._format(await classifier_batcher("sentiment").submit(text))
         except Exception as e:
             return {"error": str(e)}
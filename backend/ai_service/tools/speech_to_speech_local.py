@@ -2,15 +2,16 @@ import os
 import uuid
 import json
 import torch
-import librosa
-import soundfile as sf
 from datetime import datetime
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import FileResponse
-from transformers import pipeline
-from elevenlabs import ElevenLabs
+from ai_service import model_registry
+from ai_service.services.tts_cache import aelevenlabs_bytes
 from gtts import gTTS  # Fallback TTS (Google)
 import warnings
+from pathlib import Path
+from ai_service.services.executors import run_cpu, run_io
+from ai_service.services.asr import get_engine
 
 warnings.filterwarnings("ignore")
 
@@ -20,26 +21,14 @@ router = APIRouter()
 device = "cpu"
 
 # Whisper (Speech → Text)
-asr = pipeline("automatic-speech-recognition", model="openai/whisper-tiny", device="cpu")
+asr = model_registry.handle("whisper_tiny")
 
 # Text Generation (Empathetic AI)
-chat_model_name = "mistralai/Mistral-7B-Instruct-v0.2"
-chat_pipe = pipeline(
-    "text-generation",
-    model=chat_model_name,
-    device_map="auto",
-    max_new_tokens=200,
-    temperature=0.8,
-    top_p=0.9
-)
+chat_pipe = model_registry.handle("mistral_chat")
 
 # Sentiment Analysis
-sentiment_pipe = pipeline("sentiment-analysis", model="j-hartmann/emotion-english-distilroberta-base")
+sentiment_pipe = model_registry.handle("emotion")
 
-# ElevenLabs client
-tts_client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
-
-MAX_DURATION = 30
 SUPER_MEMORY_DIR = "/home/ubuntu/Mimir/supermemory"
 
 # --- Voice selection based on sentiment ---
@@ -57,26 +46,7 @@ VOICE_MAP = {
 # --- Helper: Transcribe long audio safely ---
 def transcribe_long_audio(file_path: str) -> str:
     try:
-        audio, sr = librosa.load(file_path, sr=16000)
-        duration = librosa.get_duration(y=audio, sr=sr)
-        text_output = ""
-
-        if duration <= MAX_DURATION:
-            result = asr(file_path)
-            return result["text"]
-
-        # Split into 30s chunks
-        for start in range(0, int(duration), MAX_DURATION):
-            end = min(start + MAX_DURATION, int(duration))
-            chunk = audio[start * sr:end * sr]
-            temp_path = f"chunk_{uuid.uuid4().hex}.wav"
-            sf.write(temp_path, chunk, sr)
-            result = asr(temp_path)
-            text_output += " " + result["text"]
-            os.remove(temp_path)
-
-        return text_output.strip()
-
+        return get_engine("speech_to_speech").transcribe(file_path)["text"]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
 
@@ -99,6 +69,21 @@ def save_to_supermemory(user_text: str, ai_reply: str, sentiment: str):
         print(f"⚠️ Could not save memory: {e}")
 
 
+# --- Helper: ElevenLabs TTS (async SDK) with gTTS fallback ---
+async def synthesize_to_file(text: str, voice: str, output_path: str) -> str:
+    try:
+        print(f"🎧 Generating speech with ElevenLabs voice '{voice}'...")
+        audio = await aelevenlabs_bytes(text, voice)
+        await run_io(Path(output_path).write_bytes, audio)
+        print("✅ ElevenLabs TTS generated successfully.")
+
+    except Exception as e:
+        print(f"⚠️ ElevenLabs error ({e}) — switching to gTTS fallback.")
+        await run_io(gTTS(text=text, lang="en").save, output_path)
+        print("✅ gTTS fallback TTS generated.")
+    return output_path
+
+
 # --- Main Endpoint ---
 @router.post("/speech-to-speech-local")
 async def speech_to_speech_local(audio: UploadFile = File(...)):
@@ -110,15 +95,14 @@ async def speech_to_speech_local(audio: UploadFile = File(...)):
         output_path = f"reply_{uuid.uuid4().hex}.mp3"
 
         # Save uploaded audio
-        with open(input_path, "wb") as f:
-            f.write(await audio.read())
+        await run_io(Path(input_path).write_bytes, await audio.read())
 
         # 1️⃣ Transcribe user speech
-        user_text = transcribe_long_audio(input_path)
+        user_text = await run_cpu(transcribe_long_audio, input_path)
         print(f"🗣️ User said: {user_text}")
 
         # 2️⃣ Detect sentiment
-        sentiment_result = sentiment_pipe(user_text)[0]
+        sentiment_result = (await run_cpu(sentiment_pipe, user_text))[0]
         sentiment = sentiment_result["label"].lower()
         confidence = round(sentiment_result["score"], 2)
         print(f"💬 Detected sentiment: {sentiment} (confidence={confidence})")
@@ -136,7 +120,7 @@ async def speech_to_speech_local(audio: UploadFile = File(...)):
             f"User said: \"{user_text}\"\nAI reply:"
         )
 
-        response = chat_pipe(prompt, max_new_tokens=220, temperature=0.85, top_p=0.9)
+        response = await run_cpu(chat_pipe, prompt, max_new_tokens=220, temperature=0.85, top_p=0.9)
         ai_reply_raw = response[0]["generated_text"]
         ai_reply = ai_reply_raw.split("AI reply:")[-1].strip()
 
@@ -149,27 +133,10 @@ async def speech_to_speech_local(audio: UploadFile = File(...)):
         print(f"🤖 Final AI reply: {ai_reply}")
 
         # 4️⃣ Text → Speech (Natural Human Voice)
-        try:
-            print(f"🎧 Generating speech with ElevenLabs voice '{voice_choice}'...")
-            audio_stream = tts_client.text_to_speech.convert(
-                voice_id=voice_choice,
-                model_id="eleven_multilingual_v2",
-                text=ai_reply
-            )
-            with open(output_path, "wb") as f:
-                for chunk in audio_stream:
-                    if isinstance(chunk, bytes):
-                        f.write(chunk)
-            print("✅ ElevenLabs TTS generated successfully.")
-
-        except Exception as e:
-            print(f"⚠️ ElevenLabs error ({e}) — switching to gTTS fallback.")
-            tts = gTTS(text=ai_reply, lang="en")
-            tts.save(output_path)
-            print("✅ gTTS fallback TTS generated.")
+        await synthesize_to_file(ai_reply, voice_choice, output_path)
 
         # 5️⃣ Save conversation in supermemory
-        save_to_supermemory(user_text, ai_reply, sentiment)
+        await run_io(save_to_supermemory, user_text, ai_reply, sentiment)
 
         # Clean up input file
         os.remove(input_path)
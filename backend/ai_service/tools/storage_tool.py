@@ -22,13 +22,16 @@ class StorageTool(BaseTool):
         Run a memory action.
 
         Args:
-            action (str): 'add_turn', 'recall', or 'add_memory'
+            action (str): 'add_turn', 'recall', 'add_memory' or 'query_memories'
             user_id (str, optional): ID of the user
             user_message (str, optional): The user's message
             ai_reply (str, optional): The AI's reply
             emotion (str, optional): Emotion label
             message (str, optional): Text for global memory
             summary (str, optional): Summary of a message
+            since / until (str, optional): ISO timestamp range for query_memories
+            cursor (int, optional): next_cursor from the previous query_memories page
+            limit (int, optional): Page size for query_memories (default 20)
         """
         try:
             if action == "add_turn":
@@ -56,6 +59,17 @@ class StorageTool(BaseTool):
                 logging.info("🌍 Added entry to global memory.")
                 return {"status": "ok", "action": "add_memory"}
 
+            elif action == "query_memories":
+                page = memory.query_memories(
+                    emotion=kwargs.get("emotion"),
+                    since=kwargs.get("since"),
+                    until=kwargs.get("until"),
+                    cursor=kwargs.get("cursor"),
+                    limit=kwargs.get("limit", 20),
+                )
+                logging.info(f"🌍 Retrieved {len(page['items'])} global memories")
+                return page
+
             else:
                 return {"error": f"Unknown action: {action}"}
 
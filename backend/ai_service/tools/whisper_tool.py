@@ -1,13 +1,9 @@
-from faster_whisper import WhisperModel
-import asyncio
+from ai_service.services.asr import get_engine
 
-# Load model only ONCE (this is good)
-model = WhisperModel("base", device="cpu", compute_type="int8")
+# faster-whisper int8 unless MIMIR_ASR_FLOW_ENGINES overrides "whisper_tool"
+engine = get_engine("whisper_tool")
 
 async def transcribe_pcm(pcm_bytes: bytes) -> str:
-    result = await client.audio.transcriptions.create(
-        model="gpt-4o-mini-transcribe",
-        file=("audio.wav", pcm_bytes, "audio/wav")
-    )
-    return result.text
+    result = await engine.atranscribe(pcm_bytes)
+    return result["text"]
 
@@ -1,9 +1,10 @@
 # ai_service/tts_service.py
 from fastapi import APIRouter, HTTPException, Body
 from fastapi.responses import FileResponse
-from transformers import pipeline
-from elevenlabs import ElevenLabs
-import uuid, os, logging
+from ai_service import model_registry
+from ai_service.services.executors import run_cpu, run_io
+from ai_service.services.tts_cache import aelevenlabs_tts, publish
+import os, logging
 
 router = APIRouter(prefix="/tts", tags=["Text-to-Speech"])
 
@@ -16,18 +17,12 @@ os.makedirs(BASE_DIR, exist_ok=True)
 # =========================================================
 # ⚙️ MODEL INITIALIZATION
 # =========================================================
-emotion_analyzer = pipeline(
-    "sentiment-analysis",
-    model="j-hartmann/emotion-english-distilroberta-base",
-    device=-1
-)
+emotion_analyzer = model_registry.handle("emotion")
 
 ELEVEN_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 if not ELEVEN_API_KEY:
     raise RuntimeError("Missing ELEVENLABS_API_KEY environment variable")
 
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
-
 VOICE_MAP = {
     "joy": "EXAVITQu4vr4xnSDxMaL",
     "sadness": "pFZP5JQG7iQjIQuC4Bku",
@@ -50,7 +45,7 @@ async def generate_tts(payload: dict = Body(...)):
     try:
         logging.warning(f"🎤 TTS request → {text[:60]}...")
 
-        emotion_result = emotion_analyzer(text)[0]
+        emotion_result = (await run_cpu(emotion_analyzer, text))[0]
         emotion_label = emotion_result["label"].lower()
         confidence = float(emotion_result["score"])
         logging.warning(f"💬 Emotion: {emotion_label} ({confidence:.3f})")
@@ -58,19 +53,10 @@ async def generate_tts(payload: dict = Body(...)):
         voice_id = VOICE_MAP.get(emotion_label, VOICE_MAP["neutral"])
         logging.warning(f"🎙️ Using ElevenLabs voice ID: {voice_id}")
 
-        audio_stream = client.text_to_speech.convert(
-            voice_id=voice_id,
-            model_id="eleven_multilingual_v2",
-            text=text
-        )
-
-        filename = f"tts_{uuid.uuid4().hex}.mp3"
-        output_path = os.path.join(BASE_DIR, filename)
-
-        with open(output_path, "wb") as f:
-            for chunk in audio_stream:
-                if isinstance(chunk, bytes):
-                    f.write(chunk)
+        # Content-addressed: repeated prompts come straight from the cache
+        cached = await aelevenlabs_tts(text, voice_id)
+        output_path = await run_io(publish, cached, BASE_DIR, "tts_")
+        filename = os.path.basename(output_path)
 
         logging.warning(f"✅ TTS saved → {output_path}")
 